@@ -0,0 +1,60 @@
+#
+# Cold start of imfilters: import time and memory of a fresh interpreter
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_STATEMENTS = (
+    'import imfilters.imfilters',
+    'from imfilters import imfilters; imfilters.IMContrast',
+    'from imfilters import imfilters; imfilters.IMGaussBlur',
+    'from imfilters import imfilters; imfilters.IMNormalize',
+    'from imfilters import cli',
+    'import imfilters.pipeline',
+    'import imfilters.watch',
+)
+
+_HEAVY = ('numpy', 'cv2', 'PIL.ImageFilter', 'PIL.ImageDraw', 'PIL.ImageGrab')
+
+_CHILD = '''
+import resource, sys, time
+start = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(__import__('json').dumps({
+    'seconds': elapsed,
+    'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules],
+}))
+'''
+
+def measure(statement:str, repeat:int=7):
+    '''
+    Function responsible for running a statement in fresh interpreters.
+    Returns the median seconds, the median peak RSS in MB and the heavy modules loaded.
+    '''
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _CHILD, statement, *_HEAVY], check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    return statistics.median(r['seconds'] for r in runs), statistics.median(r['rss'] for r in runs), runs[0]['loaded']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import time and memory of imfilters in fresh interpreters.')
+    parser.add_argument('-n', '--repeat', type=int, default=7, help='Interpreters per statement.')
+    parser.add_argument('statements', nargs='*', default=_STATEMENTS)
+    args = parser.parse_args(argv)
+
+    for statement in args.statements:
+        seconds, rss, loaded = measure(statement, args.repeat)
+        print(f'{seconds * 1000:8.1f} ms {rss:7.1f} MB  {statement}  [{", ".join(loaded)}]')
+
+if __name__ == '__main__':
+    main()
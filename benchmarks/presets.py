@@ -0,0 +1,81 @@
+#
+# Presets: the float32 chain against running the steps one by one, through files and in 8 bits
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+
+def _steps_files(steps, src:str, dst:str):
+    '''
+    Function responsible for running the steps of a preset as the presets used to: every step opens the
+    file of the one before and saves its result over the destination.
+    '''
+    for name, params in steps:
+        getattr(imfilters, name)(src, **params).save(dst)
+        src = dst
+
+def _steps_8bit(steps, pixels):
+    '''
+    Function responsible for running the steps of a preset one by one, truncated to 8 bits after every step.
+    '''
+    for name, params in steps:
+        pixels = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(pixels, **params)))
+    return pixels
+
+def _best(work, repeat:int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = work()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def measure(name:str, pixels, repeat:int=3, format:str='png'):
+    '''
+    Function responsible for timing a preset over the pixels with the three chains.
+    Returns the best seconds of the steps through files, of the 8-bit steps and of the float32 chain, and
+    the share of values and the largest difference between the 8-bit steps and the float32 chain.
+    : param format: Extension of the files of the round trip. Ex: 'png', 'jpg'.
+    '''
+    steps = getattr(imfilters, name).steps
+    with tempfile.TemporaryDirectory() as folder:
+        src = os.path.join(folder, 'src.' + format)
+        dst = os.path.join(folder, 'dst.' + format)
+        Image.fromarray(pixels).save(src)
+        files, _ = _best(lambda: _steps_files(steps, src, dst), repeat)
+    old, expected = _best(lambda: _steps_8bit(steps, pixels), repeat)
+    new, result = _best(lambda: np.asarray(imfilters._chain(steps, pixels)), repeat)
+    diff = np.abs(result.astype(np.int16) - expected)
+    return files, old, new, float((diff > 0).mean()), int(diff.max())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time of the presets, float32 chain against the steps through files and in 8 bits.')
+    parser.add_argument('-i', '--image', help='Image to filter. A random 6 MP image when not informed.')
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='Runs per preset, the best is kept.')
+    parser.add_argument('-f', '--format', default='png', help='Extension of the files of the round trip. Ex: png, jpg.')
+    parser.add_argument('presets', nargs='*', default=imfilters.PRESETS)
+    args = parser.parse_args(argv)
+
+    if args.image:
+        pixels = np.asarray(Image.open(args.image).convert('RGB'))
+    else:
+        pixels = np.random.default_rng(0).integers(0, 256, (2000, 3000, 3), dtype=np.uint8)
+    print(f'{pixels.shape[1]}x{pixels.shape[0]}, best of {args.repeat}, round trip through {args.format} files')
+    for name in args.presets:
+        files, old, new, share, largest = measure(name, pixels, args.repeat, args.format)
+        print(f'{name:<12} files {files:6.3f}s  8-bit steps {old:6.3f}s  float32 {new:6.3f}s  '
+              f'{share:7.3%} of the values differ, up to {largest}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import sys
+
+from imfilters.cli import main
+
+sys.exit(main())
@@ -0,0 +1,159 @@
+#
+# Asynchronous interface for applying filters to images
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.shared import IMShared
+
+def _render(name:str, image, params:dict, format:str='PNG', options:dict=None, tiled:bool=False):
+    '''
+    Function responsible for applying a filter or preset and returning the encoded image.
+    It runs inside the executor, so it must stay at module level to be picklable.
+    : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+    : param image: Path, bytes, PIL image or IMShared to be applied to the filter. Animated images keep all their frames.
+    : param params: Parameters of the filter.
+    : param format: Format of the encoded image. Ex: 'PNG', 'JPEG'.
+    : param options: Encoder settings. Ex: {'quality': 85, 'progressive': True}.
+    : param tiled: Filter strip by strip with IMTiled, for images too large for the memory budget.
+    '''
+    cls = getattr(imfilters, name)
+    options = options or {}
+
+    if isinstance(image, IMShared):
+        image = image.buffer
+    image = imfilters._open(image)
+    if getattr(image, 'n_frames', 1) > 1:
+        # The encoders of WebP and TIFF are registered only once all the plugins are loaded.
+        Image.init()
+    if getattr(image, 'n_frames', 1) > 1 and imfilters._format(None, format) in Image.SAVE_ALL:
+        # The animations run on the stages of IMVideo, which needs OpenCV.
+        from imfilters.animation import IMAnimation
+        return IMAnimation(name, **params).to_bytes(image, format, **options)
+
+    if tiled:
+        from imfilters.tiled import IMTiled
+        return IMTiled(name, image, **params).to_bytes(format, **options)
+
+    if name not in imfilters.PRESETS:
+        return cls(image, **params).to_bytes(format, **options)
+    if params:
+        raise TypeError(f'{name} takes no parameters.')
+    return imfilters._encode(imfilters._chain(cls.steps, image), format, **options)
+
+class IMAsync:
+    '''
+    Class responsible for applying filters and presets without blocking the event loop.
+    Every name in imfilters.FILTERS and imfilters.PRESETS is available as a coroutine method.
+    Ex: data = await IMAsync().IMContrast('photo.jpg', adjust=10)
+    : param executor: Executor used for the CPU work. Created when not informed.
+    : param workers: Number of workers of the executor created.
+    : param processes: Use a process pool instead of a thread pool. Images already decoded, PIL images,
+        IMBuffer and NumPy arrays, are handed to the processes in shared memory instead of pickled.
+    : param limit: Maximum number of jobs in flight, the rest waits for a free slot.
+    : param format: Default format of the returned images.
+    '''
+
+    def __init__(self, executor=None, workers:int=None, processes:bool=False, limit:int=None, format:str='PNG'):
+        self.workers = workers or os.cpu_count() or 1
+        self.limit = limit or self.workers
+        self.format = format
+
+        self._own_executor = executor is None
+        if executor is not None:
+            self.executor = executor
+        elif processes:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        self._sem = None
+
+    def __getattr__(self, name:str):
+        if name in imfilters.FILTERS or name in imfilters.PRESETS:
+            async def method(image, format:str=None, timeout:float=None, options:dict=None, **params):
+                return await self.apply(name, image, format=format, timeout=timeout, options=options, **params)
+            method.__name__ = name
+            return method
+        raise AttributeError(name)
+
+    async def apply(self, name:str, image, format:str=None, timeout:float=None, options:dict=None, **params):
+        '''
+        Method responsible for applying a filter or preset and returning the encoded image in bytes.
+        Cancelling the call, or reaching the timeout, drops the job if it has not started yet.
+        A job already running holds its slot until it finishes.
+        : param name: Name of the filter or preset.
+        : param image: Path, bytes or PIL image to be applied to the filter.
+        : param format: Format of the returned image.
+        : param timeout: Seconds to wait for the result.
+        : param options: Encoder settings. Ex: {'quality': 85, 'optimize': True}.
+        '''
+        if name not in imfilters.FILTERS and name not in imfilters.PRESETS:
+            raise ValueError(f'Filter -> {name} not applicable.')
+
+        loop = asyncio.get_running_loop()
+        if self._sem is None:
+            self._sem = asyncio.BoundedSemaphore(self.limit)
+
+        await self._sem.acquire()
+        shared = None
+        try:
+            if isinstance(self.executor, ProcessPoolExecutor) and self._decoded(image):
+                try:
+                    image = shared = IMShared.from_array(image)
+                except ImportError:
+                    # Python 3.7 has no shared memory, the image is pickled.
+                    pass
+            future = self.executor.submit(_render, name, image, params, format or self.format, options)
+        except BaseException:
+            if shared is not None:
+                shared.release()
+            self._sem.release()
+            raise
+
+        def done(_):
+            if shared is not None:
+                shared.release()
+            # A job finishing after the loop was closed has no slot to give back.
+            if not loop.is_closed():
+                try:
+                    loop.call_soon_threadsafe(self._sem.release)
+                except RuntimeError:
+                    pass
+
+        future.add_done_callback(done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            future.cancel()
+            raise
+
+    @staticmethod
+    def _decoded(image):
+        if isinstance(image, Image.Image):
+            return getattr(image, 'n_frames', 1) == 1
+        return isinstance(image, (np.ndarray, imfilters.IMBuffer))
+
+    def close(self, wait:bool=True):
+        '''
+        Method responsible for shutting down the executor created by the class.
+        '''
+        if self._own_executor:
+            self.executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        # Waiting for the executor would block the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
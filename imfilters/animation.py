@@ -0,0 +1,111 @@
+#
+# Animated and multi-page images through the filters
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+
+import numpy as np
+from PIL import Image, ImageSequence, TiffImagePlugin
+
+from imfilters import imfilters
+from imfilters.video import IMVideo
+
+class IMAnimation:
+    '''
+    Class responsible for applying a filter or preset to every frame of animated GIF, APNG, WebP and multi-page TIFF.
+    The frames are decoded, filtered and handed to the encoder one at a time, keeping their durations.
+    The lookup tables and matrices are built once for all the frames, and palette frames with filters
+    that work pixel by pixel have only their palette filtered, reused while the next frames share it.
+    TIFF is written frame by frame, the GIF, APNG and WebP encoders of Pillow hold the frames until the end.
+    Ex: IMAnimation('IMSepia', adjust=60).save('cat.gif', 'cat_sepia.gif')
+    : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+    : param threads: Number of threads splitting every frame in bands.
+    : param params: Parameters of the filter.
+    '''
+
+    def __init__(self, name:str, threads:int=None, **params):
+        self.video = IMVideo(name, threads, **params)
+        self._palette = (None, None)
+
+    def _filter(self, frame):
+        duration = frame.info.get('duration')
+        if frame.mode == 'P' and self.video.pointwise:
+            palette = bytes(frame.getpalette('RGB'))
+            if self._palette[0] != palette:
+                colors = np.frombuffer(palette, np.uint8).reshape(1, -1, 3).copy()
+                self._palette = (palette, self.video.apply(colors, 'RGB').tobytes())
+            result = frame.copy()
+            result.putpalette(self._palette[1])
+        else:
+            alpha = None
+            if 'A' in frame.mode or 'transparency' in frame.info:
+                frame = frame.convert('RGBA')
+                alpha = frame.getchannel('A')
+            pixels = np.array(frame.convert('RGB'))
+            result = Image.fromarray(self.video.apply(pixels, 'RGB'))
+            if alpha is not None:
+                result.putalpha(alpha)
+        if duration is not None:
+            result.info['duration'] = duration
+        return result
+
+    def frames(self, image):
+        '''
+        Method responsible for returning the filtered frames, decoding the next one only when asked.
+        : param image: Path, binary file object, bytes or PIL image.
+        '''
+        for frame in ImageSequence.Iterator(imfilters._open(image)):
+            yield self._filter(frame)
+
+    def save(self, image, path, format:str=None, **params):
+        '''
+        Method responsible for saving all the filtered frames in one file.
+        : param image: Path, binary file object, bytes or PIL image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'GIF', 'PNG', 'WEBP', 'TIFF'.
+        : param params: Encoder settings. Ex: loop=0, optimize=True, quality=80, method=4.
+        '''
+        im = imfilters._open(image)
+        format = imfilters._format(path, format)
+        # The encoders of WebP and TIFF are registered only once all the plugins are loaded.
+        Image.init()
+        if format not in Image.SAVE_ALL:
+            raise ValueError(f'Format -> {format} does not hold several frames.')
+
+        frames = self.frames(im)
+        if format == 'TIFF':
+            # Pillow lists all the frames before writing a TIFF, appending them one by one keeps one in memory.
+            with TiffImagePlugin.AppendingTiffWriter(path, True) as tiff:
+                for frame in frames:
+                    frame.save(tiff, format, **params)
+                    tiff.newFrame()
+            return
+
+        params.setdefault('loop', im.info.get('loop', 0))
+        if format == 'WEBP' and 'duration' not in params and getattr(im, 'n_frames', 1) > 1:
+            # The WebP encoder reads the durations only as a list.
+            params['duration'] = [frame.info.get('duration', 0) for frame in ImageSequence.Iterator(im)]
+            im.seek(0)
+
+        if format != 'GIF':
+            # Palette frames are kept only by GIF, the others mix them badly with the RGB frames.
+            frames = (frame.convert('RGBA' if 'transparency' in frame.info else 'RGB') if frame.mode == 'P' else frame for frame in frames)
+        first = next(frames)
+        if format == 'PNG':
+            # The APNG encoder goes over the frames twice.
+            frames = list(frames)
+        imfilters._save(first, path, format, save_all=True, append_images=frames, **params)
+
+    def to_bytes(self, image, format:str='PNG', **params):
+        '''
+        Method responsible for returning all the filtered frames encoded in bytes.
+        : param image: Path, binary file object, bytes or PIL image.
+        : param format: Format of the image. Ex: 'GIF', 'PNG', 'WEBP', 'TIFF'.
+        : param params: Encoder settings, as in save.
+        '''
+        buffer = io.BytesIO()
+        self.save(image, buffer, format, **params)
+        return buffer.getvalue()
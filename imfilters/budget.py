@@ -0,0 +1,148 @@
+#
+# Memory budget shared by the workers of the batch and the server
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+
+# Bytes per pixel of IMTiled, and bytes of every job whatever its size.
+_TILED = 12
+_OVERHEAD = 16 << 20
+_UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+def _bytes(value):
+    '''
+    Function responsible for reading a size in bytes. Ex: 1024, '512M', '8G'.
+    '''
+    if value is None or isinstance(value, int):
+        return value
+    text = str(value).strip().upper().rstrip('B')
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+def _physical():
+    '''
+    Function responsible for the physical memory of the machine in bytes, None when unknown.
+    '''
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def _size(image):
+    '''
+    Function responsible for the size (width, height) of an image reading only its header.
+    '''
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    if isinstance(image, (Image.Image, imfilters.IMBuffer, imfilters.IMStats)):
+        return image.size
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(image)
+    position = image.tell() if hasattr(image, 'tell') else None
+    with Image.open(image) as im:
+        size = im.size
+    if position is not None:
+        image.seek(position)
+    return size
+
+def estimate(image, name:str, tiled:bool=False):
+    '''
+    Function responsible for the peak memory in bytes of filtering one image, read from its header before decoding.
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+    : param name: Name of the filter or preset. Ex: 'IMGaussBlur', 'Clarendon'.
+    : param tiled: Estimate for IMTiled instead of the filter over the whole image.
+    '''
+    width, height = _size(image)
+    per_pixel = _TILED if tiled else imfilters.lookup(name).memory
+    return width * height * per_pixel + _OVERHEAD
+
+class IMBudget:
+    '''
+    Class responsible for admitting jobs under a budget of memory shared by concurrent workers.
+    A job waits until its estimate fits in the budget left by the running jobs. A job larger than
+    the whole budget is admitted alone, when nothing else is running.
+    The images estimated above the share of one worker go to IMTiled, unless the filter reads the whole image.
+    Ex: budget = IMBudget('8G', workers=4); tiled, nbytes = budget.plan('scan.tif', 'Clarendon')
+        with budget.reserve(nbytes): ...
+    : param limit: Bytes of the budget. Ex: 8 * 1024 ** 3, '8G'. None -> three quarters of the physical memory, 0 -> no limit.
+    : param workers: Number of workers sharing the budget.
+    '''
+
+    def __init__(self, limit=None, workers:int=1):
+        limit = _bytes(limit)
+        if limit is None:
+            physical = _physical()
+            limit = physical * 3 // 4 if physical else 0
+        self.limit = limit
+        self.workers = max(1, workers)
+        self.in_use = 0
+        self.running = 0
+        self._cond = threading.Condition()
+
+    def plan(self, image, name:str):
+        '''
+        Method responsible for choosing how to run a job, before decoding the image.
+        Returns (tiled, nbytes), True when the job goes to IMTiled, and its estimate of memory.
+        : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+        : param name: Name of the filter or preset.
+        '''
+        nbytes = estimate(image, name)
+        if self.limit and nbytes > self.limit // self.workers and imfilters.lookup(name).halo() is not None:
+            return True, estimate(image, name, tiled=True)
+        return False, nbytes
+
+    def acquire(self, nbytes:int, timeout:float=None):
+        '''
+        Method responsible for reserving memory for a job, waiting for running jobs to release it.
+        Returns False when the timeout passes first. Ex: timeout = 0 -> no wait.
+        : param nbytes: Estimate of the job.
+        : param timeout: Seconds to wait. None -> until it fits.
+        '''
+        with self._cond:
+            fits = lambda: not self.limit or self.running == 0 or self.in_use + nbytes <= self.limit
+            if not self._cond.wait_for(fits, timeout):
+                return False
+            self.in_use += nbytes
+            self.running += 1
+            return True
+
+    def release(self, nbytes:int):
+        '''
+        Method responsible for returning the memory of a finished job.
+        : param nbytes: Estimate given to acquire.
+        '''
+        with self._cond:
+            self.in_use -= nbytes
+            self.running -= 1
+            self._cond.notify_all()
+
+    def reserve(self, nbytes:int):
+        '''
+        Method responsible for holding memory for the block of a with statement.
+        : param nbytes: Estimate of the job.
+        '''
+        return _Reservation(self, nbytes)
+
+class _Reservation:
+
+    def __init__(self, budget:IMBudget, nbytes:int):
+        self.budget = budget
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.budget.acquire(self.nbytes)
+        return self
+
+    def __exit__(self, *exc):
+        self.budget.release(self.nbytes)
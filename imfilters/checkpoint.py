@@ -0,0 +1,114 @@
+#
+# Checkpoint of a batch, so a run stopped in the middle resumes where it was
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import hashlib
+import json
+import os
+import uuid
+
+def _digest(path:str):
+    '''
+    Function responsible for the SHA-256 of a file, read in blocks.
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _key(**settings):
+    '''
+    Function responsible for the fingerprint of what is applied to every image: filter, parameters, encoder settings.
+    '''
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=repr).encode()).hexdigest()
+
+class IMCheckpoint:
+    '''
+    Class responsible for the checkpoint of a batch, the status of every output with the checksums that prove it.
+    Every finished image appends one line to the file, flushed to disk, so a run killed at any point keeps
+    what it finished. A new run skips an output when its record is done, the source has the same SHA-256,
+    the filter, parameters and encoder settings are the same, and the files written, at least one, still
+    have their SHA-256.
+    The file is compacted on opening, one line per output.
+    Ex: checkpoint = IMCheckpoint('run.ckpt'); key = _key(name='Clarendon', params={})
+        if not checkpoint.done(dst, key, _digest(src)): ...; checkpoint.record(src, dst, key, source, outputs)
+    : param path: Path of the checkpoint file, JSON lines.
+    '''
+
+    def __init__(self, path:str):
+        self.path = path
+        self.records = {}
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last line of a run killed while writing it.
+                        continue
+                    self.records[record['dst']] = record
+        except FileNotFoundError:
+            pass
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp, 'w') as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + '\n')
+        os.replace(tmp, path)
+        self._file = open(path, 'a')
+
+    def done(self, dst:str, key:str, source:str):
+        '''
+        Method responsible for telling if an output is finished and unchanged, so it can be skipped.
+        : param dst: Path of the output.
+        : param key: Fingerprint of the filter, parameters and encoder settings.
+        : param source: SHA-256 of the source.
+        '''
+        record = self.records.get(dst)
+        if record is None or record['status'] != 'done' or record['key'] != key or record['source'] != source:
+            return False
+        if not record['outputs']:
+            # Nothing written can be verified.
+            return False
+        try:
+            return all(_digest(path) == digest for path, digest in record['outputs'].items())
+        except FileNotFoundError:
+            return False
+
+    def record(self, src:str, dst:str, key:str, source:str, outputs:dict=None, error:str=None):
+        '''
+        Method responsible for writing the result of one output.
+        : param src: Path of the source.
+        : param dst: Path of the output.
+        : param key: Fingerprint of the filter, parameters and encoder settings.
+        : param source: SHA-256 of the source.
+        : param outputs: Files written with their SHA-256. Ex: {'out/a.jpg': '9f86d0...'}.
+        : param error: Message of the failure, the status is 'failed'.
+        '''
+        record = {'src': src, 'dst': dst, 'status': 'failed' if error else 'done', 'key': key, 'source': source,
+                  'outputs': outputs or {}}
+        if error:
+            record['error'] = error
+        self.records[dst] = record
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        '''
+        Method responsible for closing the checkpoint file.
+        '''
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,330 @@
+#
+# Command line for applying filters to images
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import argparse
+import glob
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.budget import IMBudget
+from imfilters.checkpoint import IMCheckpoint, _digest, _key
+from imfilters.jobs import IMJobQueue, _drain, _part
+
+def _parse_value(value:str):
+    '''
+    Function responsible for converting a parameter received as text.
+    Ex: '10' -> 10, '0.5' -> 0.5, 'true' -> True, '255,0,0,1' -> (255, 0, 0, 1).
+    '''
+    if ',' in value:
+        return tuple(_parse_value(v) for v in value.split(','))
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+def _sized(dst:str, width:int):
+    base, ext = os.path.splitext(dst)
+    return f'{base}_{width}{ext}'
+
+def _outputs(dst:str, widths:list=None):
+    return [_sized(dst, width) for width in widths] if widths else [dst]
+
+def _apply(name:str, src:str, dst:str, params:dict, options:dict=None, region:dict=None, widths:list=None, tiled:bool=False,
+           tag:str=None):
+    '''
+    Function responsible for applying a filter or preset to one file.
+    Animated images keep all their frames when the output format holds them.
+    With region, box and mask, only that part of the image is filtered.
+    With widths, the image is filtered once and saved at every width, with the width after the name.
+    With tiled, the image is filtered strip by strip by IMTiled, for images too large for the memory budget.
+    The outputs are written to temporary files renamed at the end, a stopped run leaves no partial file.
+    The temporary files are named after tag, a random one when not informed.
+    Returns the number of pixels of the source image.
+    '''
+    with Image.open(src) as im:
+        pixels = im.size[0] * im.size[1]
+        frames = getattr(im, 'n_frames', 1)
+
+    folder = os.path.dirname(dst)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    tag = tag or uuid.uuid4().hex[:8]
+    part = _part(dst, tag)
+    outputs = _outputs(dst, widths if frames == 1 else None)
+    try:
+        cls = getattr(imfilters, name)
+        if frames > 1 and imfilters._format(dst) in Image.SAVE_ALL:
+            from imfilters.animation import IMAnimation
+            IMAnimation(name, **params).save(src, part, **(options or {}))
+            pixels *= frames
+        elif widths:
+            from imfilters.pyramid import IMPyramid
+            IMPyramid(name, src, widths, **params).save(_part(_sized(dst, '{width}'), tag), **(options or {}))
+        elif region:
+            imfilters.IMRegion(name, src, region.get('box'), region.get('mask'), **params).save(part, **(options or {}))
+        elif tiled:
+            from imfilters.tiled import IMTiled
+            IMTiled(name, src, **params).save(part, **(options or {}))
+        elif name not in imfilters.PRESETS:
+            cls(src, **params).save(part, **(options or {}))
+        else:
+            if params:
+                raise TypeError(f'{name} takes no parameters.')
+            imfilters._save(imfilters._chain(cls.steps, src), part, **(options or {}))
+        for output in outputs:
+            os.replace(_part(output, tag), output)
+    finally:
+        for output in outputs:
+            if os.path.exists(_part(output, tag)):
+                os.unlink(_part(output, tag))
+    return pixels
+
+def _checked(name:str, src:str, dst:str, params:dict, options:dict=None, region:dict=None, widths:list=None, tiled:bool=False):
+    '''
+    Function responsible for applying a filter as _apply and returning the checksums of the checkpoint.
+    Returns the pixels, the SHA-256 of the source and the outputs with their SHA-256.
+    '''
+    source = _digest(src)
+    pixels = _apply(name, src, dst, params, options, region, widths, tiled)
+    outputs = [output for output in _outputs(dst, widths) if os.path.exists(output)]
+    if not outputs and widths and os.path.exists(dst):
+        # An animation keeps all its frames in one file, the widths are not made.
+        outputs = [dst]
+    return pixels, source, {output: _digest(output) for output in outputs}
+
+def _images(folder:str, skip:str=None):
+    extensions = set(Image.registered_extensions())
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != skip)
+        for file in sorted(files):
+            # The temporary outputs of a stopped run are not sources.
+            if os.path.splitext(file)[1].lower() in extensions and not os.path.splitext(file)[0].endswith('.part'):
+                yield os.path.join(root, file)
+
+def _jobs(inputs:list, output:str, name:str, format:str=None):
+    '''
+    Function responsible for pairing every source image with its destination.
+    '''
+    skip = os.path.abspath(output) if output else None
+    pairs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pairs.extend((src, os.path.relpath(src, item)) for src in _images(item, skip))
+        elif glob.has_magic(item):
+            pairs.extend((src, os.path.basename(src)) for src in sorted(glob.glob(item, recursive=True)) if os.path.isfile(src))
+        else:
+            pairs.append((item, os.path.basename(item)))
+
+    single = len(pairs) == 1 and len(inputs) == 1 and not os.path.isdir(inputs[0])
+    to_file = single and output and not os.path.isdir(output) and not output.endswith(os.sep)
+
+    jobs = []
+    for src, rel in pairs:
+        base, ext = os.path.splitext(rel)
+        ext = '.' + format.lower() if format else ext
+        if to_file:
+            dst = output
+        elif output:
+            dst = os.path.join(output, base + ext)
+        else:
+            dst = os.path.join(os.path.dirname(src), os.path.basename(base) + '_' + name + ext)
+        jobs.append((src, dst))
+    return jobs
+
+def _up_to_date(src:str, dst:str):
+    return os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src)
+
+def _drain_queue(folder:str, lease:float, workers:int):
+    '''
+    Function responsible for running workers of a shared queue until it is drained, and printing what they did.
+    '''
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            totals = list(executor.map(_drain, [folder] * workers, [lease] * workers))
+    else:
+        totals = [_drain(folder, lease)]
+    done = sum(total['done'] for total in totals)
+    failed = sum(total['failed'] for total in totals)
+    pixels = sum(total['pixels'] for total in totals)
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed else 0.0
+    mp_rate = pixels / 1e6 / elapsed if elapsed else 0.0
+    status = IMJobQueue(folder).status()
+    print(f'{done} images in {elapsed:.2f}s ({rate:.2f} images/sec, {mp_rate:.2f} MP/sec), {failed} failed, '
+          f'queue {status["done"]}/{status["chunks"]} chunks done')
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='imfilters', description='Apply filters and presets to images.')
+    parser.add_argument('name', nargs='?', help='Filter or preset. Ex: IMContrast, Clarendon.')
+    parser.add_argument('inputs', nargs='*', help='Files, globs or directories.')
+    parser.add_argument('-o', '--output', help='Output file, or directory for several inputs.')
+    parser.add_argument('-p', '--param', action='append', default=[], metavar='KEY=VALUE', help='Parameter of the filter. Ex: -p adjust=10')
+    parser.add_argument('-e', '--encode', action='append', default=[], metavar='KEY=VALUE', help='Encoder setting. Ex: -e quality=85 -e progressive=true')
+    parser.add_argument('--box', metavar='LEFT,TOP,RIGHT,BOTTOM', help='Filter only this region. Ex: --box 10,20,200,180')
+    parser.add_argument('--mask', help='Image of the same size, filter only where it is not black.')
+    parser.add_argument('--widths', metavar='WIDTH,...', help='Filter once and save every width, photo_800.jpg. Ex: --widths 1600,800,400')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of images processed in parallel.')
+    parser.add_argument('--queue', metavar='DIR', help='Shared directory of a batch drained by workers on several machines. '
+                        'With name and inputs it is created, alone the worker joins it.')
+    parser.add_argument('--lease', type=float, default=300.0, help='Seconds a queue claim lasts without being renewed.')
+    parser.add_argument('--chunk', type=int, default=16, help='Images claimed at a time from the queue.')
+    parser.add_argument('--memory', metavar='SIZE', help='Memory shared by the jobs, images too large are filtered in strips. '
+                        'Ex: --memory 8G. Default: three quarters of the physical memory, 0 -> no limit.')
+    parser.add_argument('-f', '--format', help='Output format extension. Ex: png, jpg.')
+    parser.add_argument('--checkpoint', metavar='FILE', help='Record every finished output with checksums, a run stopped '
+                        'resumes skipping the outputs done with the same source, filter and settings.')
+    parser.add_argument('--force', action='store_true', help='Rewrite outputs already up to date.')
+    parser.add_argument('-l', '--list', action='store_true', help='List filters and presets.')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('Filters: ' + ', '.join(imfilters.FILTERS))
+        print('Presets: ' + ', '.join(imfilters.PRESETS))
+        return 0
+
+    if args.queue and args.checkpoint:
+        parser.error('checkpoint can not be used with queue')
+    if args.queue and not args.name:
+        return _drain_queue(args.queue, args.lease, args.jobs)
+    if not args.name or not args.inputs:
+        parser.error('name and inputs are required')
+    if args.name not in imfilters.FILTERS and args.name not in imfilters.PRESETS:
+        parser.error(f'filter -> {args.name} not applicable')
+
+    params = {}
+    for item in args.param:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f'parameter -> {item} must be KEY=VALUE')
+        params[key] = _parse_value(value)
+
+    options = {}
+    for item in args.encode:
+        key, sep, value = item.partition('=')
+        if not sep or key not in imfilters.ENCODER_OPTIONS:
+            parser.error(f'encoder setting -> {item} must be KEY=VALUE, KEY in ' + ', '.join(imfilters.ENCODER_OPTIONS))
+        options[key] = _parse_value(value)
+
+    region = {}
+    if args.box:
+        box = _parse_value(args.box)
+        if not isinstance(box, tuple) or len(box) != 4 or not all(isinstance(v, int) for v in box):
+            parser.error(f'box -> {args.box} must be LEFT,TOP,RIGHT,BOTTOM')
+        region['box'] = box
+    if args.mask:
+        region['mask'] = args.mask
+
+    widths = None
+    if args.widths:
+        widths = _parse_value(args.widths)
+        widths = widths if isinstance(widths, tuple) else (widths,)
+        if not all(isinstance(v, int) and v > 0 for v in widths):
+            parser.error(f'widths -> {args.widths} must be WIDTH,...')
+        if region:
+            parser.error('widths can not be used with box or mask')
+
+    jobs = _jobs(args.inputs, args.output, args.name, args.format)
+    if args.queue:
+        if args.chunk < 1:
+            parser.error(f'chunk -> {args.chunk} must be at least 1')
+        if region or widths:
+            parser.error('queue can not be used with box, mask or widths')
+        items = [(os.path.abspath(src), os.path.abspath(dst)) for src, dst in jobs]
+        IMJobQueue.create(args.queue, args.name, items, params, options, args.chunk)
+        return _drain_queue(args.queue, args.lease, args.jobs)
+    checkpoint = IMCheckpoint(args.checkpoint) if args.checkpoint else None
+    key = _key(name=args.name, params=params, options=options, region=region, widths=widths, format=args.format)
+    if checkpoint:
+        pending = [(src, dst) for src, dst in jobs if args.force or not checkpoint.done(dst, key, _digest(src))]
+    else:
+        pending = [
+            (src, dst) for src, dst in jobs
+            if args.force or not all(_up_to_date(src, output) for output in _outputs(dst, widths))
+        ]
+    skipped = len(jobs) - len(pending)
+    work = _checked if checkpoint else _apply
+
+    try:
+        budget = IMBudget(args.memory, args.jobs)
+    except ValueError:
+        parser.error(f'memory -> {args.memory} must be a size. Ex: 8G, 512M')
+
+    done = failed = pixels = 0
+    start = time.perf_counter()
+
+    def finish(src, dst, result=None, error=None):
+        nonlocal done, failed, pixels
+        if error is None:
+            pixels += result[0] if checkpoint else result
+            done += 1
+        else:
+            failed += 1
+            print(f'{src}: {error}', file=sys.stderr)
+        if checkpoint:
+            _, source, outputs = result if error is None else (0, None, None)
+            checkpoint.record(src, dst, key, source, outputs, None if error is None else str(error))
+
+    # Every job is estimated from the header of its image, the animations, regions and widths are not tiled.
+    planned = deque()
+    for src, dst in pending:
+        try:
+            tiled, nbytes = budget.plan(src, args.name)
+        except Exception:
+            tiled, nbytes = False, 0
+        planned.append((src, dst, tiled and not (region or widths), nbytes))
+
+    if args.jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {}
+            while planned or futures:
+                while planned and len(futures) < args.jobs and budget.acquire(planned[0][3], timeout=0):
+                    src, dst, tiled, nbytes = planned.popleft()
+                    futures[executor.submit(work, args.name, src, dst, params, options, region, widths, tiled)] = (src, dst, nbytes)
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    src, dst, nbytes = futures.pop(future)
+                    budget.release(nbytes)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        finish(src, dst, error=e)
+                    else:
+                        finish(src, dst, result)
+    else:
+        for src, dst, tiled, _ in planned:
+            try:
+                result = work(args.name, src, dst, params, options, region, widths, tiled)
+            except Exception as e:
+                finish(src, dst, error=e)
+            else:
+                finish(src, dst, result)
+    if checkpoint:
+        checkpoint.close()
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed else 0.0
+    mp_rate = pixels / 1e6 / elapsed if elapsed else 0.0
+    print(f'{done} images in {elapsed:.2f}s ({rate:.2f} images/sec, {mp_rate:.2f} MP/sec), {skipped} up to date, {failed} failed')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
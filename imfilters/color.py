@@ -0,0 +1,515 @@
+#
+# Color filters and color space conversions
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import math
+
+import numpy as np
+from PIL import Image
+
+from imfilters.io import IMBuffer, IMStats, _encode, _open, _output, _pixels, _planes, _save, _store, _target
+from imfilters.point import _fixed, _point
+
+def _hsv(px):
+    '''
+    Function responsible for the hue, saturation and value of a block of pixels, the steps of IMRgbToHsv.
+    '''
+    px = px.astype(np.float64)
+    r, g, b = px[..., 0], px[..., 1], px[..., 2]
+
+    maximo = px.max(axis=2)
+    minimo = px.min(axis=2)
+    d = maximo - minimo
+    safe = np.where(d == 0, 1, d)
+
+    s = np.where(maximo == 0, 0, d / np.where(maximo == 0, 1, maximo))
+    h = np.select(
+        [d == 0, maximo == r, maximo == g],
+        [0, (g - b) / safe + np.where(g < b, 6, 0), (b - r) / safe + 2],
+        (r - g) / safe + 4,
+    ) / 6
+    return np.stack([h, s, maximo], axis=2)
+
+class IMNormalize:
+    '''
+    Class responsible for normalized images.
+    : param image: Image to be applied to the filter.
+    : param threads: Accepted as in the other filters, OpenCV splits the work on its own threads.
+    : param out: IMBuffer, NumPy RGB array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        import cv2
+        out = _output(image, out, inplace)
+        if isinstance(image, str):
+            im = cv2.imread(image)
+            img_to_yuv = cv2.cvtColor(im,cv2.COLOR_BGR2YUV)
+        else:
+            src = _open(image)
+            if isinstance(src, IMStats):
+                img_to_yuv = src.yuv.copy()
+            elif isinstance(src, IMBuffer) and src.order == 'BGR':
+                img_to_yuv = cv2.cvtColor(src.bgr, cv2.COLOR_BGR2YUV)
+            else:
+                img_to_yuv = cv2.cvtColor(_pixels(src), cv2.COLOR_RGB2YUV)
+        img_to_yuv[:,:,0] = cv2.equalizeHist(img_to_yuv[:,:,0])
+
+        if isinstance(out, np.ndarray):
+            out = IMBuffer(out)
+        if isinstance(out, IMBuffer) and out.array.shape[2] == 3 and out.array.flags.c_contiguous:
+            # OpenCV writes straight into the buffer in its channel order, the result is kept as BGR view.
+            _target(out, img_to_yuv.shape)
+            cv2.cvtColor(img_to_yuv, cv2.COLOR_YUV2BGR if out.order == 'BGR' else cv2.COLOR_YUV2RGB, dst=out.array)
+            self.im_result = out.bgr
+        else:
+            self.im_result = cv2.cvtColor(img_to_yuv, cv2.COLOR_YUV2BGR)
+            if out is not None:
+                _store(self.im_result[:, :, ::-1], out)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        Without format and settings a file is written by OpenCV, otherwise by the shared encoder.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        if isinstance(path, str) and format is None and not params:
+            import cv2
+            cv2.imwrite(path,self.im_result)
+        else:
+            _save(Image.fromarray(self.im_result[:, :, ::-1]), path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(Image.fromarray(self.im_result[:, :, ::-1]), format, **params)
+
+class IMSaturation:
+    '''
+    Class responsible for applying the saturation adjustment filter.
+    : param image: Image to be applied to the filter.
+    : param adjust: Adjustment level.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=10, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        self.new_img = _point(self.img, self._kernel, threads, _output(image, out, inplace), _planes(self.img, 'maximum'))
+
+    def _kernel(self, px, maximo=None):
+        # px + (maximo - px) * adj in fixed point with int32 accumulators, one channel at a time.
+        # The channel equal to the maximum keeps its value, as (maximo - px) is zero.
+        adj = self.adjust * -0.01
+        if px.dtype == np.float32:
+            result = np.maximum(np.maximum(px[..., 0], px[..., 1]), px[..., 2])[..., None] - px
+            result *= np.float32(adj)
+            result += px
+            return result
+        shift = max(0, min(16, int(math.log2((2 ** 31 - 1) / (255 * max(1.0, abs(adj) + 1))))))
+        fixed = int(round(adj * (1 << shift)))
+
+        if maximo is None:
+            maximo = np.maximum(np.maximum(px[..., 0], px[..., 1]), px[..., 2])
+        result = np.empty(px.shape, np.uint8)
+        acc = np.empty(px.shape[:2], np.int32)
+        tmp = np.empty(px.shape[:2], np.int32)
+        for c in range(3):
+            np.subtract(maximo, px[..., c], out=acc, dtype=np.int32)
+            acc *= fixed
+            np.left_shift(px[..., c], shift, out=tmp, dtype=np.int32)
+            acc += tmp
+            acc >>= shift
+            np.clip(acc, 0, 255, out=acc)
+            result[..., c] = acc
+        return result
+    
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMVibrance:
+    '''
+    Class responsible for applying the vibrance filter.
+    : param image: Image to be applied to the filter.
+    : param adjust: Adjustment level.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=50, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        self.new_img = _point(self.img, self._kernel, threads, _output(image, out, inplace), _planes(self.img, 'maximum', 'sum'))
+
+    def _kernel(self, px, maximo=None, total=None):
+        adj = self.adjust * -1
+
+        if maximo is None:
+            mx = px.max(axis=2, keepdims=True).astype(np.float64)
+            avg = px.sum(axis=2, keepdims=True, dtype=np.float64) / 3
+        else:
+            mx = maximo[..., None].astype(np.float64)
+            avg = total[..., None].astype(np.float64) / 3
+        amt = ((np.abs(mx - avg) * 2 / 255) * adj) / 100
+
+        return px + (mx - px) * amt
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMLuminance:
+    '''
+    Class responsible for return luminance.
+    '''
+
+    def __init__(self, rgb:tuple):
+        self.rgb = rgb
+        self.lumin = int((0.299 * self.rgb[0]) + (0.587 * self.rgb[1]) + (0.114 * self.rgb[2]))
+    
+class IMRgbToHsv:
+    '''
+    Class responsible for convert rgb to hsv.
+    '''
+
+    def __init__(self, rgb:tuple):
+        self.rgb = rgb
+
+        r = self.rgb[0]
+        g = self.rgb[1]
+        b = self.rgb[2]
+
+        maximo = max(r, g, b)
+        minimo = min(r, g, b)
+
+        v = maximo
+        d = maximo - minimo
+
+        s = 0 if maximo == 0 else d / maximo
+
+        if maximo == minimo:
+            h = 0
+        else:
+            if maximo == r:
+                if g < b:
+                    e = 6
+                else:
+                    e = 0
+                h = (g - b) / d + e
+            elif maximo == g:
+                h = (b - r) / d + 2
+            elif maximo == b:
+                h = (r - g) / d + 4
+        h /= 6
+        self.hsv = (h, s, v)
+
+class IMRgbToHsl:
+    '''
+    Class responsible for convert rgb to hsl.
+    '''
+
+    def __init__(self, rgb:tuple):
+        self.rgb = rgb
+
+        r = self.rgb[0]
+        g = self.rgb[1]
+        b = self.rgb[2]
+
+        r /= 255
+        g /= 255
+        b /= 255
+
+        maximo = max(r, g, b)
+        minimo = min(r, g, b)
+
+        l = (maximo + minimo) / 2
+
+        if maximo == minimo:
+            h = 0
+            s = 0
+        else:
+            d = maximo - minimo
+
+            if l > 0.5:
+                s = d / (2 - maximo - minimo)
+            else:
+                s = d / (maximo - minimo)
+            
+            # Calculo do h
+            if maximo == r:
+                h = (g - b) / d + (6 if g < b else 0)
+            elif maximo == g:
+                h = (b - r) / d + 2
+            elif maximo == b:
+                h = (r - g) / d + 4
+
+            h /= 6
+
+        self.hsl = (h, s, l)
+
+class IMHsvToRgb:
+    '''
+    Class responsible for convert hsv to rgb.
+    '''
+
+    def __init__(self, hsv:tuple):
+        h = hsv[0]
+        s = hsv[1]
+        v = hsv[2]
+
+        i = math.floor(h * 6)
+        f = h * 6 - i
+        p = v * (1 - s)
+        q = v * (1 - f * s)
+        t = v * (1 - (1 - f) * s)
+        if i % 6 == 0:
+            r = v
+            g = t
+            b = p
+        elif i % 6 == 1:
+            r = q
+            g = v
+            b = p
+        elif i % 6 == 2:
+            r = p
+            g = v
+            b = t
+        elif i % 6 == 3:
+            r = p
+            g = q
+            b = v
+        elif i % 6 == 4:
+            r = t
+            g = p
+            b = v
+        elif i % 6 == 5:
+            r = v
+            g = p
+            b = q
+
+        red = math.floor(r * 255)
+        green = math.floor(g * 255)
+        blue = math.floor(b * 255)
+
+        self.rgb = (red, green, blue)
+
+class IMSepia:
+    '''
+    Class responsible for applying the sepia filter.
+    : param image: Image to be applied to the filter.
+    : param adjust: Adjustment level.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=100, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+        
+        self.adjust /= 100
+
+        im = _open(self.image)
+
+        a = self.adjust
+        self.matrix = np.array([
+            [1 - (0.607 * a), 0.769 * a, 0.189 * a],
+            [0.349 * a, 1 - (0.314 * a), 0.168 * a],
+            [0.272 * a, 0.534 * a, 1 - (0.869 * a)],
+        ])
+
+        self.im_final = _point(im, _fixed(self.matrix), threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.im_final, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.im_final, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        return self.im_final.show()
+
+class IMHueRotate:
+    '''
+    Class responsible for applying filter hue rotate.
+    :param image: Image to be applied to the filter.
+    :param degreeus: degreeus to be applied for rotate hue
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+    def __init__(self, image:str, degreeus:int = 50, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.im = _open(self.image)
+
+        self.degreeus = degreeus
+
+        if self.degreeus < 0:
+            self.degreeus = 0
+        elif self.degreeus > 360:
+            self.degreeus = 360
+        else:
+            self.degreeus = degreeus
+
+        u = math.cos(degreeus * math.pi / 180)
+        w = math.sin(degreeus * math.pi / 180)
+
+        self.matrix = np.array([
+            [0.299 + 0.701 * u + 0.168 * w, 0.587 - 0.587 * u + 0.330 * w, 0.114 - 0.114 * u - 0.497 * w],
+            [0.299 - 0.299 * u - 0.328 * w, 0.587 + 0.413 * u + 0.035 * w, 0.114 - 0.114 * u + 0.292 * w],
+            [0.299 - 0.3 * u + 1.25 * w, 0.587 - 0.588 * u - 1.05 * w, 0.114 + 0.886 * u - 0.203 * w],
+        ])
+
+        self.new_im = _point(self.im, _fixed(self.matrix), threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMHueSaturation:
+    '''
+    Class responsible for applying filter hue saturation.
+    :param image: Image to be applied to the filter.
+    :param degreeus: degreeus to be applied for saturaion hue
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+    def __init__(self, image:str, adjust:int = 10, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.im = _open(self.image)
+
+        self.adjust = adjust
+
+        self.new_im = _point(self.im, self._kernel, threads, _output(image, out, inplace), _planes(self.im, 'hsv'))
+
+    def _kernel(self, px, hsv=None):
+        # Same steps of IMRgbToHsv and IMHsvToRgb over the whole band.
+        if hsv is None:
+            hsv = _hsv(px)
+        h = hsv[..., 0]
+        s = hsv[..., 1] * self.adjust
+        v = hsv[..., 2]
+
+        i = np.floor(h * 6)
+        f = h * 6 - i
+        p = v * (1 - s)
+        q = v * (1 - f * s)
+        t = v * (1 - (1 - f) * s)
+        i = i.astype(np.int64) % 6
+
+        red = np.choose(i, [v, q, p, p, t, v])
+        green = np.choose(i, [t, v, v, q, p, p])
+        blue = np.choose(i, [p, p, t, v, v, q])
+        return np.floor(np.stack([red, green, blue], axis=2) * 255)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
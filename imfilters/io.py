@@ -0,0 +1,375 @@
+#
+# Pixel containers, decoding and encoding of the images
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+class IMBuffer:
+    '''
+    Class responsible for holding the pixels of an image shared by all the filters.
+    It keeps one uint8 buffer and records its channel order, ex: 'RGB' for Pillow, 'BGR' for OpenCV.
+    The rgb and bgr views and the NumPy interface never copy, swapping the order is a strided view.
+    With 4 channels (RGBX) the PIL image is also a view of the buffer.
+    : param array: uint8 array (rows, columns, 3) or (rows, columns, 4). Used as it is, with no copy.
+    : param order: Channel order of the array. Ex: 'RGB', 'BGR'.
+    '''
+
+    def __init__(self, array, order:str='RGB'):
+        if not isinstance(array, np.ndarray) or array.dtype != np.uint8 or array.ndim != 3 or array.shape[2] not in (3, 4):
+            raise ValueError('Buffer must be uint8 with shape (rows, columns, 3) or (rows, columns, 4).')
+        if order not in ('RGB', 'BGR'):
+            raise ValueError(f'Order -> {order} not applicable.')
+        self.array = array
+        self.order = order
+
+    @classmethod
+    def new(cls, size:tuple, channels:int=4):
+        '''
+        Method responsible for allocating a buffer.
+        : param size: Size (width, height).
+        : param channels: 4 -> RGBX, shared with the PIL image. 3 -> RGB.
+        '''
+        array = np.zeros((size[1], size[0], channels), np.uint8)
+        if channels == 4:
+            array[..., 3] = 255
+        return cls(array)
+
+    @classmethod
+    def open(cls, image, channels:int=4):
+        '''
+        Method responsible for decoding an image into a new buffer.
+        : param image: Path, binary file object, bytes or PIL image.
+        : param channels: 4 -> RGBX, shared with the PIL image. 3 -> RGB.
+        '''
+        image = _open(image)
+        if isinstance(image, IMBuffer):
+            return image
+        if isinstance(image, np.ndarray):
+            return cls(image)
+        return cls(np.array(image.convert('RGBX' if channels == 4 else 'RGB')))
+
+    @property
+    def size(self):
+        return (self.array.shape[1], self.array.shape[0])
+
+    @property
+    def rgb(self):
+        '''
+        NumPy view (rows, columns, 3) in RGB order.
+        '''
+        return self.array[..., :3] if self.order == 'RGB' else self.array[..., 2::-1]
+
+    @property
+    def bgr(self):
+        '''
+        NumPy view (rows, columns, 3) in BGR order, as used by OpenCV.
+        '''
+        return self.array[..., 2::-1] if self.order == 'RGB' else self.array[..., :3]
+
+    @property
+    def __array_interface__(self):
+        return self.rgb.__array_interface__
+
+    @property
+    def image(self):
+        '''
+        PIL image of the buffer. For 4 channels RGB buffers it shares the memory, otherwise it is a copy.
+        '''
+        if self.order == 'RGB' and self.array.shape[2] == 4 and self.array.flags.c_contiguous:
+            im = Image.frombuffer('RGBX', self.size, self.array, 'raw', 'RGBX', 0, 1)
+            im.readonly = 0 if self.array.flags.writeable else 1
+            return im
+        return Image.fromarray(self.rgb)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.image.show()
+
+_CHUNK = 1 << 18
+
+class IMStats:
+    '''
+    Class responsible for the analysis of one image shared by the filters.
+    The derived planes and histograms are computed block by block on the first use and kept,
+    so the filters given the same IMStats as image read them instead of computing them again.
+    IMGray, IMThreshold, IMSaturation, IMVibrance, IMLumios, IMPredominance, IMHueSaturation and IMNormalize use them.
+    The pixels must not change while the statistics are used, the filters do not accept it with inplace.
+    Ex: stats = IMStats('photo.jpg'); IMGray(stats).save('gray.jpg'); IMThreshold(stats, 100).save('bw.png')
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy uint8 RGB array.
+    '''
+
+    def __init__(self, image):
+        self.pixels = _pixels(_open(image))
+        if self.pixels.dtype != np.uint8:
+            raise ValueError('IMStats requires uint8 pixels.')
+        self._planes = {}
+
+    @property
+    def size(self):
+        return (self.pixels.shape[1], self.pixels.shape[0])
+
+    def _plane(self, name:str, kernel, dtype, channels:int=None):
+        plane = self._planes.get(name)
+        if plane is None:
+            src = self.pixels
+            plane = np.empty(src.shape[:2] if channels is None else src.shape[:2] + (channels,), dtype)
+            rows = max(1, _CHUNK // max(1, src.shape[1]))
+            for start in range(0, src.shape[0], rows):
+                plane[start:start + rows] = kernel(src[start:start + rows])
+            plane.flags.writeable = False
+            self._planes[name] = plane
+        return plane
+
+    @property
+    def luma(self):
+        '''
+        Luminance of IMLuminance, 0.299 * red + 0.587 * green + 0.114 * blue truncated, uint8 (rows, columns).
+        '''
+        return self._plane('luma', lambda px: np.clip((0.299 * px[..., 0]) + (0.587 * px[..., 1]) + (0.114 * px[..., 2]), 0, 255), np.uint8)
+
+    @property
+    def sum(self):
+        '''
+        Sum of the channels, uint16 (rows, columns).
+        '''
+        return self._plane('sum', lambda px: px.sum(axis=2, dtype=np.uint16), np.uint16)
+
+    @property
+    def mean(self):
+        '''
+        Mean of the channels truncated, uint8 (rows, columns).
+        '''
+        return self._plane('mean', lambda px: px.sum(axis=2, dtype=np.uint16) // 3, np.uint8)
+
+    @property
+    def maximum(self):
+        '''
+        Largest channel, uint8 (rows, columns).
+        '''
+        return self._plane('maximum', lambda px: np.maximum(np.maximum(px[..., 0], px[..., 1]), px[..., 2]), np.uint8)
+
+    @property
+    def minimum(self):
+        '''
+        Smallest channel, uint8 (rows, columns).
+        '''
+        return self._plane('minimum', lambda px: np.minimum(np.minimum(px[..., 0], px[..., 1]), px[..., 2]), np.uint8)
+
+    @property
+    def hsv(self):
+        '''
+        Hue, saturation and value of IMRgbToHsv, float64 (rows, columns, 3). Hue and saturation in 0..1, value in 0..255.
+        '''
+        from imfilters.color import _hsv
+        return self._plane('hsv', _hsv, np.float64, 3)
+
+    @property
+    def yuv(self):
+        '''
+        YUV planes of OpenCV, uint8 (rows, columns, 3).
+        '''
+        import cv2
+        return self._plane('yuv', lambda px: cv2.cvtColor(np.ascontiguousarray(px), cv2.COLOR_RGB2YUV), np.uint8, 3)
+
+    @property
+    def histogram(self):
+        '''
+        Histogram of every channel, int64 (3, 256).
+        '''
+        if 'histogram' not in self._planes:
+            import cv2
+            px = np.ascontiguousarray(self.pixels)
+            histogram = np.stack([cv2.calcHist([px], [c], None, [256], [0, 256]).ravel() for c in range(3)]).astype(np.int64)
+            histogram.flags.writeable = False
+            self._planes['histogram'] = histogram
+        return self._planes['histogram']
+
+    @property
+    def luma_histogram(self):
+        '''
+        Histogram of the luminance, int64 (256,).
+        '''
+        if 'luma_histogram' not in self._planes:
+            import cv2
+            histogram = cv2.calcHist([self.luma], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+            histogram.flags.writeable = False
+            self._planes['luma_histogram'] = histogram
+        return self._planes['luma_histogram']
+
+def _planes(image, *names):
+    '''
+    Function responsible for the planes of IMStats read by a kernel, none for other images.
+    '''
+    return tuple(getattr(image, name) for name in names) if isinstance(image, IMStats) else ()
+
+def _open(image):
+    '''
+    Function responsible for opening the image to be filtered.
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer, IMStats or NumPy RGB array.
+    '''
+    if isinstance(image, (Image.Image, IMBuffer, IMStats, np.ndarray)):
+        return image
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(image)
+    return Image.open(image)
+
+def _pil(image):
+    '''
+    Function responsible for returning the image as PIL image.
+    '''
+    if isinstance(image, IMBuffer):
+        return image.image
+    if isinstance(image, IMStats):
+        return Image.fromarray(image.pixels)
+    return Image.fromarray(image) if isinstance(image, np.ndarray) else image
+
+def _pixels(image):
+    '''
+    Function responsible for returning the pixels of the image as uint8 array (rows, columns, 3).
+    NumPy arrays and IMBuffer are used as they are, with no copy. float32 arrays are the intermediates of _chain.
+    '''
+    if isinstance(image, (IMBuffer, IMStats)):
+        return image.rgb if isinstance(image, IMBuffer) else image.pixels
+    if isinstance(image, np.ndarray):
+        if image.dtype not in (np.uint8, np.float32) or image.ndim != 3 or image.shape[2] != 3:
+            raise ValueError('Image array must be uint8 or float32 with shape (rows, columns, 3).')
+        return image
+    return np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+
+def _output(image, out, inplace:bool):
+    '''
+    Function responsible for choosing where the filter writes its result.
+    : param image: Source image as given to the filter, before _open, returned when inplace.
+        A path or bytes can not be written over: the image opened from them is dropped with the filter.
+    : param out: IMBuffer, NumPy array or PIL image of the same size, or None for a new image.
+    '''
+    if inplace:
+        if not isinstance(image, (Image.Image, IMBuffer, np.ndarray)):
+            raise ValueError('inplace requires a PIL image, IMBuffer or NumPy array as image.')
+        return image
+    return out
+
+def _target(out, shape:tuple, dtype=np.uint8):
+    '''
+    Function responsible for returning the array the kernels write into.
+    : param dtype: uint8, or float32 for the intermediates of _chain.
+    '''
+    if isinstance(out, IMBuffer):
+        out = out.rgb
+    if isinstance(out, np.ndarray):
+        if out.shape != shape or out.dtype != dtype:
+            raise ValueError(f'out must be {np.dtype(dtype).name} with shape {shape}.')
+        return out
+    if isinstance(out, Image.Image) and out.size != (shape[1], shape[0]):
+        raise ValueError(f'out must have size {(shape[1], shape[0])}.')
+    return np.empty(shape, dtype)
+
+def _store(result, out):
+    '''
+    Function responsible for delivering the result of a filter.
+    : param result: uint8 array (rows, columns, 3) or PIL image with the result.
+    : param out: IMBuffer, NumPy array or PIL image receiving the result, or None.
+    Returns the image kept by the filter: a PIL image, or an IMBuffer for NumPy outputs.
+    float32 results, the intermediates of _chain, are kept as arrays.
+    '''
+    if isinstance(result, np.ndarray) and result.dtype == np.float32:
+        if out is None or out is result:
+            return result
+        _target(out, result.shape, np.float32)[...] = result
+        return out
+    if out is None:
+        if isinstance(result, Image.Image):
+            return result.convert('RGB') if result.mode == 'RGBX' else result
+        return Image.fromarray(result)
+    if isinstance(out, np.ndarray):
+        out = IMBuffer(out)
+    if isinstance(out, IMBuffer):
+        if isinstance(result, Image.Image):
+            _target(out, (result.size[1], result.size[0], 3))
+            view = out.image
+            if view.mode == 'RGBX':
+                view.paste(result)
+                return out
+            result = _pixels(result)
+        if not np.may_share_memory(result, out.array):
+            _target(out, result.shape)[...] = result
+        return out
+    if result is not out:
+        if isinstance(result, Image.Image):
+            _target(out, (result.size[1], result.size[0], 3))
+            out.paste(result)
+        elif out.mode == 'RGB':
+            _target(out, result.shape)
+            out.frombytes(np.ascontiguousarray(result))
+        else:
+            out.paste(Image.fromarray(result))
+    return out
+
+ENCODER_OPTIONS = ('quality', 'subsampling', 'optimize', 'progressive', 'compress_level', 'method')
+
+def _format(path, format:str=None):
+    '''
+    Function responsible for the name of the format used by Pillow.
+    Ex: ('photo.jpg', None) -> 'JPEG', (stream, None) -> 'PNG', (path, 'jpg') -> 'JPEG'.
+    '''
+    if format is None:
+        if not isinstance(path, (str, os.PathLike)):
+            return 'PNG'
+        return Image.registered_extensions().get(os.path.splitext(path)[1].lower())
+    format = format.upper()
+    return 'JPEG' if format == 'JPG' else format
+
+def _save(image, path, format:str=None, **params):
+    '''
+    Function responsible for encoding the image into a file or binary stream.
+    : param image: PIL image or IMBuffer.
+    : param path: Name of the file or binary object with write.
+    : param format: Format of the image. Taken from the extension of the file when not informed, 'PNG' for streams.
+    : param params: Encoder settings passed to Pillow. Ex: quality=85 (JPEG, WEBP), subsampling=0 -> 4:4:4 (JPEG),
+        optimize=True (JPEG, PNG), progressive=True (JPEG), compress_level=1 -> fast (PNG), method=6 -> small (WEBP).
+    '''
+    if isinstance(image, IMBuffer):
+        image = image.image
+    format = _format(path, format)
+    if image.mode == 'RGBX' and format != 'JPEG':
+        image = image.convert('RGB')
+    elif format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P', 'PA'):
+        image = image.convert('RGB')
+    image.save(path, format, **params)
+
+def _encode(image, format:str='PNG', **params):
+    '''
+    Function responsible for returning the image encoded in bytes.
+    : param image: PIL image or IMBuffer.
+    : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+    : param params: Encoder settings, as in _save.
+    '''
+    buffer = io.BytesIO()
+    _save(image, buffer, format, **params)
+    return buffer.getvalue()
@@ -0,0 +1,298 @@
+#
+# Batch of jobs drained by workers on several machines through a shared directory
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import functools
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+def _write(path:str, data:dict):
+    '''
+    Function responsible for writing a JSON file atomically, the readers see the old file or the new one.
+    '''
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _read(path:str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _part(dst:str, worker:str):
+    '''
+    Function responsible for the temporary name of an output, in the same folder and with the same extension.
+    '''
+    base, ext = os.path.splitext(dst)
+    return f'{base}.{worker}.part{ext}'
+
+class IMJobQueue:
+    '''
+    Class responsible for a batch of filter jobs shared by any number of workers on any number of machines,
+    with no broker: only a manifest and lock files on a shared directory.
+    The manifest, one file with the filter and the jobs written once, is split in chunks. A worker claims
+    a chunk creating its lease file exclusively, keeps the lease alive while it works, and marks the chunk
+    done writing its result file, atomically.
+    A lease not renewed for lease seconds belongs to a worker that crashed, another worker takes the chunk.
+    Outputs are written to a temporary file named after the worker and renamed, so a chunk run twice leaves
+    the same files, and the worker taking over a chunk removes the temporary files of the one that crashed.
+    The clocks of the machines must agree within a fraction of lease.
+    Ex: IMJobQueue.create('/mnt/jobs', 'Clarendon', [('a.jpg', 'out/a.jpg'), ('b.jpg', 'out/b.jpg')])
+        IMJobQueue('/mnt/jobs').run()   # on every machine, as many times as wanted
+    : param folder: Shared directory of the queue.
+    : param lease: Seconds a claim lasts without being renewed.
+    : param worker: Name of this worker. Ex: 'host-1234-1a2b'. Made of host, process and a random part when not informed.
+    '''
+
+    def __init__(self, folder:str, lease:float=300.0, worker:str=None):
+        self.folder = folder
+        self.lease = lease
+        self.worker = worker or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+        try:
+            with open(os.path.join(folder, 'manifest.jsonl')) as f:
+                header = json.loads(f.readline())
+                self.items = [tuple(json.loads(line)) for line in f if line.strip()]
+        except FileNotFoundError:
+            raise FileNotFoundError(f'Queue -> {folder} not found.') from None
+        self.name = header['name']
+        self.params = header['params']
+        self.options = header['options']
+        self.chunk = header['chunk']
+        self.chunks = -(-len(self.items) // self.chunk)
+        self._lost = set()
+
+    @classmethod
+    def create(cls, folder:str, name:str, items, params:dict=None, options:dict=None, chunk:int=16):
+        '''
+        Method responsible for writing the manifest of a new queue. Returns False when the queue already exists,
+        so every machine may run it and only the first one writes.
+        : param folder: Shared directory of the queue.
+        : param name: Name of the filter or preset. Ex: 'Clarendon'.
+        : param items: Sequence of (source, destination) paths, as seen by all the machines.
+        : param params: Parameters of the filter.
+        : param options: Encoder settings. Ex: {'quality': 85}.
+        : param chunk: Jobs claimed at a time.
+        '''
+        if chunk < 1:
+            raise ValueError(f'Chunk -> {chunk} must be at least 1.')
+        for sub in ('leases', 'done'):
+            os.makedirs(os.path.join(folder, sub), exist_ok=True)
+        manifest = os.path.join(folder, 'manifest.jsonl')
+        if os.path.exists(manifest):
+            return False
+        tmp = f'{manifest}.{uuid.uuid4().hex}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(json.dumps({'name': name, 'params': params or {}, 'options': options or {}, 'chunk': chunk}) + '\n')
+            for src, dst in items:
+                f.write(json.dumps([src, dst]) + '\n')
+        try:
+            # The link fails when another machine created the manifest first.
+            os.link(tmp, manifest)
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(tmp)
+        return True
+
+    def _lease(self, index:int):
+        return os.path.join(self.folder, 'leases', str(index))
+
+    def _done(self, index:int):
+        return os.path.join(self.folder, 'done', f'{index}.json')
+
+    def _take(self, index:int):
+        try:
+            fd = os.open(self._lease(index), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.worker)
+        return True
+
+    def _expired(self, index:int):
+        try:
+            return time.time() - os.stat(self._lease(index)).st_mtime > self.lease
+        except FileNotFoundError:
+            return False
+
+    def claim(self):
+        '''
+        Method responsible for claiming a chunk not done and not leased, or whose lease expired.
+        Returns the index of the chunk, or None when there is none to claim now.
+        '''
+        start = random.randrange(self.chunks) if self.chunks else 0
+        for index in [(start + i) % self.chunks for i in range(self.chunks)]:
+            if os.path.exists(self._done(index)):
+                continue
+            if self._take(index):
+                if self._fresh(index):
+                    return index
+                continue
+            if self._expired(index):
+                # Only one of the workers renaming the expired lease succeeds.
+                stale = f'{self._lease(index)}.{self.worker}'
+                try:
+                    os.rename(self._lease(index), stale)
+                except FileNotFoundError:
+                    continue
+                if time.time() - os.stat(stale).st_mtime <= self.lease:
+                    # Another worker replaced the expired lease before the rename, its fresh lease goes back.
+                    try:
+                        os.link(stale, self._lease(index))
+                    except FileExistsError:
+                        pass
+                    os.unlink(stale)
+                    continue
+                with open(stale) as f:
+                    crashed = f.read()
+                os.unlink(stale)
+                for _, dst in self.items[index * self.chunk:(index + 1) * self.chunk]:
+                    if crashed and os.path.exists(_part(dst, crashed)):
+                        os.unlink(_part(dst, crashed))
+                if self._take(index) and self._fresh(index):
+                    return index
+        return None
+
+    def _fresh(self, index:int):
+        '''
+        Method responsible for checking a chunk just leased was not done in the meantime: the worker finishing
+        it writes its result and then releases the lease, which a worker checking the result before may take.
+        '''
+        if not os.path.exists(self._done(index)):
+            return True
+        if self._owns(index):
+            os.unlink(self._lease(index))
+        return False
+
+    def _owns(self, index:int):
+        try:
+            with open(self._lease(index)) as f:
+                return f.read() == self.worker
+        except FileNotFoundError:
+            return False
+
+    def renew(self, index:int):
+        '''
+        Method responsible for keeping the claim of a chunk alive. Returns False when the lease was taken by another worker.
+        '''
+        try:
+            if self._owns(index):
+                os.utime(self._lease(index))
+                return True
+        except FileNotFoundError:
+            pass
+        self._lost.add(index)
+        return False
+
+    def complete(self, index:int, result:dict):
+        '''
+        Method responsible for marking a chunk done with its result, and releasing its lease.
+        : param index: Index of the chunk.
+        : param result: Summary of the chunk. Ex: {'done': 16, 'failed': []}.
+        '''
+        _write(self._done(index), dict(result, worker=self.worker, finished=time.time()))
+        if self._owns(index):
+            os.unlink(self._lease(index))
+
+    def status(self):
+        '''
+        Method responsible for returning the number of chunks done, leased, expired and pending.
+        '''
+        done = leased = expired = 0
+        for index in range(self.chunks):
+            if os.path.exists(self._done(index)):
+                done += 1
+            elif os.path.exists(self._lease(index)):
+                leased += 1
+                expired += self._expired(index)
+        return {'chunks': self.chunks, 'jobs': len(self.items), 'done': done, 'leased': leased, 'expired': expired,
+                'pending': self.chunks - done - leased}
+
+    def results(self):
+        '''
+        Method responsible for returning the results of the chunks done, by index.
+        '''
+        results = {index: _read(self._done(index)) for index in range(self.chunks)}
+        return {index: result for index, result in results.items() if result is not None}
+
+    def _item(self, work, src:str, dst:str):
+        folder = os.path.dirname(dst)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        return work(self.name, src, dst, self.params, self.options)
+
+    def run(self, work=None, wait:bool=True, poll:float=1.0):
+        '''
+        Method responsible for claiming and running chunks until the queue is drained.
+        Returns the number of jobs done and failed and the pixels filtered by this worker.
+        : param work: Function work(name, src, dst, params, options) filtering one file and returning its pixels.
+            It writes dst through the temporary file _part(dst, worker), renamed at the end.
+            The function of the command line when not informed.
+        : param wait: Keep waiting for the chunks leased by other workers, to take them if their lease expires.
+        : param poll: Seconds between the checks while waiting.
+        '''
+        if work is None:
+            from imfilters.cli import _apply
+            work = functools.partial(_apply, tag=self.worker)
+        totals = {'done': 0, 'failed': 0, 'pixels': 0}
+        current = [None]
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease / 3):
+                index = current[0]
+                if index is not None:
+                    self.renew(index)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            while True:
+                index = self.claim()
+                if index is None:
+                    status = self.status()
+                    if not wait or status['done'] == status['chunks']:
+                        break
+                    time.sleep(poll)
+                    continue
+                current[0] = index
+                result = {'done': 0, 'failed': [], 'pixels': 0}
+                for src, dst in self.items[index * self.chunk:(index + 1) * self.chunk]:
+                    if index in self._lost:
+                        break
+                    try:
+                        result['pixels'] += self._item(work, src, dst)
+                        result['done'] += 1
+                    except Exception as e:
+                        result['failed'].append([src, str(e)])
+                current[0] = None
+                if index in self._lost:
+                    # Another worker took the chunk over, it writes the result.
+                    continue
+                self.complete(index, result)
+                totals['done'] += result['done']
+                totals['failed'] += len(result['failed'])
+                totals['pixels'] += result['pixels']
+        finally:
+            stop.set()
+            beat.join()
+        return totals
+
+def _drain(folder:str, lease:float):
+    '''
+    Function responsible for running one worker of the queue, in a process of the pool of the command line.
+    '''
+    return IMJobQueue(folder, lease).run()
@@ -0,0 +1,290 @@
+#
+# Chains of filters planned before running: identities dropped, point stages fused, crop and resize moved ahead
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import inspect
+import math
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.shared import IMShared
+
+def _label(name:str, params:dict):
+    return f"{name}({', '.join(f'{key}={value!r}' for key, value in params.items())})"
+
+def _describe(name:str, params:dict):
+    '''
+    Function responsible for what a step reads around every pixel.
+    Returns the halo, None for the whole image, the grid it is anchored on and if it is deterministic.
+    A preset adds the halos of its steps.
+    '''
+    info = imfilters.lookup(name)
+    if info.kind != 'chain':
+        return info.halo(**params), info.grid(**params), info.deterministic
+    halo, grid, deterministic = 0, 1, True
+    for step, step_params in getattr(imfilters, name).steps:
+        step_halo, step_grid, step_deterministic = _describe(step, step_params)
+        if step_halo is None:
+            return None, 1, deterministic and step_deterministic
+        halo += step_halo
+        grid = grid * step_grid // math.gcd(grid, step_grid)
+        deterministic = deterministic and step_deterministic
+    return halo, grid, deterministic
+
+# The 256 levels in the three channels, the lookup table of the identity.
+_LEVELS = np.repeat(np.arange(256, dtype=np.uint8)[None, :, None], 3, axis=2)
+
+def _table(cls, params:dict):
+    '''
+    Function responsible for the lookup table of a channel filter, the filter applied to the 256 levels.
+    '''
+    table = np.empty(_LEVELS.shape, np.uint8)
+    cls(_LEVELS.copy(), out=table, **params)
+    return table
+
+def _identity(name:str, params:dict):
+    '''
+    Function responsible for telling if a stage leaves every level exactly as it is, so it can be dropped.
+    The table of a channel filter is checked level by level, the predicate of the registry is not trusted alone.
+    '''
+    info = imfilters.lookup(name)
+    if not info.is_identity(**params):
+        return False
+    return info.kind != 'channel' or np.array_equal(_table(getattr(imfilters, name), params), _LEVELS)
+
+class IMPipeline:
+    '''
+    Class responsible for applying a chain of filters planned as a whole before running.
+    The planner drops the stages that leave the image exactly as it is, as IMBrightness(adjust=0), and runs
+    consecutive channel, matrix and pixel stages in one pass over the image, block by block, with
+    consecutive lookup tables composed in one. The result of the stages is the same of running them one by one.
+    With an output box or size the crop is moved ahead of the stages, keeping the neighbours read
+    by the spatial ones, and a downscale is moved ahead of the stages working pixel by pixel, so they
+    filter only the pixels kept. Filters reading the whole image, as IMNormalize, stop both.
+    The downscaled result may differ by a few levels from filtering first, tones are averaged before the filters.
+    Ex: pipeline = IMPipeline([('IMContrast', {'adjust': 0}), ('IMBrightness', {'adjust': 10}),
+        ('IMGaussBlur', {'radius': 4}), ('IMSaturation', {'adjust': 20})], size=(800, 600))
+        print(pipeline.explain((6000, 4000))); pipeline.save('photo.jpg', 'photo_small.jpg')
+    : param steps: Sequence of (name, params) of filters or presets. Ex: [('IMHueRotate', {'degreeus': 90})].
+    : param box: Region (left, top, right, bottom) of the result kept. The whole image when not informed.
+    : param size: Size (width, height) of the result, after the box.
+    : param resample: Resampling filter of the resize. Ex: Image.LANCZOS, Image.BILINEAR.
+    : param threads: Number of threads splitting every stage in bands.
+    '''
+
+    def __init__(self, steps=(), box:tuple=None, size:tuple=None, resample:int=Image.LANCZOS, threads:int=None):
+        self.box = tuple(box) if box is not None else None
+        self.size = tuple(size) if size is not None else None
+        self.resample = resample
+        self.threads = threads
+        self.steps = []
+        self._plans = {}
+        for name, params in steps:
+            self.add(name, **params)
+
+    def add(self, name:str, **params):
+        '''
+        Method responsible for appending a stage at the end of the chain.
+        : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+        : param params: Parameters of the filter.
+        '''
+        info = imfilters.lookup(name)
+        if info.kind == 'chain' and params:
+            raise TypeError(f'{name} takes no parameters.')
+        info.validate(params)
+        self.steps.append((name, params))
+        self._plans.clear()
+        return self
+
+    def plan(self, size:tuple=None):
+        '''
+        Method responsible for returning the stages as they run, a list of tuples (operation, description, ...).
+        Operations: 'drop', 'crop', 'resize', 'point' -> fused stages, 'filter' and 'chain'.
+        : param size: Size (width, height) of the source. Without it the box is taken as inside the image.
+        '''
+        size = tuple(size) if size is not None else None
+        if size not in self._plans:
+            self._plans[size] = self._plan(size)
+        return self._plans[size]
+
+    def _plan(self, size):
+        dropped = []
+        stages = []
+        for name, params in self.steps:
+            if _identity(name, params):
+                dropped.append(('drop', f'{_label(name, params)}, identity'))
+            else:
+                stages.append((name, params) + _describe(name, params))
+
+        # Geometry goes right after the last stage reading the whole image.
+        start = max((i + 1 for i, stage in enumerate(stages) if stage[2] is None), default=0)
+        moves = {}
+        region = size
+        if self.box is not None:
+            left, top, right, bottom = self.box
+            margin = sum(stage[2] for stage in stages[start:])
+            grid = 1
+            for stage in stages[start:]:
+                grid = grid * stage[3] // math.gcd(grid, stage[3])
+            outer = [(left - margin) // grid * grid, (top - margin) // grid * grid, right + margin, bottom + margin]
+            outer = [max(0, outer[0]), max(0, outer[1])] + outer[2:]
+            if size is not None:
+                outer[2:] = min(outer[2], size[0]), min(outer[3], size[1])
+            outer = tuple(outer)
+            moved = f', moved ahead of {len(stages) - start} stage(s)' if start < len(stages) else ''
+            moves.setdefault(start, []).append(('crop', f'{outer}{moved}', outer))
+            if outer != self.box:
+                inner = (left - outer[0], top - outer[1], right - outer[0], bottom - outer[1])
+                end = max((i + 1 for i, stage in enumerate(stages) if i >= start and stage[2]), default=start)
+                moves.setdefault(end, []).append(('crop', f'{inner}, the neighbours kept for {margin} px dropped', inner))
+            region = (right - left, bottom - top)
+
+        if self.size is not None:
+            position = len(stages)
+            if region is None or (self.size[0] <= region[0] and self.size[1] <= region[1]):
+                # A downscale goes ahead of the trailing stages working pixel by pixel.
+                position = max((i + 1 for i, stage in enumerate(stages) if stage[2] != 0 or not stage[4]), default=0)
+                position = max([position] + list(moves))
+            moved = f', moved ahead of {len(stages) - position} stage(s)' if position < len(stages) else ''
+            moves.setdefault(position, []).append(('resize', f'{self.size[0]}x{self.size[1]}{moved}', self.size))
+
+        plan = list(dropped)
+        group = []
+        for index in range(len(stages) + 1):
+            name = stages[index][0] if index < len(stages) else None
+            if name is not None and index not in moves and imfilters.lookup(name).pointwise:
+                group.append(stages[index][:2])
+                continue
+            if group:
+                plan.extend(self._fuse(group))
+                group = []
+            plan.extend(moves.get(index, ()))
+            if name is None:
+                break
+            if imfilters.lookup(name).pointwise:
+                group.append(stages[index][:2])
+            elif imfilters.lookup(name).kind == 'chain':
+                plan.append(('chain', name, getattr(imfilters, name)))
+            else:
+                plan.append(('filter', _label(*stages[index][:2]), getattr(imfilters, name), stages[index][1]))
+        return plan
+
+    def _fuse(self, group:list):
+        '''
+        Method responsible for turning consecutive stages working pixel by pixel in one 'point' operation.
+        Consecutive lookup tables are composed in one, a table left equal to the levels is dropped.
+        '''
+        ops = []
+        labels = []
+        for name, params in group:
+            info = imfilters.lookup(name)
+            cls = getattr(imfilters, name)
+            labels.append(_label(name, params))
+            if info.kind == 'channel':
+                table = _table(cls, params)
+                if ops and ops[-1][0] == 'lut':
+                    previous = ops.pop()[1]
+                    table = np.stack([table[0, previous[0, :, c], c] for c in range(3)], axis=1)[None]
+                if not np.array_equal(table, _LEVELS):
+                    ops.append(('lut', np.ascontiguousarray(table)))
+            elif info.kind == 'matrix':
+                ops.append(('matrix', imfilters._fixed(cls(np.zeros((1, 1, 3), np.uint8), **params).matrix)))
+            else:
+                ops.append(('filter', cls, params))
+        if not ops:
+            return [('drop', f"{' + '.join(labels)}, identity once composed")]
+        passes = f", one pass of {len(ops)} operations" if len(labels) > 1 else ''
+        return [('point', f"{' + '.join(labels)}{passes}", ops)]
+
+    def explain(self, size:tuple=None):
+        '''
+        Method responsible for returning the plan as text, one stage per line in the order they run.
+        : param size: Size (width, height) of the source. Ex: (6000, 4000).
+        '''
+        source = f' for {size[0]}x{size[1]}' if size is not None else ''
+        lines = [f'IMPipeline plan{source}:']
+        lines.extend(f'  {stage[0]:<7} {stage[1]}' for stage in self.plan(size))
+        return '\n'.join(lines)
+
+    def _point(self, ops:list, src, dst):
+        import cv2
+        rows = max(1, imfilters._CHUNK // max(1, src.shape[1]))
+
+        def work(top, bottom):
+            for start in range(top, bottom, rows):
+                end = min(bottom, start + rows)
+                block, target = src[start:end], dst[start:end]
+                for op in ops:
+                    if op[0] == 'lut':
+                        cv2.LUT(block, op[1], dst=target)
+                    elif op[0] == 'matrix':
+                        target[...] = op[1](block)
+                    else:
+                        op[1](block, out=target, threads=1, **op[2])
+                    block = target
+
+        imfilters._run(work, imfilters._bands(src.shape[0], self.threads))
+        return dst
+
+    def _filter(self, cls, params:dict, pixels):
+        accepted = inspect.signature(cls).parameters
+        if 'threads' in accepted and self.threads is not None:
+            params = dict(params, threads=self.threads)
+        if 'out' in accepted:
+            out = np.empty(pixels.shape, np.uint8)
+            cls(pixels, out=out, **params)
+            return out
+        return imfilters._pixels(imfilters._result_image(cls(pixels, **params)))
+
+    def apply(self, image):
+        '''
+        Method responsible for returning the PIL image of the chain applied to the image.
+        : param image: Path, binary file object, bytes, PIL image, IMBuffer, NumPy RGB array or IMShared. It is not changed.
+        '''
+        if isinstance(image, IMShared):
+            image = image.buffer
+        pixels = imfilters._pixels(imfilters._open(image))
+        owned = False
+        for stage in self.plan((pixels.shape[1], pixels.shape[0])):
+            operation = stage[0]
+            if operation == 'crop':
+                left, top, right, bottom = stage[2]
+                pixels = pixels[top:bottom, left:right]
+                owned = owned and pixels.flags.c_contiguous
+                continue
+            if operation == 'resize':
+                pixels = np.asarray(Image.fromarray(np.ascontiguousarray(pixels)).resize(stage[2], self.resample))
+            elif operation == 'point':
+                pixels = self._point(stage[2], pixels, pixels if owned else np.empty(pixels.shape, np.uint8))
+            elif operation == 'filter':
+                pixels = self._filter(stage[2], stage[3], pixels)
+            elif operation == 'chain':
+                pixels = imfilters._pixels(imfilters._chain(stage[2].steps, pixels))
+            else:
+                continue
+            owned = pixels.flags.writeable and pixels.flags.c_contiguous
+        return Image.fromarray(np.ascontiguousarray(pixels))
+
+    def save(self, image, path, format:str=None, **params):
+        '''
+        Method responsible for applying the chain and saving the result.
+        : param image: Image to be filtered.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        imfilters._save(self.apply(image), path, format, **params)
+
+    def to_bytes(self, image, format:str='PNG', **params):
+        '''
+        Method responsible for applying the chain and returning the result encoded in bytes.
+        : param image: Image to be filtered.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return imfilters._encode(self.apply(image), format, **params)
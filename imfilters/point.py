@@ -0,0 +1,972 @@
+#
+# Filters working pixel by pixel, and the engine splitting the image in bands and blocks
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from imfilters.io import _CHUNK, _encode, _open, _output, _pixels, _planes, _save, _store, _target
+
+def _quantize(image):
+    '''
+    Function responsible for truncating a float32 intermediate to 8 bits, as putpixel does.
+    '''
+    return np.clip(image, 0, 255, out=image).astype(np.uint8)
+
+_THREADS = 1
+_POOL = None
+_POOL_SIZE = 0
+_POOL_LOCK = threading.Lock()
+
+def set_threads(threads:int):
+    '''
+    Function responsible for setting the default number of threads used inside one image.
+    : param threads: Number of threads. Ex: threads = 1 -> no threads, threads = 0 -> one per cpu.
+    '''
+    global _THREADS
+    _THREADS = threads if threads > 0 else (os.cpu_count() or 1)
+
+def _executor(threads:int):
+    '''
+    Function responsible for the shared pool of threads, with at least threads workers.
+    A smaller pool is replaced but never shut down: other threads may still be submitting to it,
+    its idle workers exit when it is no longer referenced.
+    '''
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL_SIZE < threads:
+            _POOL = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='imfilters')
+            _POOL_SIZE = threads
+        return _POOL
+
+def _bands(height:int, threads:int=None):
+    '''
+    Function responsible for splitting the rows of the image in bands, one per thread.
+    Returns a list of (top, bottom).
+    '''
+    threads = _THREADS if threads is None else max(1, threads)
+    count = max(1, min(threads, height // 64))
+    step = -(-height // count)
+    return [(top, min(height, top + step)) for top in range(0, height, step)]
+
+def _run(work, bands:list):
+    '''
+    Function responsible for running work(top, bottom) for every band.
+    NumPy and Pillow release the GIL inside the kernels, so the bands run in parallel.
+    '''
+    if len(bands) == 1:
+        return [work(*bands[0])]
+    return list(_executor(len(bands)).map(lambda band: work(*band), bands))
+
+_BAND_ROWS = 64
+
+def _point(img, kernel, threads:int=None, out=None, planes:tuple=()):
+    '''
+    Function responsible for applying a kernel over the pixels of the image.
+    : param img: PIL image, IMBuffer or NumPy RGB array.
+    : param kernel: Function receiving a block of pixels as uint8 array (rows, columns, 3) and returning the new values.
+    : param threads: Number of threads. The default is set by set_threads.
+    : param out: IMBuffer, NumPy array or PIL image receiving the result. It may be img itself.
+    The values returned are truncated to 0..255 as putpixel does.
+    float32 arrays, the intermediates of _chain, are clipped to 0..255 but not truncated.
+    : param planes: Planes of IMStats of the size of the image, the kernel also receives their rows of the block.
+    The kernel runs over blocks of about _CHUNK pixels, so its temporaries stay small whatever the image size.
+    With NumPy arrays as img and out nothing of the size of the image is allocated.
+    '''
+    src = _pixels(img)
+    target = _target(out, src.shape, np.float32 if src.dtype == np.float32 else np.uint8)
+    rows = max(1, _CHUNK // max(1, src.shape[1]))
+
+    def work(top, bottom):
+        for start in range(top, bottom, rows):
+            end = min(bottom, start + rows)
+            result = kernel(src[start:end], *(plane[start:end] for plane in planes))
+            if result.dtype != np.uint8:
+                result = np.clip(result, 0, 255)
+            target[start:end] = result
+
+    _run(work, _bands(src.shape[0], threads))
+    return _store(target, out)
+
+def _lut(img, kernel, threads:int=None, out=None):
+    '''
+    Function responsible for applying a per channel kernel through lookup tables.
+    The kernel is evaluated once over the 256 levels of each channel and the pixels are only indexed,
+    with no float temporaries.
+    : param img: PIL image, IMBuffer or NumPy RGB array.
+    : param kernel: Function receiving the levels as uint8 array (256, 3) and returning the new values.
+    : param threads: Number of threads. The default is set by set_threads.
+    : param out: IMBuffer, NumPy array or PIL image receiving the result.
+    float32 arrays have no levels to index, the kernel runs over the pixels.
+    '''
+    if _pixels(img).dtype == np.float32:
+        return _point(img, kernel, threads, out)
+
+    levels = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+    table = np.ascontiguousarray(np.clip(kernel(levels), 0, 255).astype(np.uint8).T)
+
+    def apply(px):
+        result = np.empty(px.shape, np.uint8)
+        for c in range(3):
+            result[..., c] = table[c][px[..., c]]
+        return result
+
+    return _point(img, apply, threads, out)
+
+def _fixed(matrix):
+    '''
+    Function responsible for building a fixed point kernel for a 3x3 color matrix.
+    The coefficients are scaled by 2 ** shift and accumulated in int32, one channel at a time.
+    The shift floors the result, which after clipping to 0..255 is the same as int() truncation.
+    : param matrix: Color matrix. Ex: out_red = m[0][0] * red + m[0][1] * green + m[0][2] * blue.
+    '''
+    matrix = np.asarray(matrix, dtype=np.float64)
+    limit = 255 * max(1.0, np.abs(matrix).sum(axis=1).max())
+    shift = max(0, min(16, int(math.log2((2 ** 31 - 1) / limit))))
+    fixed = np.round(matrix * (1 << shift)).astype(np.int32)
+    transposed = matrix.T.astype(np.float32)
+
+    def kernel(px):
+        if px.dtype == np.float32:
+            return px @ transposed
+        result = np.empty(px.shape, np.uint8)
+        acc = np.empty(px.shape[:2], np.int32)
+        tmp = np.empty(px.shape[:2], np.int32)
+        for i in range(3):
+            np.multiply(px[..., 0], fixed[i, 0], out=acc, dtype=np.int32)
+            for j in (1, 2):
+                np.multiply(px[..., j], fixed[i, j], out=tmp, dtype=np.int32)
+                acc += tmp
+            acc >>= shift
+            np.clip(acc, 0, 255, out=acc)
+            result[..., i] = acc
+        return result
+
+    return kernel
+
+class IMBrightness:
+    '''
+    Class responsible for applying the brightness adjustment filter.
+    : param image: Image to be applied to the filter.
+    : param adjust: Adjustment level.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+    def __init__(self, image:str, adjust:int=5, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        adj = math.floor(255 * (self.adjust / 100))
+
+        self.img = _open(self.image)
+
+        self.new_image = _lut(self.img, lambda px: px.astype(np.float32) + adj, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_image, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_image, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_image.show()
+
+class IMContrast:
+    '''
+    Class responsible for applying the contrast adjustment filter.
+    : param image: Image to be applied to the filter.
+    : param adjust: Adjustment level.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=0, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        adj = pow((self.adjust + 100) / 100, 2)
+
+        self.new_img = _lut(self.img, lambda px: ((px / 255 - 0.5) * adj + 0.5) * 255, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMGray:
+    '''
+    Class responsible for applying gray scale filter.
+    : param image: Path of the file to be opened
+    : param mode: File output mode. Ex: 'normal' -> Balanced gray scale, - 'optimize' -> Optimized gray scale.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, mode:str=None, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.mode = mode
+        self.img = _open(self.image)
+        self.width, self.height = self.img.shape[1::-1] if isinstance(self.img, np.ndarray) else self.img.size
+
+        if self.mode == 'optimize':
+            self.new_img = _point(self.img, self._optimized, threads, _output(image, out, inplace))
+        else:
+            self.new_img = _point(self.img, self._luminance, threads, _output(image, out, inplace), _planes(self.img, 'luma'))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+    
+    def _luminance(self, px, luma=None):
+        # Same weights of IMLuminance.
+        lum = (0.299 * px[..., 0]) + (0.587 * px[..., 1]) + (0.114 * px[..., 2]) if luma is None else luma
+        return np.repeat(lum[..., None], 3, axis=2)
+
+    def _optimized(self, px):
+        p_R = px[..., 0]
+        p_G = px[..., 1]
+        p_B = px[..., 2]
+
+        color = (p_R * 0.21) + np.floor(p_G * 0.71) + np.floor(p_B * 0.8)//3
+        return np.repeat(color[..., None], 3, axis=2)
+
+class IMInvert:
+    '''
+    Class responsible for applying the invert filter.
+    : param image: Image to be applied to the filter.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+
+        im = _open(self.image)
+
+        self.im_final = _lut(im, lambda px: 255 - px, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.im_final, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.im_final, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.im_final.show()
+
+class IMNoise:
+    '''
+    Class responsible for applying the noise filter.
+    :param image: Image to be applied to the filter.
+    :param adjust: Adjustment level.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=10, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        self.new_img = _point(self.img, self._kernel, threads, _output(image, out, inplace))
+
+    def _kernel(self, px):
+        adj = abs(self.adjust) * 2.55
+
+        minimo = adj * -1
+        maximo = adj
+
+        # One random value per pixel, shared by the three channels.
+        rand = np.round(minimo + (np.random.random(px.shape[:2]) * (maximo - minimo)))
+        return px + rand[..., None]
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMGamma:
+    '''
+    Class responsible for applying the gamma filter.
+    :param image: Image to be applied to the filter.
+    :param adjust: Adjustment level.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=2, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        self.new_img = _lut(self.img, lambda px: np.power(px / 255, self.adjust) * 255, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMClip:
+    '''
+    Class responsible for applying the clip filter.
+    :param image: Image to be applied to the filter.
+    :param adjust: Adjustment level.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, adjust:int=15, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.adjust = adjust
+
+        self.img = _open(self.image)
+
+        self.new_img = _lut(self.img, self._kernel, threads, _output(image, out, inplace))
+
+    def _kernel(self, px):
+        adj = abs(self.adjust) * 2.55
+        return np.where(px > 255 - adj, 255, np.where(px < adj, 0, px))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMThreshold:
+    '''
+    Class responsible for applying the threshold filter.
+    :param image: Image to be applied to the filter.
+    :param limiar: Adjustment limiar.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, limiar:int=127, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.limiar = limiar
+
+        self.gray = IMGray(self.image, threads=threads, out=out, inplace=inplace)
+
+        self.img = self.gray.new_img
+
+        target = None
+        if out is not None or inplace:
+            # The gray image is already in the buffer, the threshold overwrites it.
+            target = self.img
+
+        kernel = lambda px: np.where(px > self.limiar, 255, 0)
+        self.new_img = _lut(self.img if target is None else target, kernel, threads, target)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMSolarize:
+    '''
+    Class responsible for applying the solarize filter.
+    :param image: Image to be applied to the filter.
+    :param limit: Adjustment nivel de exposition.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, limit:int=128, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.limit = limit
+
+        self.img = _open(self.image)
+
+        self.new_img = _lut(self.img, lambda px: np.where(px > self.limit, 255 - px, px), threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMLumios:
+    '''
+    Class responsible for applying lumens filters.
+    : param image: Image to be applied to the filter.
+    : param color: Color to be applied. Options -> red, blue, green.
+    : param percent: Quantity of color percentage.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, color:str='blue', percent:float=0.1, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+
+        im = _open(self.image)
+
+        percent *=10
+        if percent > 10:
+            l = 10
+        elif percent < 0:
+            l = 0
+        else:
+            l = percent
+
+        channels = ('red', 'green', 'blue')
+        if color not in channels:
+            print(f'Color -> {color} not applicable.')
+            exit(0)
+        self.channel = channels.index(color)
+        self.level = int(l)
+
+        self.new_img = _point(im, self._kernel, threads, _output(image, out, inplace), _planes(im, 'mean'))
+
+    def _kernel(self, px, mean=None):
+        px = px.astype(np.int32)
+        med = px.sum(axis=2, keepdims=True) // 3 if mean is None else mean[..., None].astype(np.int32)
+
+        out = np.repeat(med, 3, axis=2)
+        c = px[..., self.channel]
+        out[..., self.channel] = c + ((255 - c) // 10) * self.level
+        return out
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_img.show()
+
+class IMPredominance:
+    '''
+    Class responsible for applying predominance filter of color.
+    :param image: Image to be applied to the filter.
+    :param color: Color for predominance. Ex: red, blue, green, yellow, orange, purple, ciano, pink.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, color:str='red', threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.color = color
+        self.im = _open(self.image)
+
+        if self.color not in self._COLORS:
+            raise ValueError(f'Color -> {color} not applicable.')
+
+        self.new_im = _point(self.im, self._kernel, threads, _output(image, out, inplace), _planes(self.im, 'mean'))
+
+    _COLORS = {
+        'red': lambda red, green, blue: (red > green) & (red > blue),
+        'blue': lambda red, green, blue: (blue > green) & (blue > red),
+        'green': lambda red, green, blue: (green > red) & (green > blue),
+        'yellow': lambda red, green, blue: (red > blue) & (green > blue) & (green > 200),
+        'ciano': lambda red, green, blue: (blue > red) & (green > blue),
+        'purple': lambda red, green, blue: (blue > red) & (blue > green) & (red > 100) & (red < 200),
+        'pink': lambda red, green, blue: (red > green) & (red > blue) & (blue > green) & (blue > 100),
+        'orange': lambda red, green, blue: (red > green) & (red > blue) & (green > blue) & (green > 50) & (green < 150),
+    }
+
+    def _kernel(self, px, mean=None):
+        keep = self._COLORS[self.color](px[..., 0], px[..., 1], px[..., 2])
+        med = px.sum(axis=2, keepdims=True, dtype=np.int32) // 3 if mean is None else mean[..., None]
+        return np.where(keep[..., None], px, med)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMLumBlue:
+
+    '''
+    Class responsible for applying filter lumius blue.
+    :param image: Image to be applied to the filter.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.im = _open(self.image)
+
+        self.new_im = _point(self.im, self._kernel, threads, _output(image, out, inplace))
+
+    def _kernel(self, px):
+        red = px[..., 0]
+        green = px[..., 1]
+        blue = px[..., 2]
+
+        out = px.copy()
+        out[..., 2] = np.where((blue < green) & (blue < red), blue + ((255 - blue) * 0.2).astype(np.uint8), blue)
+        return out
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMLumRed:
+
+    '''
+    Class responsible for applying filter lumius red.
+    :param image: Image to be applied to the filter.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.im = _open(self.image)
+
+        self.new_im = _point(self.im, self._kernel, threads, _output(image, out, inplace))
+
+    def _kernel(self, px):
+        red = px[..., 0]
+        green = px[..., 1]
+        blue = px[..., 2]
+
+        out = px.copy()
+        out[..., 0] = np.where((red < green) & (red < blue), red + ((255 - red) * 0.2).astype(np.uint8), red)
+        return out
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMLumGreen:
+
+    '''
+    Class responsible for applying filter lumius green.
+    :param image: Image to be applied to the filter.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.im = _open(self.image)
+
+        self.new_im = _point(self.im, self._kernel, threads, _output(image, out, inplace))
+
+    def _kernel(self, px):
+        red = px[..., 0]
+        green = px[..., 1]
+        blue = px[..., 2]
+
+        out = px.copy()
+        out[..., 1] = np.where((green < red) & (green < blue), green + ((255 - green) * 0.2).astype(np.uint8), green)
+        return out
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMOverlay:
+    '''
+    Class responsible for applying filter overlay.
+    :param image: Image to be applied to the filter.
+    :param red: adjust color red.
+    :param green: adjust color green.
+    :param blue: adjust color blue.
+    :param scale: scale of adjust overlay.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+    def __init__(self, image:str, red:int=50, green:int=50, blue:int=50, scale:int=10, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.red = red
+        self.green = green
+        self.blue = blue
+        self.scale = scale
+
+        self.im = _open(self.image)
+
+        color = np.array([self.red, self.green, self.blue])
+        self.new_im = _lut(self.im, lambda px: px - (px - color) * self.scale, threads, _output(image, out, inplace))
+
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMAditiveColors:
+
+    '''
+    Class responsible for applying filter aditive colors.
+    :param image: Image to be applied to the filter.
+    :param red: adjust color red.
+    :param green: adjust color green.
+    :param blue: adjust color blue.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, red:int=5, green:int=5, blue:int=5, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+        self.im = _open(self.image)
+
+        color = np.array([self.red, self.green, self.blue])
+        self.new_im = _lut(self.im, lambda px: px + color, threads, _output(image, out, inplace))
+
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMRgbScale:
+    '''
+    Class responsible for applying filter scale rgb colors.
+    :param image: Image to be applied to the filter.
+    :param red: adjust color red.
+    :param green: adjust color green.
+    :param blue: adjust color blue.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, red:int=5, green:int=5, blue:int=5, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+        self.im = _open(self.image)
+
+        color = np.array([self.red, self.green, self.blue])
+        self.new_im = _lut(self.im, lambda px: px * color, threads, _output(image, out, inplace))
+
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
@@ -0,0 +1,392 @@
+#
+# Presets, chains of filters applied in one pass
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.io import _encode, _open, _pixels, _save
+from imfilters.point import _quantize
+
+def _chain(steps, src):
+    '''
+    Function responsible for applying a sequence of filters, each one over the result of the previous.
+    The intermediate is one float32 array filtered in place and truncated to 8 bits only at the end.
+    The channel filters at the start go over the 256 float32 levels and are applied as one table.
+    Filters with no float path get it truncated and write their result back.
+    : param steps: Sequence of (name, params). Ex: (('IMBrightness', {'adjust': 10}), ('IMContrast', {'adjust': 10})).
+    : param src: Image to be applied to the first filter.
+    A preset of one step runs its filter as it is, so it gives the same result of the filter.
+    Returns the PIL image of the result.
+    '''
+    pixels = _pixels(_open(src))
+    if len(steps) == 1 and pixels.dtype == np.uint8:
+        name, params = steps[0]
+        return imfilters._result_image(getattr(imfilters, name)(pixels, **params)).convert('RGB')
+    levels = np.repeat(np.arange(256, dtype=np.float32)[:, None, None], 3, axis=2)
+    start = 0
+    while start < len(steps) and steps[start][0] in imfilters._CHANNEL_FILTERS:
+        getattr(imfilters, steps[start][0])(levels, inplace=True, **steps[start][1])
+        start += 1
+
+    image = np.empty(pixels.shape, np.float32)
+    for c in range(3):
+        np.take(levels[:, 0, c], pixels[..., c], out=image[..., c])
+
+    for name, params in steps[start:]:
+        cls = getattr(imfilters, name)
+        if name in imfilters._FLOAT_FILTERS:
+            cls(image, inplace=True, **params)
+        else:
+            image[...] = _pixels(imfilters._result_image(cls(_quantize(image), **params)))
+    return Image.fromarray(_quantize(image))
+
+class IMSoftSat:
+    '''
+    Class responsible for applying the soft saturation filter.
+    :param image: Image to be applied to the filter.
+    '''
+
+    steps = (
+        ('IMBrightness', {'adjust': 10}),
+        ('IMContrast', {'adjust': 30}),
+        ('IMSepia', {'adjust': 60}),
+        ('IMSaturation', {'adjust': -30}),
+    )
+
+    def __init__(self, image:str):
+        self.image = image
+
+    def _apply(self):
+        # The steps are chained in memory, so the result can also go to a stream.
+        return _chain(self.steps, self.image)
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Método responsável por salvar imagem.
+        :param path: Nome do arquivo ou stream binário a ser salvo.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self._apply(), path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self._apply(), format, **params)
+
+class Clarendon:
+    '''
+    Class responsible for applying filter clarendon automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMBrightness', {'adjust': 10}),
+        ('IMContrast', {'adjust': 10}),
+        ('IMSaturation', {'adjust': 25}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+    
+class AditiveRed:
+    '''
+    Class responsible for applying filter aditive red automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMAditiveColors', {'red': 50, 'green': 0, 'blue': 0}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class AditiveGreen:
+    '''
+    Class responsible for applying filter aditive green automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMAditiveColors', {'red': 0, 'green': 50, 'blue': 0}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class AditiveBlue:
+    '''
+    Class responsible for applying filter aditive blue automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMAditiveColors', {'red': 0, 'green': 0, 'blue': 50}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class GingHam:
+    '''
+    Class responsible for applying filter gingham automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMSepia', {'adjust': 4}),
+        ('IMContrast', {'adjust': -15}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Moon:
+    '''
+    Class responsible for applying filter moon automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMGray', {'mode': 'optimize'}),
+        ('IMContrast', {'adjust': -4}),
+        ('IMBrightness', {'adjust': 10}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Lark:
+    '''
+    Class responsible for applying filter lark automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMGray', {'mode': 'optimize'}),
+        ('IMContrast', {'adjust': -4}),
+        ('IMBrightness', {'adjust': 8}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Reyes:
+    '''
+    Class responsible for applying filter reyes automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMSepia', {'adjust': 40}),
+        ('IMContrast', {'adjust': -5}),
+        ('IMBrightness', {'adjust': 13}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Juno:
+    '''
+    Class responsible for applying filter juno automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMRgbScale', {'red': 1.01, 'green': 1.04, 'blue': 1}),
+        ('IMSaturation', {'adjust': 30}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Slumber:
+    '''
+    Class responsible for applying filter slumber automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMBrightness', {'adjust': 10}),
+        ('IMSaturation', {'adjust': -50}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Rise:
+    '''
+    Class responsible for applying filter rise automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMBrightness', {'adjust': 9}),
+        # IMOverlay(red=255,green=170,blue=0,scale=10) is not saved, so it does not change the image.
+        ('IMSaturation', {'adjust': 10}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class XPro2:
+    '''
+    Class responsible for applying filter xpro2 automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMContrast', {'adjust': 15}),
+        # IMOverlay(red=255,green=255,blue=0,scale=7) is not saved, so it does not change the image.
+        ('IMSaturation', {'adjust': 20}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Lofi:
+    '''
+    Class responsible for applying filter lofi automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMContrast', {'adjust': 15}),
+        ('IMSaturation', {'adjust': 20}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Inkwell:
+    '''
+    Class responsible for applying filter inkwell automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMGray', {'mode': 'normal'}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Kelvin:
+    '''
+    Class responsible for applying filter kelvin automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMOverlay', {'red': 250, 'green': 140, 'blue': 0, 'scale': 0.1}),
+        ('IMRgbScale', {'red': 1.15, 'green': 1.05, 'blue': 1}),
+        ('IMSaturation', {'adjust': 35}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class F1977:
+    '''
+    Class responsible for applying filter f1977 automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMOverlay', {'red': 250, 'green': 25, 'blue': 0, 'scale': 0.15}),
+        ('IMBrightness', {'adjust': 10}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
+
+class Brooklyn:
+    '''
+    Class responsible for applying filter brooklyn automatic.
+    :param src_image: Image to be applied to the filter.
+    :param dst_image: Image applicated filter.
+    '''
+
+    steps = (
+        ('IMOverlay', {'red': 25, 'green': 240, 'blue': 250, 'scale': 0.05}),
+        ('IMSepia', {'adjust': 30}),
+    )
+
+    def __init__(self, src_image:str,dst_image):
+        self.src = src_image
+        self.dst = dst_image
+
+        _save(_chain(self.steps, self.src), self.dst)
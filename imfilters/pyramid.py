@@ -0,0 +1,102 @@
+#
+# One filtered image at several widths, for responsive images and CDNs
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import os
+
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.pipeline import IMPipeline
+
+class IMPyramid:
+    '''
+    Class responsible for filtering an image once and returning it at several widths.
+    The filtered image is halved again and again, averaging blocks of 2x2 pixels, and every width
+    is resized from the smallest level still as wide as it, so the cost of all the widths together is
+    about one third of the filtered image instead of one resize of the full image for each width.
+    The widths are resized and encoded in parallel.
+    Ex: IMPyramid('Clarendon', 'photo.jpg', [1600, 1200, 800, 400]).save('cdn/photo_{width}.jpg', quality=85)
+    : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+    : param widths: Widths of the outputs, the heights keep the proportion. Ex: [1600, 800, 400].
+    : param resample: Resampling filter from the level to the width. Ex: Image.LANCZOS, Image.BILINEAR.
+    : param threads: Number of threads filtering in bands and encoding the widths. Ex: threads = None -> one per width.
+    : param params: Parameters of the filter.
+    '''
+
+    def __init__(self, name:str, image, widths, resample:int=Image.LANCZOS, threads:int=None, **params):
+        self.name = name
+        self.widths = sorted(set(widths), reverse=True)
+        if not self.widths or self.widths[-1] < 1:
+            raise ValueError('widths must be positive.')
+        self.resample = resample
+        self.threads = threads
+
+        filtered = IMPipeline([(name, params)], threads=threads).apply(image)
+        self.levels = [filtered]
+        while self.levels[-1].width // 2 >= self.widths[-1] and min(self.levels[-1].size) >= 2:
+            self.levels.append(self.levels[-1].reduce(2))
+        self._variants = {}
+
+    def _size(self, width:int):
+        full_width, full_height = self.levels[0].size
+        return width, max(1, round(full_height * width / full_width))
+
+    def image(self, width:int):
+        '''
+        Method responsible for returning the image at one of the widths as PIL image.
+        : param width: Width of the output.
+        '''
+        if width not in self._variants:
+            index = next(index for index in reversed(range(len(self.levels))) if self.levels[index].width >= width or index == 0)
+            level = self.levels[index]
+            size = self._size(width)
+            if level.size == size:
+                self._variants[width] = level
+            else:
+                # An odd side is halved with a last block of one pixel, so the level covers a little more
+                # than the image: only the part of the image is resized.
+                full_width, full_height = self.levels[0].size
+                box = (0, 0, full_width / 2 ** index, full_height / 2 ** index)
+                self._variants[width] = level.resize(size, self.resample, box=box)
+        return self._variants[width]
+
+    def _map(self, work):
+        threads = self.threads or len(self.widths)
+        if threads <= 1 or len(self.widths) == 1:
+            return [work(width) for width in self.widths]
+        return list(imfilters._executor(threads).map(work, self.widths))
+
+    def save(self, path:str, format:str=None, **params):
+        '''
+        Method responsible for saving every width in its own file, in parallel.
+        Returns the paths saved, from the widest.
+        : param path: Name of the files with {width}, the folders are created. Ex: 'photo_{width}.jpg', 'cdn/{width}/photo.webp'.
+        : param format: Format of the images. Taken from the extension when not informed.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        if '{width' not in path:
+            raise ValueError('path must contain {width}.')
+
+        def work(width):
+            dst = path.format(width=width)
+            folder = os.path.dirname(dst)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            imfilters._save(self.image(width), dst, format, **params)
+            return dst
+
+        return self._map(work)
+
+    def to_bytes(self, format:str='JPEG', **params):
+        '''
+        Method responsible for returning every width encoded in bytes, encoded in parallel.
+        Returns a dict width -> bytes.
+        : param format: Format of the images. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return dict(zip(self.widths, self._map(lambda width: imfilters._encode(self.image(width), format, **params))))
@@ -0,0 +1,182 @@
+#
+# Registry describing what every filter and preset does
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import importlib
+import math
+
+KINDS = ('channel', 'matrix', 'pixel', 'spatial', 'global', 'chain')
+# Bytes per pixel held at the peak of one image filtered from a file, decoding and encoding included.
+_MEMORY = {'channel': 17, 'matrix': 17, 'pixel': 17, 'spatial': 14, 'global': 12, 'chain': 29}
+
+class IMFilterInfo:
+    '''
+    Class responsible for describing a filter, so batch tools, tiling, caches and optimizers can choose how to run it.
+    Reading the description does not import the filter.
+    : param name: Name of the filter or preset. Ex: 'IMGamma'.
+    : param module: Submodule of imfilters defining it. Ex: 'point', 'color', 'spatial', 'presets'.
+    : param kind: 'channel' -> one lookup table per channel, 'matrix' -> 3x3 color matrix,
+        'pixel' -> every pixel depends only on the same source pixel, 'spatial' -> reads the neighbours within the halo,
+        'global' -> reads the whole image, 'chain' -> sequence of filters in steps.
+    : param params: Schema of the parameters, name -> (type, default). Ex: {'adjust': (int, 5)}.
+    : param deterministic: The same image and parameters always give the same result.
+    : param halo: Pixels of neighbours read around every pixel, number or function of the parameters. None -> the whole image.
+    : param grid: The filter draws over a grid of this step anchored at the corner of the image, tiles must start on it.
+        Number or function of the parameters.
+    : param float32: The filter also runs over the float32 intermediates of the presets.
+    : param identity: Function of the parameters, True when they leave every level exactly as it is. Ex: lambda adjust, **params: adjust == 0.
+    : param memory: Bytes per pixel held at the peak of one image filtered from a file. Taken from the kind when not informed.
+    '''
+
+    def __init__(self, name:str, module:str, kind:str, params:dict=None, deterministic:bool=True, halo=0, grid=1, float32:bool=False,
+                 identity=None, memory:int=None):
+        if kind not in KINDS:
+            raise ValueError(f'Kind -> {kind} not applicable.')
+        self.name = name
+        self.module = module
+        self.kind = kind
+        self.params = params or {}
+        self.deterministic = deterministic
+        self._grid = grid
+        self.float32 = float32
+        self._identity = identity
+        self.memory = _MEMORY[kind] if memory is None else memory
+        self._halo = None if kind == 'global' else halo
+
+    def __repr__(self):
+        return f'IMFilterInfo({self.name!r}, kind={self.kind!r}, params={self.params!r}, deterministic={self.deterministic}, halo={self.halo()!r})'
+
+    @property
+    def cls(self):
+        '''
+        Class of the filter, its submodule is imported on the first use.
+        '''
+        return getattr(importlib.import_module('imfilters.' + self.module), self.name)
+
+    @property
+    def pointwise(self):
+        '''
+        True when every pixel of the result depends only on the same source pixel.
+        '''
+        return self.kind in ('channel', 'matrix', 'pixel')
+
+    def halo(self, **params):
+        '''
+        Method responsible for the pixels of neighbours read around every pixel with these parameters.
+        Returns None when the filter reads the whole image.
+        '''
+        if self._halo is None or isinstance(self._halo, int):
+            return self._halo
+        return self._halo(**params)
+
+    def grid(self, **params):
+        '''
+        Method responsible for the step of the grid the filter draws over with these parameters.
+        '''
+        if isinstance(self._grid, int):
+            return self._grid
+        return self._grid(**params)
+
+    def is_identity(self, **params):
+        '''
+        Method responsible for telling if the filter with these parameters leaves the image as it is.
+        The parameters not informed take their defaults. Ex: lookup('IMBrightness').is_identity(adjust=0) -> True.
+        '''
+        if self._identity is None:
+            return False
+        return bool(self._identity(**dict(self.defaults(), **params)))
+
+    def defaults(self):
+        '''
+        Method responsible for the default value of every parameter.
+        '''
+        return {key: default for key, (_, default) in self.params.items()}
+
+    def validate(self, params:dict):
+        '''
+        Method responsible for checking the names and types of parameters against the schema.
+        int values are accepted for float parameters, and None where the default is None.
+        : param params: Parameters of the filter. Ex: {'adjust': 10}.
+        '''
+        for key, value in params.items():
+            if key not in self.params:
+                raise TypeError(f'{self.name} takes no parameter -> {key}.')
+            kind, default = self.params[key]
+            if value is None and default is None:
+                continue
+            if kind is float and isinstance(value, int) and not isinstance(value, bool):
+                continue
+            if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+                raise TypeError(f'Parameter -> {key} of {self.name} must be {kind.__name__}.')
+
+_RGB = {'red': (int, 5), 'green': (int, 5), 'blue': (int, 5)}
+
+REGISTRY = {info.name: info for info in (
+    IMFilterInfo('IMNormalize', 'color', 'global'),
+    IMFilterInfo('IMBrightness', 'point', 'channel', {'adjust': (int, 5)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 0),
+    # adjust = 0 moves some levels by one, it is not an identity.
+    IMFilterInfo('IMContrast', 'point', 'channel', {'adjust': (int, 0)}, float32=True),
+    IMFilterInfo('IMSaturation', 'color', 'pixel', {'adjust': (int, 10)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 0),
+    IMFilterInfo('IMVibrance', 'color', 'pixel', {'adjust': (int, 50)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 0),
+    IMFilterInfo('IMGray', 'point', 'pixel', {'mode': (str, None)}, float32=True),
+    IMFilterInfo('IMBoxBlur', 'spatial', 'spatial', {'bl': (int, None)},
+                 halo=lambda bl=None, **params: (bl if bl and isinstance(bl, int) else 1) + 1),
+    IMFilterInfo('IMGaussBlur', 'spatial', 'spatial', {'radius': (int, 2)},
+                 halo=lambda radius=2, **params: 3 * (radius if radius and isinstance(radius, int) else 2) + 2),
+    IMFilterInfo('IMUnsharpMask', 'spatial', 'spatial', {'radius': (float, 2), 'percent': (int, 50), 'limit': (int, 3)},
+                 halo=lambda radius=2, **params: math.ceil(3 * radius) + 2, identity=lambda percent, **params: percent == 0),
+    IMFilterInfo('IMSepia', 'color', 'matrix', {'adjust': (int, 100)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 0),
+    IMFilterInfo('IMInvert', 'point', 'channel', float32=True),
+    IMFilterInfo('IMNoise', 'point', 'pixel', {'adjust': (int, 10)}, deterministic=False,
+                 identity=lambda adjust, **params: adjust == 0),
+    IMFilterInfo('IMGamma', 'point', 'channel', {'adjust': (float, 2)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 1),
+    IMFilterInfo('IMClip', 'point', 'channel', {'adjust': (int, 15)}, float32=True,
+                 identity=lambda adjust, **params: adjust == 0),
+    IMFilterInfo('IMThreshold', 'point', 'pixel', {'limiar': (int, 127)}, float32=True),
+    IMFilterInfo('IMSoftSat', 'presets', 'chain'),
+    IMFilterInfo('IMSolarize', 'point', 'channel', {'limit': (int, 128)}, float32=True),
+    IMFilterInfo('IMSharpen', 'spatial', 'spatial', halo=1),
+    IMFilterInfo('IMLumios', 'point', 'pixel', {'color': (str, 'blue'), 'percent': (float, 0.1)}),
+    # Every strip repeats a column up to 10 pixels to its left, 5 rows above, on a grid of the scale.
+    IMFilterInfo('IMPixelated', 'spatial', 'spatial', {'scale': (int, 3), 'alpha': (bool, False)}, halo=10,
+                 grid=lambda scale=3, **params: min(10, max(3, scale))),
+    IMFilterInfo('IMRectangle', 'spatial', 'global',
+                 {'color': (tuple, (0, 0, 0, 1)), 'scale': (int, 3), 'rand': (bool, False), 'dist': (int, 20), 'alpha': (bool, False)},
+                 deterministic=False),
+    IMFilterInfo('IMPredominance', 'point', 'pixel', {'color': (str, 'red')}),
+    IMFilterInfo('IMLumBlue', 'point', 'pixel'),
+    IMFilterInfo('IMLumRed', 'point', 'pixel'),
+    IMFilterInfo('IMLumGreen', 'point', 'pixel'),
+    # The matrix at 0 degrees is not exactly the identity, and IMHueSaturation saturates at any adjust.
+    IMFilterInfo('IMHueRotate', 'color', 'matrix', {'degreeus': (int, 50)}, float32=True),
+    IMFilterInfo('IMHueSaturation', 'color', 'pixel', {'adjust': (float, 10)}, memory=21),
+    IMFilterInfo('IMOverlay', 'point', 'channel', {'red': (int, 50), 'green': (int, 50), 'blue': (int, 50), 'scale': (float, 10)}, float32=True,
+                 identity=lambda scale, **params: scale == 0),
+    IMFilterInfo('IMAditiveColors', 'point', 'channel', _RGB, float32=True,
+                 identity=lambda red, green, blue, **params: red == green == blue == 0),
+    IMFilterInfo('IMRgbScale', 'point', 'channel', {key: (float, 5) for key in _RGB}, float32=True,
+                 identity=lambda red, green, blue, **params: red == green == blue == 1),
+) + tuple(IMFilterInfo(name, 'presets', 'chain') for name in (
+    'Clarendon', 'AditiveRed', 'AditiveGreen', 'AditiveBlue', 'GingHam', 'Moon',
+    'Lark', 'Reyes', 'Juno', 'Slumber', 'Rise', 'XPro2', 'Lofi', 'Inkwell',
+    'Kelvin', 'F1977', 'Brooklyn',
+))}
+
+def lookup(name:str):
+    '''
+    Function responsible for the description of a filter or preset.
+    : param name: Name of the filter or preset. Ex: 'IMGaussBlur'.
+    Ex: lookup('IMGaussBlur').halo(radius=4) -> 14, lookup('IMSepia').kind -> 'matrix'.
+    '''
+    info = REGISTRY.get(name)
+    if info is None:
+        raise ValueError(f'Filter -> {name} not applicable.')
+    return info
@@ -0,0 +1,249 @@
+#
+# HTTP service for applying filters to images
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import argparse
+import json
+import multiprocessing
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.aio import _render
+from imfilters.budget import IMBudget
+from imfilters.cli import _parse_value
+
+CHUNK = 64 * 1024
+
+def _warm():
+    '''
+    Function responsible for preparing a worker before the first job.
+    The submodules of every registered filter and preset are imported, so the first job does not pay for them.
+    '''
+    Image.init()
+    for name in imfilters.FILTERS + imfilters.PRESETS:
+        getattr(imfilters, name)
+
+class _ThreadingServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        if self.server.owner.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status:int, body:bytes, content_type:str='application/json', headers:dict=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        view = memoryview(body)
+        for start in range(0, len(view), CHUNK):
+            self.wfile.write(view[start:start + CHUNK])
+
+    def _error(self, status:int, message:str, headers:dict=None):
+        self.close_connection = True
+        self._reply(status, json.dumps({'error': message}).encode(), headers=headers)
+
+    def do_GET(self):
+        if urlsplit(self.path).path.rstrip('/') == '/health':
+            self._reply(200, json.dumps(self.server.owner.health()).encode())
+        else:
+            self._error(404, 'Not found.')
+
+    def do_POST(self):
+        owner = self.server.owner
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+
+        if len(parts) != 2 or parts[0] != 'filter':
+            return self._error(404, 'Use POST /filter/<name>.')
+        name = parts[1]
+        if name not in imfilters.FILTERS and name not in imfilters.PRESETS:
+            return self._error(404, f'Filter -> {name} not applicable.')
+
+        length = self.headers.get('Content-Length')
+        if length is None:
+            return self._error(411, 'Content-Length required.')
+        try:
+            length = int(length)
+        except ValueError:
+            return self._error(400, 'Content-Length must be an integer.')
+        if length < 0:
+            return self._error(400, 'Content-Length must not be negative.')
+        if length > owner.max_size:
+            return self._error(413, f'Image larger than {owner.max_size} bytes.')
+
+        params = {key: _parse_value(value) for key, value in parse_qsl(url.query)}
+        format = str(params.pop('format', owner.format)).upper()
+        options = {key: params.pop(key) for key in imfilters.ENCODER_OPTIONS if key in params}
+
+        body = self.rfile.read(length)
+        try:
+            tiled, nbytes = owner.budget.plan(body, name)
+        except Image.DecompressionBombError as e:
+            return self._error(413, str(e))
+        except OSError as e:
+            return self._error(400, str(e))
+
+        if not owner._admit():
+            return self._error(503, 'Queue is full.', {'Retry-After': '1'})
+        if not owner.budget.acquire(nbytes, owner.timeout):
+            owner._release()
+            return self._error(503, 'Memory budget is full.', {'Retry-After': '1'})
+
+        # The job holds its slot and memory until it finishes in the pool, even after a timeout.
+        def release(_):
+            owner.budget.release(nbytes)
+            owner._release()
+
+        try:
+            job = owner.pool.apply_async(_render, (name, body, params, format, options, tiled), callback=release, error_callback=release)
+        except Exception as e:
+            release(None)
+            return self._error(500, str(e))
+        try:
+            data = job.get(owner.timeout)
+        except multiprocessing.TimeoutError:
+            return self._error(504, 'Filter timed out.')
+        except Image.DecompressionBombError as e:
+            return self._error(413, str(e))
+        except (TypeError, ValueError, OSError) as e:
+            return self._error(400, str(e))
+        except Exception as e:
+            return self._error(500, str(e))
+
+        self._reply(200, data, Image.MIME.get(format, 'application/octet-stream'))
+
+class IMServer:
+    '''
+    Class responsible for serving filters and presets over HTTP.
+    The jobs run on a persistent pool of processes started and warmed on creation.
+    POST /filter/<name>?param=value with the image as body returns the filtered image.
+    The query also takes format and the encoder settings. Ex: ?adjust=10&format=jpeg&quality=85&progressive=true
+    Every job is estimated from the header of the image and waits for its share of the memory budget,
+    the images too large for one worker are filtered strip by strip.
+    GET /health returns the utilization of the workers and of the memory budget.
+    : param host: Address to listen.
+    : param port: Port to listen. Ex: port = 0 -> free port chosen by the system.
+    : param workers: Number of worker processes.
+    : param queue: Number of jobs waiting for a worker before refusing new ones.
+    : param max_size: Maximum size in bytes of the received image.
+    : param timeout: Seconds to wait for a job.
+    : param format: Default format of the returned images.
+    : param memory: Bytes of memory shared by the jobs. Ex: '8G'. None -> three quarters of the physical memory, 0 -> no limit.
+    '''
+
+    def __init__(self, host:str='127.0.0.1', port:int=8000, workers:int=None, queue:int=None,
+                 max_size:int=32 * 1024 * 1024, timeout:float=None, format:str='PNG', verbose:bool=False, memory=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = self.workers * 2 if queue is None else queue
+        self.max_size = max_size
+        self.timeout = timeout
+        self.format = format.upper()
+        self.verbose = verbose
+        self.budget = IMBudget(memory, self.workers)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._done = 0
+        self._refused = 0
+        self._started = time.time()
+
+        Image.init()
+        self.pool = multiprocessing.Pool(self.workers, initializer=_warm)
+
+        self.httpd = _ThreadingServer((host, port), _Handler)
+        self.httpd.owner = self
+        self.server_address = self.httpd.server_address
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue:
+                self._refused += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._done += 1
+
+    def health(self):
+        '''
+        Method responsible for returning the state of the workers.
+        '''
+        with self._lock:
+            busy = min(self._in_flight, self.workers)
+            return {
+                'status': 'ok',
+                'workers': self.workers,
+                'busy': busy,
+                'queued': self._in_flight - busy,
+                'queue_limit': self.queue,
+                'utilization': busy / self.workers,
+                'done': self._done,
+                'refused': self._refused,
+                'memory': self.budget.in_use,
+                'memory_limit': self.budget.limit,
+                'uptime': time.time() - self._started,
+            }
+
+    def serve_forever(self):
+        '''
+        Method responsible for serving requests until shutdown.
+        '''
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        '''
+        Method responsible for stopping a server running in another thread.
+        '''
+        self.httpd.shutdown()
+
+    def close(self):
+        '''
+        Method responsible for releasing the socket and the workers.
+        '''
+        self.httpd.server_close()
+        self.pool.terminate()
+        self.pool.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='imfilters-server', description='HTTP service for applying filters to images.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--queue', type=int, default=None)
+    parser.add_argument('--max-size', type=int, default=32 * 1024 * 1024)
+    parser.add_argument('--timeout', type=float, default=None)
+    parser.add_argument('--format', default='PNG')
+    parser.add_argument('--memory', default=None, help='Memory shared by the jobs. Ex: 8G. 0 -> no limit.')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = IMServer(args.host, args.port, args.workers, args.queue, args.max_size, args.timeout, args.format, args.verbose, args.memory)
+    print('Serving on http://{}:{}'.format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#
+# Editing session re-rendering only the filters after a change
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import inspect
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+
+class IMSession:
+    '''
+    Class responsible for editing an image through a chain of filters, as moved by the sliders of an editor.
+    The source is decoded once and the result of every stage is kept, so changing the parameters of one stage
+    recomputes only that stage and the ones after it, writing over the arrays of the previous render.
+    preview renders a downscaled proxy of the source for a fast answer, render the full resolution.
+    The spatial filters have their radius in pixels of the image rendered, so the proxy looks sharper.
+    Ex: session = IMSession('photo.jpg', [('IMContrast', {'adjust': 10}), ('IMSaturation', {'adjust': 20})])
+        session.set(1, adjust=35); session.preview().show(); session.save('photo_edit.jpg')
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+    : param steps: Sequence of (name, params) of filters or presets. Ex: [('IMHueRotate', {'degreeus': 90})].
+    : param proxy: Largest side of the preview. Ex: proxy = 1024.
+    : param threads: Number of threads splitting every stage in bands.
+    '''
+
+    def __init__(self, image, steps=(), proxy:int=1024, threads:int=None):
+        self.source = np.array(imfilters._pixels(imfilters._open(image)))
+        self.proxy = proxy
+        self.threads = threads
+        self.steps = []
+        self._proxy = None
+        self._cache = {'proxy': [], 'full': []}
+        self._valid = {'proxy': 0, 'full': 0}
+        for name, params in steps:
+            self.add(name, **params)
+
+    def _invalidate(self, index:int):
+        for key in self._valid:
+            self._valid[key] = min(self._valid[key], index)
+
+    def add(self, name:str, **params):
+        '''
+        Method responsible for appending a stage at the end of the chain.
+        : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+        : param params: Parameters of the filter.
+        '''
+        self.insert(len(self.steps), name, **params)
+
+    def insert(self, index:int, name:str, **params):
+        '''
+        Method responsible for inserting a stage before the stage index.
+        : param index: Position of the new stage.
+        : param name: Name of the filter or preset.
+        : param params: Parameters of the filter.
+        '''
+        if name not in imfilters.FILTERS and name not in imfilters.PRESETS:
+            raise ValueError(f'Filter -> {name} not applicable.')
+        if name in imfilters.PRESETS and params:
+            raise TypeError(f'{name} takes no parameters.')
+        index = min(max(0, index), len(self.steps))
+        self.steps.insert(index, (name, params))
+        for cache in self._cache.values():
+            if index < len(cache):
+                cache.insert(index, None)
+        self._invalidate(index)
+
+    def set(self, index:int, **params):
+        '''
+        Method responsible for changing parameters of a stage. The stages before it keep their results.
+        : param index: Position of the stage. Ex: -1 -> last stage.
+        : param params: Parameters changed, the others are kept.
+        '''
+        index = range(len(self.steps))[index]
+        name, old = self.steps[index]
+        new = dict(old, **params)
+        if new != old:
+            if name in imfilters.PRESETS:
+                raise TypeError(f'{name} takes no parameters.')
+            self.steps[index] = (name, new)
+            self._invalidate(index)
+
+    def remove(self, index:int):
+        '''
+        Method responsible for removing a stage.
+        : param index: Position of the stage.
+        '''
+        index = range(len(self.steps))[index]
+        del self.steps[index]
+        for cache in self._cache.values():
+            if index < len(cache):
+                del cache[index]
+        self._invalidate(index)
+
+    def _source(self, key:str):
+        if key == 'full':
+            return self.source
+        if self._proxy is None:
+            height, width = self.source.shape[:2]
+            scale = self.proxy / max(width, height)
+            if scale >= 1:
+                self._proxy = self.source
+            else:
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                self._proxy = np.asarray(Image.fromarray(self.source).resize(size, Image.BILINEAR, reducing_gap=2.0))
+        return self._proxy
+
+    def _stage(self, name:str, params:dict, pixels, out):
+        cls = getattr(imfilters, name)
+        if hasattr(cls, 'steps'):
+            return imfilters._pixels(imfilters._chain(cls.steps, pixels))
+        accepted = inspect.signature(cls).parameters
+        if 'threads' in accepted and self.threads is not None:
+            params = dict(params, threads=self.threads)
+        if 'out' in accepted:
+            if out is None or out.shape != pixels.shape or not out.flags.writeable:
+                out = np.empty(pixels.shape, np.uint8)
+            cls(pixels, out=out, **params)
+            return out
+        return imfilters._pixels(imfilters._result_image(cls(pixels, **params)))
+
+    def _render(self, key:str):
+        cache = self._cache[key]
+        del cache[len(self.steps):]
+        cache.extend([None] * (len(self.steps) - len(cache)))
+        start = self._valid[key]
+        pixels = cache[start - 1] if start else self._source(key)
+        for index in range(start, len(self.steps)):
+            name, params = self.steps[index]
+            pixels = cache[index] = self._stage(name, params, pixels, cache[index])
+        self._valid[key] = len(self.steps)
+        return Image.fromarray(pixels)
+
+    def preview(self):
+        '''
+        Method responsible for returning the PIL image of the chain over the proxy.
+        '''
+        return self._render('proxy')
+
+    def render(self):
+        '''
+        Method responsible for returning the PIL image of the chain at full resolution.
+        '''
+        return self._render('full')
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image at full resolution.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        imfilters._save(self.render(), path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image at full resolution encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return imfilters._encode(self.render(), format, **params)
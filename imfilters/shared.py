@@ -0,0 +1,167 @@
+#
+# Pixel buffers in shared memory, handed between processes by name
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import atexit
+import threading
+import weakref
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+
+# Segments created by this process and not unlinked yet, removed at exit if still there.
+_OWNED = {}
+_LOCK = threading.Lock()
+
+def _unlink(name:str):
+    with _LOCK:
+        shm = _OWNED.pop(name, None)
+    if shm is not None:
+        _close(shm)
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+def _close(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # A NumPy view is still alive, the mapping goes with it.
+        pass
+
+@atexit.register
+def _unlink_all():
+    for name in list(_OWNED):
+        _unlink(name)
+
+def _attach(name:str, shape:tuple, dtype:str):
+    return IMShared(shape, dtype, name)
+
+class IMShared:
+    '''
+    Class responsible for holding pixels in a shared memory segment, so other processes read and write them with no copy.
+    Pickling it, as done by the process pools, sends only the name, shape and type of the segment,
+    and the receiving process maps the same memory.
+    The process creating the segment owns it and counts its references: retain for every process it is handed to,
+    release when that process is done. The segment is removed with the last reference, when the object is
+    collected, or at the exit of the owner, so no segment outlives it. The other processes only map and close.
+    IMAsync with processes, _render and IMPipeline take it as image. The command line, its queue, the server
+    and imfilters-watch hand only paths or encoded bytes to their workers, which decode, filter and encode
+    in the same process, so no pixels cross processes there.
+    Ex: shared = IMShared.open('photo.jpg'); future = pool.submit(work, shared.retain())
+        future.add_done_callback(lambda _: shared.release()); shared.release()
+    : param shape: Shape of the array. Ex: (rows, columns, 4).
+    : param dtype: Type of the array. Ex: 'uint8'.
+    : param name: Name of an existing segment to map. A new segment is created when not informed.
+    Requires Python 3.8 or later, the modules importing it work on 3.7 while no segment is created.
+    '''
+
+    def __init__(self, shape:tuple, dtype='uint8', name:str=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.owner = name is None
+        # multiprocessing.shared_memory exists from Python 3.8, only the code creating segments needs it.
+        from multiprocessing import shared_memory
+        self._shm = shared_memory.SharedMemory(name, create=self.owner, size=nbytes if self.owner else 0)
+        self.name = self._shm.name
+        self.array = np.ndarray(self.shape, self.dtype, self._shm.buf)
+        if self.owner:
+            self._refs = 1
+            self._lock = threading.Lock()
+            with _LOCK:
+                _OWNED[self.name] = self._shm
+            self._finalizer = weakref.finalize(self, _unlink, self.name)
+        else:
+            self._finalizer = weakref.finalize(self, _close, self._shm)
+
+    @classmethod
+    def new(cls, size:tuple, channels:int=4):
+        '''
+        Method responsible for allocating a shared buffer of pixels.
+        : param size: Size (width, height).
+        : param channels: 4 -> RGBX, shared with the PIL image of buffer. 3 -> RGB.
+        '''
+        shared = cls((size[1], size[0], channels))
+        if channels == 4:
+            shared.array[..., 3] = 255
+        return shared
+
+    @classmethod
+    def from_array(cls, array):
+        '''
+        Method responsible for copying an array into a new segment.
+        : param array: NumPy array, IMBuffer or PIL image.
+        '''
+        array = imfilters._pixels(array) if not isinstance(array, np.ndarray) else array
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def open(cls, image, rows:int=512):
+        '''
+        Method responsible for decoding an image straight into a new RGBX segment, strip by strip.
+        : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+        : param rows: Rows converted at a time.
+        '''
+        image = imfilters._open(image)
+        if not isinstance(image, Image.Image):
+            return cls.from_array(image)
+        shared = cls.new(image.size)
+        target = shared.buffer.image
+        width, height = image.size
+        for top in range(0, height, rows):
+            target.paste(image.crop((0, top, width, min(height, top + rows))), (0, top))
+        return shared
+
+    @property
+    def buffer(self):
+        '''
+        IMBuffer over the segment, with no copy. For 4 channels its PIL image also shares the segment.
+        '''
+        return imfilters.IMBuffer(self.array)
+
+    def __reduce__(self):
+        return _attach, (self.name, self.shape, self.dtype.str)
+
+    def retain(self):
+        '''
+        Method responsible for counting one more user of the segment, before handing it to a process.
+        Returns the object itself. Ex: pool.submit(work, shared.retain()).
+        '''
+        if not self.owner:
+            raise ValueError('Only the process creating the segment counts its references.')
+        with self._lock:
+            if self._refs <= 0:
+                raise ValueError(f'Segment -> {self.name} already released.')
+            self._refs += 1
+        return self
+
+    def release(self):
+        '''
+        Method responsible for dropping one user of the segment. The last one removes it.
+        In the other processes it only closes the mapping.
+        '''
+        if not self.owner:
+            self.array = None
+            self._finalizer()
+            return
+        with self._lock:
+            self._refs -= 1
+            last = self._refs == 0
+        if last:
+            self.array = None
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
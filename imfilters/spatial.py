@@ -0,0 +1,538 @@
+#
+# Filters reading the neighbours of every pixel, and filtering of regions
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import math
+from random import randint
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from imfilters import imfilters
+from imfilters.io import IMBuffer, _encode, _open, _output, _pil, _pixels, _save, _store
+from imfilters.point import _BAND_ROWS, _bands, _run
+
+def _spatial(img, image_filter, halo:int, threads:int=None, out=None):
+    '''
+    Function responsible for applying a Pillow filter band by band.
+    : param img: PIL image, IMBuffer or NumPy RGB array.
+    : param image_filter: Filter of ImageFilter.
+    : param halo: Rows of neighbours the filter reads above and below each band.
+    : param threads: Number of threads. The default is set by set_threads.
+    : param out: IMBuffer, NumPy array or PIL image receiving the result. It may be img itself,
+    the bands are written only after all of them are filtered.
+    '''
+    img = _pil(img)
+    bands = _bands(img.size[1], threads)
+    if len(bands) == 1:
+        return _store(img.filter(image_filter), out)
+
+    img.load()
+    width, height = img.size
+
+    def work(top, bottom):
+        start = max(0, top - halo)
+        band = img.crop((0, start, width, min(height, bottom + halo))).filter(image_filter)
+        return band.crop((0, top - start, width, bottom - start))
+
+    result = Image.new(img.mode, img.size)
+    for (top, _), band in zip(bands, _run(work, bands)):
+        result.paste(band, (0, top))
+    return _store(result, out)
+    
+class IMBoxBlur:
+    '''
+    Class responsible for applying blur filter in box.
+    : param image: Image to be applied to the filter.
+    : param bl: Size of the blur box. Ex: bl = 5 -> box: 5X5.
+    : param threads: Number of threads splitting the image in bands.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, bl:int=None, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        im = _open(self.image)
+        if not (bl and isinstance(bl, int)):
+            bl = 1
+        self.im_final = _spatial(im, ImageFilter.BoxBlur(bl), bl + 1, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.im_final, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.im_final, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.im_final.show()
+
+class IMGaussBlur:
+    '''
+    Class responsible for applying Gaussian filter.
+    :param image: Image to be applied to the filter.
+    :param radius: Blur radius.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, radius:int=2, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.radius = radius
+        img = _open(self.image)
+
+        radius = self.radius if self.radius and isinstance(self.radius, int) else 2
+        self.im_final = _spatial(img, ImageFilter.GaussianBlur(radius=radius), 3 * radius + 2, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.im_final, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.im_final, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.im_final.show()
+
+class IMUnsharpMask:
+    '''
+    Class responsible for applying sharpness mask filter.
+    :param image: Image to be applied to the filter.
+    :param radius: Radius of the maskara.
+    :param percent: Sharpness percentage.
+    :param limit: Brightness limit.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, radius=2, percent=50, limit=3, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+        self.radius = radius
+        self.percent = percent
+        self.limit = limit
+
+        img = _open(self.image)
+        image_filter = ImageFilter.UnsharpMask(radius=self.radius, percent=self.percent, threshold=self.limit)
+        self.im_final = _spatial(img, image_filter, math.ceil(3 * self.radius) + 2, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.im_final, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.im_final, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.im_final.show()
+
+class IMRFilters:
+    '''
+    Base class that provides quick filters.
+    :param image: Image to be applied to the filter.
+    :param threads: Number of threads splitting the image in bands.
+    '''
+
+    def __init__(self, image:str, threads:int=None):
+        self.image = image
+        self.threads = threads
+        im = _open(self.image)
+        self.BLUR = self._blur(im)
+        self.CONTOUR = self._contour(im)
+        self.DETAIL = self._detail(im)
+        self.EDGE_ENHANCE = self._edge_enhance(im)
+        self.EDGE_ENHANCE_MORE = self._edge_enhance_more(im)
+        self.EMBOSS = self._emboss(im)
+        self.FIND_EDGES = self._find_edges(im)
+        self.SHARPEN = self._sharpen(im)
+        self.SMOOTH = self._smooth(im)
+        self.SMOOTH_MORE = self._smooth_more(im)
+
+    def _contour(self, img):
+        return _spatial(img, ImageFilter.CONTOUR, 2, self.threads)
+
+    def _edge_enhance(self, img):
+        return _spatial(img, ImageFilter.EDGE_ENHANCE, 2, self.threads)
+    
+    def _blur(self, img):
+        return _spatial(img, ImageFilter.BLUR, 2, self.threads)
+    
+    def _detail(self, img):
+        return _spatial(img, ImageFilter.DETAIL, 2, self.threads)
+    
+    def _edge_enhance_more(self, img):
+        return _spatial(img, ImageFilter.EDGE_ENHANCE_MORE, 2, self.threads)
+
+    def _emboss(self, img):
+        return _spatial(img, ImageFilter.EMBOSS, 2, self.threads)
+    
+    def _find_edges(self, img):
+        return _spatial(img, ImageFilter.FIND_EDGES, 2, self.threads)
+    
+    def _sharpen(self, img):
+        return _spatial(img, ImageFilter.SHARPEN, 2, self.threads)
+
+    def _smooth(self, img):
+        return _spatial(img, ImageFilter.SMOOTH, 2, self.threads)
+
+    def _smooth_more(self, img):
+        return _spatial(img, ImageFilter.SMOOTH_MORE, 2, self.threads)
+
+class IMSharpen:
+    '''
+    Class responsible for applying the sharpen filter.
+    :param image: Image to be applied to the filter.
+    :param threads: Number of threads splitting the image in bands.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    '''
+
+    def __init__(self, image:str, threads:int=None, out=None, inplace:bool=False):
+        self.image = image
+
+        img = _open(self.image)
+        self.new_img = _spatial(img, ImageFilter.Kernel((3,3), (0, -1, 0, -1, 8, -1, 0, -1, 0)), 1, threads, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        :param path: Name of the file or binary stream to be saved.
+        :param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        :param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        :param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_img.show()
+
+class IMPixelated:
+    '''
+    Class responsible for applying pixelated filters.
+    : param image: Image to be applied to the filter.
+    : param scale: Scale of pixel diameter.
+    : param threads: Accepted as in the other filters, the squares are drawn on one thread.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image.
+    : param alpha: Keep the alpha channel of the source, only the squares drawn are changed.
+    '''
+
+    def __init__(self, image:str, scale:int=3, threads:int=None, out=None, inplace:bool=False, alpha:bool=False):
+        self.image = image
+        self.scale = scale
+
+        src = _open(self.image)
+        im = _pil(src)
+        width, height = im.size
+
+        if self.scale > 10:
+            self.scale = 10
+        elif self.scale < 3:
+            self.scale = 3
+
+        keep = alpha and ('A' in im.getbands() or 'transparency' in im.info)
+        result = im.convert('RGBA' if keep else 'RGB')
+
+        # Every scale-th column x draws, for each row y, an opaque square from (x + 5, y + 5) to (x + 10, y + 10).
+        # The square of the last row wins, so from the row 5 the strip right of x repeats the column x five rows up.
+        # The strips are pasted in the order of the columns, as the squares are drawn, the later ones win where they overlap.
+        for x in range(0, width - 5, self.scale):
+            box = (x + 5, 5, min(width, x + 11), height)
+            if box[3] <= box[1]:
+                break
+            strip = im.crop((x, 0, x + 1, height - 5)).convert('RGB').resize((box[2] - box[0], box[3] - box[1]), Image.NEAREST)
+            if keep:
+                strip.putalpha(result.crop(box).getchannel('A'))
+            result.paste(strip, box[:2])
+
+        self.new_im = _store(result, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_im, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_im, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_im.show()
+
+class IMRectangle:
+    '''
+    Class responsible for applying rectangle filters.
+    :param image: Image to be applied to the filter.
+    :param color: Color of RGBA format for aply in rectangle.
+    :param scale: Scale for rectangles.
+    :param rand: Apply random color.
+    :param dist: Distance of rectangles.
+    :param threads: Accepted as in the other filters, the rectangles are drawn on one thread.
+    :param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    :param inplace: Write the result over the source image.
+    :param alpha: Keep the alpha channel of the source.
+    '''
+
+    def __init__(self, image:str, color:tuple=(0,0,0,1), scale:int=3, rand:bool=False, dist:int=20, threads:int=None, out=None,
+                 inplace:bool=False, alpha:bool=False):
+        self.image = image
+        self.color = color
+        self.scale = scale
+        self.rand = rand
+        self.dist = dist
+
+        src = _open(self.image)
+        self.im = _pil(src)
+        width, height = self.im.size
+
+        r = self.color[0]
+        g = self.color[1]
+        b = self.color[2]
+        a = self.color[3]
+        if a > 1:
+            a = 1
+        elif a < 0:
+            a = 0
+        else:
+            a = int(a * 1000)
+        self.rgba = (r, g, b, a)
+
+        # The rectangles are grouped by the bands of rows they cross, in the order they are drawn.
+        bands = [[] for _ in range((height + _BAND_ROWS - 1) // _BAND_ROWS)]
+        for x in range(0,width, randint(2,self.dist//2)):
+            for y in range(0, height, randint(self.dist//2,self.dist * 2)):
+
+                r = randint(1,3)
+
+                if self.rand:
+                    rect = (x, y, x + self.scale * r, y + self.scale, (randint(0,255), randint(0,255), randint(0,255), randint(100,1000)))
+                else:
+                    rect = (x, y, x + self.scale * r, y + self.scale, self.rgba)
+                first = y // _BAND_ROWS
+                bands[first].append(rect)
+                if y + self.scale >= (first + 1) * _BAND_ROWS:
+                    for band in range(first + 1, min(height - 1, y + self.scale) // _BAND_ROWS + 1):
+                        bands[band].append(rect)
+
+        keep = alpha and ('A' in self.im.getbands() or 'transparency' in self.im.info)
+        result = self.im.convert('RGBA' if keep else 'RGB')
+
+        # Each band draws its rectangles over an overlay of its own rows, composited and pasted back,
+        # only one band of the frame is held in RGBA at a time.
+        for band, rects in enumerate(bands):
+            if not rects:
+                continue
+            top = band * _BAND_ROWS
+            box = (0, top, width, min(height, top + _BAND_ROWS))
+            overlay = Image.new('RGBA', (width, box[3] - top), (0,0,0,0))
+            draw = ImageDraw.Draw(overlay)
+            for x0, y0, x1, y1, fill in rects:
+                draw.rectangle(((x0, y0 - top), (x1, y1 - top)), fill)
+            below = result.crop(box) if keep else self.im.crop(box).convert('RGBA')
+            band_image = Image.alpha_composite(below, overlay)
+            if keep:
+                band_image.putalpha(below.getchannel('A'))
+            else:
+                band_image = band_image.convert('RGB')
+            result.paste(band_image, box[:2])
+
+        self.new_img = _store(result, _output(image, out, inplace))
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving the image with filter.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for showing the image with filter.
+        '''
+        self.new_img.show()
+
+def _paste(target, piece, box:tuple):
+    '''
+    Function responsible for writing a piece of image over a box of the target.
+    : param target: PIL image or IMBuffer.
+    : param piece: RGB PIL image of the size of the box.
+    '''
+    if isinstance(target, IMBuffer):
+        target.rgb[box[1]:box[3], box[0]:box[2]] = np.asarray(piece)
+    else:
+        target.paste(piece, box[:2])
+    return target
+
+class IMRegion:
+    '''
+    Class responsible for applying a filter or preset only inside a box or a mask.
+    Only the box, plus the neighbours read by the spatial filters, is cropped and filtered,
+    so the cost follows the area of the region and not of the image.
+    Filters that look at the whole image, as IMNormalize and IMRectangle, see only the region.
+    Ex: IMRegion('IMGaussBlur', 'photo.jpg', box=(120, 80, 260, 240), radius=6).save('photo_blur.jpg')
+    : param name: Name of the filter or preset. Ex: 'IMGaussBlur', 'Clarendon'.
+    : param image: Image to be applied to the filter.
+    : param box: Region (left, top, right, bottom). The whole image when not informed.
+    : param mask: Image of the same size, the filtered pixels are blended by its gray levels. Ex: 255 -> filtered, 0 -> source.
+    : param out: IMBuffer, NumPy array or PIL image of the same size receiving the result.
+    : param inplace: Write the result over the source image, only the region is touched.
+    : param params: Parameters of the filter.
+    '''
+
+    def __init__(self, name:str, image, box:tuple=None, mask=None, out=None, inplace:bool=False, **params):
+        info = imfilters.lookup(name)
+        self.name = name
+        self.image = image
+        self.params = params
+
+        src = _open(image)
+        if isinstance(src, Image.Image):
+            width, height = src.size
+            crop = src.crop
+        else:
+            # Arrays are sliced, so nothing of the size of the image is copied.
+            pixels = _pixels(src)
+            height, width = pixels.shape[:2]
+            crop = lambda box: Image.fromarray(np.ascontiguousarray(pixels[box[1]:box[3], box[0]:box[2]]))
+
+        if mask is not None:
+            mask = _pil(_open(mask))
+            if mask.size != (width, height):
+                raise ValueError(f'mask must have size {(width, height)}.')
+            mask = mask.convert('L')
+            covered = mask.getbbox()
+            if covered is None:
+                box = (0, 0, 0, 0)
+            elif box is None:
+                box = covered
+            else:
+                box = (max(box[0], covered[0]), max(box[1], covered[1]), min(box[2], covered[2]), min(box[3], covered[3]))
+        if box is None:
+            box = (0, 0, width, height)
+        self.box = box = (max(0, box[0]), max(0, box[1]), min(width, box[2]), min(height, box[3]))
+
+        target = _output(image, out, inplace)
+        if target is None or target is not src:
+            whole = src.convert('RGB') if isinstance(src, Image.Image) else Image.fromarray(_pixels(src))
+            target = whole if target is None else _store(whole, target)
+        if isinstance(target, np.ndarray):
+            target = IMBuffer(target)
+
+        if box[2] > box[0] and box[3] > box[1]:
+            cls = getattr(imfilters, name)
+            halo = info.halo(**params) or 0
+            grid = info.grid(**params)
+            area = ((max(0, box[0] - halo) // grid) * grid, (max(0, box[1] - halo) // grid) * grid,
+                    min(width, box[2] + halo), min(height, box[3] + halo))
+            region = crop(area)
+            if hasattr(cls, 'steps'):
+                if params:
+                    raise TypeError(f'{name} takes no parameters.')
+                filtered = imfilters._chain(cls.steps, region)
+            else:
+                filtered = imfilters._result_image(cls(region, **params))
+            inner = (box[0] - area[0], box[1] - area[1], box[2] - area[0], box[3] - area[1])
+            piece = filtered.crop(inner).convert('RGB')
+            if mask is not None:
+                blended = region.crop(inner).convert('RGB')
+                blended.paste(piece, (0, 0), mask.crop(box))
+                piece = blended
+            target = _paste(target, piece, box)
+        self.new_img = target
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        _save(self.new_img, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return _encode(self.new_img, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        _pil(self.new_img).show()
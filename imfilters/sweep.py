@@ -0,0 +1,98 @@
+#
+# One filter rendered at several values of a parameter
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import math
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from imfilters import imfilters
+from imfilters.video import IMVideo
+
+class IMSweep:
+    '''
+    Class responsible for rendering one filter at several values of a parameter, for A/B comparisons.
+    The source is decoded once and every value builds its lookup table or color matrix once.
+    Filters working pixel by pixel write all the variants in one pass over the source, block by block,
+    while the block of source is still in cache. The spatial filters go over the whole source for every value.
+    Ex: IMSweep('IMGamma', 'photo.jpg', 'adjust', [0.5, 1, 1.5, 2, 3]).save('photo_gamma_{value}.jpg')
+    : param name: Name of the filter. Ex: 'IMGamma', 'IMSepia'.
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+    : param param: Name of the parameter swept. Ex: 'adjust'.
+    : param values: Values of the parameter. Ex: [0, 25, 50, 75, 100].
+    : param threads: Number of threads splitting the source in bands.
+    : param params: Other parameters of the filter, the same for all the values.
+    '''
+
+    def __init__(self, name:str, image, param:str, values, threads:int=None, **params):
+        self.name = name
+        self.param = param
+        self.values = list(values)
+        self.params = params
+
+        videos = [IMVideo(name, threads, **dict(params, **{param: value})) for value in self.values]
+        source = np.ascontiguousarray(imfilters._pixels(imfilters._open(image)))
+        self.variants = [np.empty(source.shape, np.uint8) for _ in self.values]
+
+        if all(video.pointwise for video in videos):
+            rows = max(1, imfilters._CHUNK // max(1, source.shape[1]))
+            for video in videos:
+                video.threads = 1
+
+            def work(top, bottom):
+                for start in range(top, bottom, rows):
+                    end = min(bottom, start + rows)
+                    for video, variant in zip(videos, self.variants):
+                        video.apply(variant[start:end], 'RGB', source[start:end])
+
+            imfilters._run(work, imfilters._bands(source.shape[0], threads))
+        else:
+            for video, variant in zip(videos, self.variants):
+                video.apply(variant, 'RGB', source)
+
+    def image(self, index:int):
+        '''
+        Method responsible for returning one variant as PIL image.
+        : param index: Position of the value.
+        '''
+        return Image.fromarray(self.variants[index])
+
+    def save(self, path:str, format:str=None, **params):
+        '''
+        Method responsible for saving every variant in its own file.
+        : param path: Name of the files with {value} or {index}. Ex: 'photo_gamma_{value}.jpg', 'out/{index:02d}.png'.
+        : param format: Format of the images. Taken from the extension when not informed.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        if '{value' not in path and '{index' not in path:
+            raise ValueError('path must contain {value} or {index}.')
+        for index, value in enumerate(self.values):
+            imfilters._save(self.image(index), path.format(value=value, index=index), format, **params)
+
+    def sheet(self, width:int=256, columns:int=None, labels:bool=True):
+        '''
+        Method responsible for returning the contact sheet, a grid with all the variants side by side.
+        : param width: Width of every variant in the sheet.
+        : param columns: Number of variants per row. Ex: columns = None -> square grid.
+        : param labels: Write the value of the parameter under every variant.
+        '''
+        height = self.variants[0].shape[0] * width // self.variants[0].shape[1]
+        cell = (width, max(1, height))
+        label = 14 if labels else 0
+        columns = columns or math.ceil(math.sqrt(len(self.variants)))
+        rows = -(-len(self.variants) // columns)
+
+        sheet = Image.new('RGB', (columns * cell[0], rows * (cell[1] + label)), 'white')
+        draw = ImageDraw.Draw(sheet)
+        for index, (value, variant) in enumerate(zip(self.values, self.variants)):
+            x = index % columns * cell[0]
+            y = index // columns * (cell[1] + label)
+            sheet.paste(Image.fromarray(cv2.resize(variant, cell, interpolation=cv2.INTER_AREA)), (x, y))
+            if labels:
+                draw.text((x + 4, y + cell[1] + 1), f'{self.param}={value}', fill='black')
+        return sheet
@@ -0,0 +1,85 @@
+#
+# Filters applied strip by strip over one buffer, for images larger than the memory of the filters
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.pipeline import IMPipeline, _describe
+
+class IMTiled:
+    '''
+    Class responsible for applying a filter or preset strip by strip, for images too large to hold twice.
+    The image is decoded into one RGBX buffer, the same the encoder reads, and every strip is filtered
+    with the neighbours read by the spatial filters and written back over the buffer. The rows of
+    neighbours already overwritten are kept from the strip before, so the result is the same of
+    filtering the whole image. Filters reading the whole image, as IMNormalize, run over the whole buffer.
+    The peak memory is about 12 bytes per pixel, decoding and encoding included, instead of 14 to 29 of the filters.
+    Ex: IMTiled('Clarendon', 'panorama.tif').save('panorama_clarendon.jpg', quality=90)
+    : param name: Name of the filter or preset. Ex: 'IMGaussBlur', 'Clarendon'.
+    : param image: Path, binary file object, bytes, PIL image, IMBuffer or NumPy RGB array.
+    : param rows: Rows of every strip. Ex: rows = 512.
+    : param threads: Number of threads splitting every strip in bands.
+    : param params: Parameters of the filter.
+    '''
+
+    def __init__(self, name:str, image, rows:int=512, threads:int=None, **params):
+        self.name = name
+        pipeline = IMPipeline([(name, params)], threads=threads)
+        halo, grid, _ = _describe(name, params)
+
+        self.new_image = buffer = self._decode(image, rows)
+        rgb = buffer.rgb
+        height = rgb.shape[0]
+        if halo is None:
+            rgb[...] = np.asarray(pipeline.apply(rgb))
+            return
+
+        # Strips and their neighbours start on the grid of the filter.
+        halo = -(-halo // grid) * grid
+        rows = max(grid, -(-rows // grid) * grid)
+        carry = rgb[:0].copy()
+        for top in range(0, height, rows):
+            bottom = min(height, top + rows)
+            start = top - len(carry)
+            tile = np.concatenate([carry, rgb[top:min(height, bottom + halo)]])
+            carry = tile[max(0, bottom - halo) - start:bottom - start].copy()
+            rgb[top:bottom] = np.asarray(pipeline.apply(tile))[top - start:bottom - start]
+
+    def _decode(self, image, rows:int):
+        image = imfilters._open(image)
+        if not isinstance(image, Image.Image):
+            return imfilters.IMBuffer.open(image)
+        buffer = imfilters.IMBuffer.new(image.size)
+        target = buffer.image
+        width, height = image.size
+        for top in range(0, height, rows):
+            target.paste(image.crop((0, top, width, min(height, top + rows))), (0, top))
+        return buffer
+
+    def save(self, path, format:str=None, **params):
+        '''
+        Method responsible for saving image.
+        : param path: Name of the file or binary stream to be saved.
+        : param format: Format of the image, required for streams. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings. Ex: quality=85, subsampling=2, optimize=True, progressive=True, compress_level=1, method=4.
+        '''
+        imfilters._save(self.new_image, path, format, **params)
+
+    def to_bytes(self, format:str='PNG', **params):
+        '''
+        Method responsible for returning the image encoded in bytes.
+        : param format: Format of the image. Ex: 'JPEG', 'PNG', 'WEBP'.
+        : param params: Encoder settings, as in save.
+        '''
+        return imfilters._encode(self.new_image, format, **params)
+
+    def show(self):
+        '''
+        Method responsible for viewing the image.
+        '''
+        self.new_image.show()
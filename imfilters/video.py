@@ -0,0 +1,258 @@
+#
+# Streaming of videos and frame sequences through the filters
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import inspect
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from imfilters import imfilters
+
+_FOURCC = {'.avi': 'MJPG', '.mp4': 'mp4v', '.m4v': 'mp4v', '.mov': 'mp4v', '.mkv': 'XVID'}
+_END = object()
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _END
+
+def _read(capture):
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame, True
+    finally:
+        capture.release()
+
+def _source(src):
+    '''
+    Function responsible for opening the frames to be filtered.
+    : param src: Path of a video, camera index, printf pattern of images or sequence of paths and BGR arrays.
+    Ex: 'clip.mp4', 0, 'frames/%04d.png', ['a.png', 'b.png'].
+    Returns the iterator of BGR frames, with True for the frames decoded here, which may be filtered in place,
+    and the frames per second, None when unknown.
+    '''
+    if isinstance(src, (str, os.PathLike, int)):
+        capture = cv2.VideoCapture(src if isinstance(src, int) else os.fspath(src))
+        if not capture.isOpened():
+            raise OSError(f'Video -> {src} not found.')
+        return _read(capture), capture.get(cv2.CAP_PROP_FPS) or None
+    return ((cv2.imread(os.fspath(item)), True) if isinstance(item, (str, os.PathLike)) else (item, False) for item in src), None
+
+class IMVideo:
+    '''
+    Class responsible for applying a filter or preset to the frames of videos and frame sequences.
+    The constant work of the filters, lookup tables and color matrices, is done once on creation,
+    and consecutive lookup tables of a preset are merged in one. For speed the other stages of a preset
+    run over 8 bits, so a frame may differ by up to two levels from the same preset applied to a still image,
+    as Juno, Kelvin and Brooklyn do; the single filters give the same result.
+    Decoding, filtering and encoding run on their own threads linked by bounded queues.
+    Ex: IMVideo('Clarendon').run('clip.mp4', 'clip_clarendon.mp4')
+    : param name: Name of the filter or preset. Ex: 'IMContrast', 'Clarendon'.
+    : param threads: Number of threads splitting every frame in bands.
+    : param params: Parameters of the filter.
+    '''
+
+    def __init__(self, name:str, threads:int=None, **params):
+        if name not in imfilters.FILTERS and name not in imfilters.PRESETS:
+            raise ValueError(f'Filter -> {name} not applicable.')
+        self.name = name
+        self.threads = threads
+        self.params = params
+
+        steps = getattr(getattr(imfilters, name), 'steps', None)
+        single = steps is None
+        if single:
+            steps = ((name, params),)
+        elif params:
+            raise TypeError(f'{name} takes no parameters.')
+
+        self.stages = []
+        for step, step_params in steps:
+            cls = getattr(imfilters, step)
+            if single and step in imfilters._CHANNEL_FILTERS:
+                # A single filter takes the table it builds over the 8-bit levels of a still image.
+                table = np.repeat(np.arange(256, dtype=np.uint8)[None, :, None], 3, axis=2)
+                cls(table, inplace=True, **step_params)
+                self.stages.append(('lut', table, np.ascontiguousarray(table[..., ::-1])))
+            elif step in imfilters._CHANNEL_FILTERS:
+                # The filter applied to the 256 levels is its lookup table. Consecutive channel filters
+                # go over the same float32 levels, as in _chain, and are truncated once.
+                if self.stages and self.stages[-1][0] == 'lut':
+                    levels = self.stages.pop()[3]
+                else:
+                    levels = np.repeat(np.arange(256, dtype=np.float32)[:, None, None], 3, axis=2)
+                cls(levels, inplace=True, **step_params)
+                table = imfilters._quantize(levels).reshape(1, 256, 3)
+                self.stages.append(('lut', table, np.ascontiguousarray(table[..., ::-1]), levels))
+            elif step in imfilters._MATRIX_FILTERS:
+                matrix = cls(np.zeros((1, 1, 3), np.uint8), **step_params).matrix
+                self.stages.append(('matrix', imfilters._fixed(matrix)))
+            else:
+                self.stages.append(('filter', cls, step_params))
+
+    @property
+    def pointwise(self):
+        '''
+        True when every pixel of the result depends only on the same source pixel, so a palette can be filtered instead of the pixels.
+        '''
+        return all(stage[0] != 'filter' or stage[1].__name__ in imfilters._PIXEL_FILTERS for stage in self.stages)
+
+    def apply(self, frame, order:str='BGR', src=None):
+        '''
+        Method responsible for filtering one frame, overwriting it.
+        : param frame: uint8 array (rows, columns, 3), contiguous.
+        : param order: Channel order of the frame. Ex: 'BGR' as read by OpenCV, 'RGB' as read by Pillow.
+        : param src: Array of the same shape filtered into frame, read only by the first stage. Ex: one band of a source shared by several filters.
+        '''
+        buffer = imfilters.IMBuffer(frame, order)
+        source = buffer if src is None else imfilters.IMBuffer(src, order)
+        if not self.stages and src is not None:
+            frame[...] = src
+        for stage in self.stages:
+            if stage[0] == 'lut':
+                cv2.LUT(source.array, stage[1] if order == 'RGB' else stage[2], dst=frame)
+            elif stage[0] == 'matrix':
+                imfilters._point(source, stage[1], self.threads, buffer)
+            else:
+                cls, params = stage[1], stage[2]
+                accepted = inspect.signature(cls).parameters
+                if 'threads' in accepted and self.threads is not None:
+                    params = dict(params, threads=self.threads)
+                if source is buffer and 'inplace' in accepted:
+                    cls(buffer, inplace=True, **params)
+                elif 'out' in accepted:
+                    cls(source, out=buffer, **params)
+                else:
+                    buffer.rgb[...] = imfilters._pixels(imfilters._result_image(cls(source, **params)))
+            source = buffer
+        return frame
+
+    def frames(self, src, queue_size:int=8):
+        '''
+        Method responsible for returning the filtered frames, decoded and filtered ahead on two threads.
+        The arrays given in src are left unchanged.
+        : param src: Path of a video, camera index, printf pattern of images or sequence of paths and BGR arrays.
+        : param queue_size: Number of frames waiting between two stages.
+        '''
+        source, _ = _source(src)
+        return self._stream(source, queue_size)
+
+    def _stream(self, source, queue_size:int):
+        decoded = queue.Queue(queue_size)
+        filtered = queue.Queue(queue_size)
+        stop = threading.Event()
+        errors = []
+
+        def decode():
+            try:
+                for frame, owned in source:
+                    if stop.is_set():
+                        break
+                    if frame is None:
+                        raise OSError('Frame could not be read.')
+                    _put(decoded, (frame, owned), stop)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                _put(decoded, _END, stop)
+                close = getattr(source, 'close', None)
+                if close is not None:
+                    close()
+
+        def work():
+            try:
+                while True:
+                    item = _get(decoded, stop)
+                    if item is _END:
+                        break
+                    frame, owned = item
+                    if owned:
+                        frame = self.apply(frame)
+                    else:
+                        # The arrays of the caller are only read, the result goes to a new one.
+                        frame = self.apply(np.empty(frame.shape, np.uint8), src=np.ascontiguousarray(frame))
+                    _put(filtered, frame, stop)
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                _put(filtered, _END, stop)
+
+        workers = [threading.Thread(target=decode, daemon=True), threading.Thread(target=work, daemon=True)]
+        for worker in workers:
+            worker.start()
+        try:
+            while True:
+                frame = _get(filtered, stop)
+                if frame is _END:
+                    break
+                yield frame
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+        if errors:
+            raise errors[0]
+
+    def run(self, src, dst:str, fourcc:str=None, fps:float=None, queue_size:int=8):
+        '''
+        Method responsible for filtering a video or frame sequence into a new one. The arrays given in src are left unchanged.
+        Returns the number of frames, the seconds spent and the frames per second.
+        : param src: Path of a video, camera index, printf pattern of images or sequence of paths and BGR arrays.
+        : param dst: Path of the video, or printf pattern of images. Ex: 'out.mp4', 'out/%04d.png'.
+        : param fourcc: Codec of the video. Chosen by the extension when not informed. Ex: 'mp4v', 'MJPG'.
+        : param fps: Frames per second of the video. The same of the source when not informed.
+        : param queue_size: Number of frames waiting between two stages.
+        '''
+        source, source_fps = _source(src)
+        fps = fps or source_fps or 25.0
+        pattern = '%' in os.fspath(dst)
+        if fourcc is None:
+            fourcc = '' if pattern else _FOURCC.get(os.path.splitext(dst)[1].lower(), 'mp4v')
+        code = cv2.VideoWriter_fourcc(*fourcc) if fourcc else 0
+
+        writer = None
+        frames = 0
+        start = time.perf_counter()
+        try:
+            for frame in self._stream(source, queue_size):
+                if pattern and not fourcc:
+                    # Every frame is encoded by the extension of the pattern, numbered from 1.
+                    if not cv2.imwrite(os.fspath(dst) % (frames + 1), frame):
+                        raise OSError(f'Image -> {os.fspath(dst) % (frames + 1)} could not be written.')
+                    frames += 1
+                    continue
+                if writer is None:
+                    writer = cv2.VideoWriter(os.fspath(dst), code, fps, (frame.shape[1], frame.shape[0]))
+                    if not writer.isOpened():
+                        raise OSError(f'Video -> {dst} could not be written.')
+                writer.write(frame)
+                frames += 1
+        finally:
+            if writer is not None:
+                writer.release()
+        elapsed = time.perf_counter() - start
+        return {'frames': frames, 'seconds': elapsed, 'fps': frames / elapsed if elapsed else 0.0}
@@ -0,0 +1,397 @@
+#
+# Daemon filtering the images dropped in a folder on a persistent pool of workers
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.cli import _parse_value, _up_to_date
+from imfilters.jobs import _part
+from imfilters.pipeline import IMPipeline
+
+# Chain of the worker, planned once per process.
+_PIPELINE = None
+
+def _start(steps:list, threads:int):
+    '''
+    Function responsible for preparing a worker before the first image: imports, codecs and the planned chain.
+    '''
+    global _PIPELINE
+    # Ctrl+C stops the daemon, which finishes the images in flight.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    Image.init()
+    _PIPELINE = IMPipeline(steps, threads=threads)
+
+def _process(src:str, dst:str, format:str=None, options:dict=None):
+    '''
+    Function responsible for filtering one image in a worker, written to a temporary file and renamed.
+    Returns the pixels, the time it started and the seconds of decoding, filtering and encoding.
+    '''
+    started = time.time()
+    with Image.open(src) as im:
+        im.load()
+        decoded = time.time()
+        result = _PIPELINE.apply(im)
+        pixels = im.size[0] * im.size[1]
+    filtered = time.time()
+
+    folder = os.path.dirname(dst)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    part = _part(dst, f'{os.getpid()}')
+    try:
+        imfilters._save(result, part, format, **(options or {}))
+        os.replace(part, dst)
+    finally:
+        if os.path.exists(part):
+            os.unlink(part)
+    return {'pixels': pixels, 'started': started, 'decode': decoded - started, 'filter': filtered - decoded,
+            'encode': time.time() - filtered}
+
+def _steps(steps):
+    '''
+    Function responsible for reading the chain. Ex: 'Clarendon' -> [('Clarendon', {})].
+    '''
+    steps = [(steps, {})] if isinstance(steps, str) else [(name, dict(params)) for name, params in steps]
+    if not steps:
+        raise ValueError('At least one filter is required.')
+    for name, _ in steps:
+        if name not in imfilters.FILTERS and name not in imfilters.PRESETS:
+            raise ValueError(f'Filter -> {name} not applicable.')
+    # The parameters are checked here, a worker failing to plan the chain would break the whole pool.
+    try:
+        IMPipeline(steps)
+    except TypeError as e:
+        raise ValueError(str(e)) from None
+    return steps
+
+def _percentile(values:list, percent:float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+class IMWatch:
+    '''
+    Class responsible for watching a folder and filtering every image dropped in it, as a long running daemon.
+    The folder is polled every interval seconds. A file is taken only when it was not modified for settle
+    seconds, so the files still being written or copied are left for a later poll. Temporary and hidden
+    files are ignored.
+    The images run on a persistent pool of processes, started once with the chain planned, and up to two
+    images per worker are in flight, so a worker never waits for the next poll to start another one.
+    Every result is written to the output folder, through a temporary file renamed at the end, and its
+    latency is logged: from the last write of the source to the output written, with the wait for a worker
+    and the seconds of decoding, filtering and encoding.
+    A worker dying in the middle of an image breaks the pool: the images in flight on it are recorded as
+    failed, and a new pool is started for the next ones.
+    An image is taken again only when it changes. At start the images with an output newer than them are skipped.
+    Ex: IMWatch('incoming', 'filtered', 'Clarendon', options={'quality': 85}, log='filtered/latency.jsonl').run()
+        IMWatch('incoming', 'filtered', [('IMContrast', {'adjust': 10}), ('IMSharpen', {})], format='webp')
+    : param folder: Folder watched, with its subfolders.
+    : param output: Folder of the results, with the same subfolders.
+    : param steps: Name of the filter or preset, or sequence of (name, params) applied in order.
+    : param options: Encoder settings. Ex: {'quality': 85, 'progressive': True}.
+    : param format: Output format extension. Ex: 'jpg', 'webp'. The extension of the source when not informed.
+    : param workers: Number of worker processes.
+    : param interval: Seconds between the polls.
+    : param settle: Seconds a file must stay unmodified before it is taken.
+    : param processed: Folder where the sources are moved after filtered. They stay in place when not informed.
+    : param log: File where the latency of every image is appended, in JSON lines.
+    : param threads: Number of threads of every worker splitting the filters in bands.
+    '''
+
+    def __init__(self, folder:str, output:str, steps, options:dict=None, format:str=None, workers:int=None,
+                 interval:float=1.0, settle:float=2.0, processed:str=None, log:str=None, threads:int=1):
+        self.folder = folder
+        self.output = output
+        self.steps = _steps(steps)
+        self.options = options or {}
+        self.format = format
+        self.workers = workers or os.cpu_count() or 1
+        self.interval = interval
+        self.settle = settle
+        self.processed = processed
+        self.log = log
+        self.threads = threads
+        self.on_result = None
+
+        self._skip = {os.path.abspath(path) for path in (output, processed) if path}
+        self._extensions = set(Image.registered_extensions())
+        self._handled = {}
+        self._ready = deque()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._latencies = deque(maxlen=1000)
+        self._done = 0
+        self._failed = 0
+        self._pixels = 0
+        self._restarts = 0
+        self._broken = False
+        self._started = time.time()
+        self._log = open(log, 'a') if log else None
+
+        Image.init()
+        self.executor = self._pool()
+        for src, signature in self._files():
+            if _up_to_date(src, self._output(src)):
+                self._handled[src] = signature
+
+    def _pool(self):
+        return ProcessPoolExecutor(self.workers, initializer=_start, initargs=(self.steps, self.threads))
+
+    def _restart(self):
+        '''
+        Method responsible for replacing a broken pool of workers with a new one.
+        '''
+        self.executor.shutdown(wait=False)
+        self.executor = self._pool()
+        self._broken = False
+        self._restarts += 1
+
+    def _output(self, src:str):
+        base, ext = os.path.splitext(os.path.relpath(src, self.folder))
+        return os.path.join(self.output, base + ('.' + self.format.lower() if self.format else ext))
+
+    def _files(self):
+        for root, dirs, files in os.walk(self.folder):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and os.path.abspath(os.path.join(root, d)) not in self._skip)
+            for file in sorted(files):
+                base, ext = os.path.splitext(file)
+                if file.startswith('.') or base.endswith('.part') or ext.lower() not in self._extensions:
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, (stat.st_size, stat.st_mtime)
+
+    def scan(self):
+        '''
+        Method responsible for one poll of the folder. Returns the number of images that became ready.
+        '''
+        now = time.time()
+        ready = 0
+        present = set()
+        with self._lock:
+            busy = set(self._in_flight.values()) | {src for src, _ in self._ready}
+        for src, signature in self._files():
+            present.add(src)
+            size, mtime = signature
+            if src in busy or self._handled.get(src) == signature:
+                continue
+            if size == 0 or now - mtime < self.settle:
+                # Still being written, or just finished: wait for it to settle.
+                continue
+            self._handled[src] = signature
+            self._ready.append((src, mtime))
+            ready += 1
+        for src in set(self._handled) - present:
+            del self._handled[src]
+        return ready
+
+    def _submit(self):
+        if self._broken:
+            self._restart()
+        while self._ready and len(self._in_flight) < self.workers * 2:
+            src, mtime = self._ready.popleft()
+            queued = time.time()
+            try:
+                future = self.executor.submit(_process, src, self._output(src), self.format, self.options)
+            except BrokenProcessPool:
+                # The pool broke before its failed images were reported, this one goes to a new pool.
+                self._restart()
+                future = self.executor.submit(_process, src, self._output(src), self.format, self.options)
+            executor = self.executor
+            with self._lock:
+                self._in_flight[future] = src
+            future.add_done_callback(lambda future, mtime=mtime, queued=queued, executor=executor: self._finish(future, mtime, queued, executor))
+
+    def _finish(self, future, mtime:float, queued:float, executor):
+        now = time.time()
+        with self._lock:
+            src = self._in_flight.pop(future)
+        dst = self._output(src)
+        record = {'src': src, 'dst': dst, 'finished': now, 'latency': now - mtime}
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            record.update(status='failed', error=f'Worker died: {e}')
+            with self._lock:
+                # Only the current pool is replaced, the images of an old one may be reported after the restart.
+                if executor is self.executor:
+                    self._broken = True
+        except Exception as e:
+            record.update(status='failed', error=str(e))
+        else:
+            record.update(status='done', wait=result.pop('started') - queued, **result)
+            if self.processed:
+                moved = os.path.join(self.processed, os.path.relpath(src, self.folder))
+                try:
+                    os.makedirs(os.path.dirname(moved) or '.', exist_ok=True)
+                    os.replace(src, moved)
+                except OSError as e:
+                    record.update(status='failed', error=f'Not moved to {moved}: {e}')
+
+        with self._lock:
+            if record['status'] == 'done':
+                self._done += 1
+                self._pixels += record['pixels']
+                self._latencies.append(record['latency'])
+            else:
+                self._failed += 1
+            if self._log:
+                self._log.write(json.dumps(record) + '\n')
+                self._log.flush()
+        if self.on_result:
+            self.on_result(record)
+
+    def poll(self):
+        '''
+        Method responsible for scanning the folder and handing the ready images to the workers.
+        Returns the number of images that became ready.
+        '''
+        ready = self.scan()
+        self._submit()
+        return ready
+
+    def run(self, duration:float=None):
+        '''
+        Method responsible for watching the folder until stop is called, or for duration seconds.
+        The images in flight are finished before returning.
+        : param duration: Seconds to watch. Until stop when not informed.
+        '''
+        end = None if duration is None else time.time() + duration
+        while not self._stop.is_set() and (end is None or time.time() < end):
+            self.poll()
+            self._stop.wait(self.interval if end is None else max(0.0, min(self.interval, end - time.time())))
+        self.drain()
+
+    def drain(self):
+        '''
+        Method responsible for waiting for the images ready and in flight.
+        '''
+        while self._ready or self._in_flight:
+            self._submit()
+            time.sleep(0.01)
+
+    def stop(self):
+        '''
+        Method responsible for stopping run, from another thread or a signal handler.
+        '''
+        self._stop.set()
+
+    def stats(self):
+        '''
+        Method responsible for returning the images done and failed, the restarts of the pool, the backlog and the latency in seconds.
+        '''
+        with self._lock:
+            latencies = list(self._latencies)
+            elapsed = time.time() - self._started
+            return {
+                'done': self._done,
+                'failed': self._failed,
+                'restarts': self._restarts,
+                'in_flight': len(self._in_flight),
+                'ready': len(self._ready),
+                'images_per_sec': self._done / elapsed if elapsed else 0.0,
+                'mp_per_sec': self._pixels / 1e6 / elapsed if elapsed else 0.0,
+                'latency_p50': _percentile(latencies, 50),
+                'latency_p95': _percentile(latencies, 95),
+                'latency_max': max(latencies) if latencies else None,
+                'uptime': elapsed,
+            }
+
+    def close(self):
+        '''
+        Method responsible for releasing the workers and the log.
+        '''
+        self.executor.shutdown()
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='imfilters-watch', description='Filter the images dropped in a folder, as a daemon.')
+    parser.add_argument('folder', help='Folder watched.')
+    parser.add_argument('output', help='Folder of the results.')
+    parser.add_argument('-s', '--step', action='append', required=True, metavar='NAME[:KEY=VALUE...]',
+                        help='Filter or preset, applied in the order given. Ex: -s IMContrast:adjust=10 -s Clarendon')
+    parser.add_argument('-e', '--encode', action='append', default=[], metavar='KEY=VALUE', help='Encoder setting. Ex: -e quality=85')
+    parser.add_argument('-f', '--format', help='Output format extension. Ex: png, jpg.')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between the polls.')
+    parser.add_argument('--settle', type=float, default=2.0, help='Seconds a file must stay unmodified before it is taken.')
+    parser.add_argument('--processed', metavar='DIR', help='Move the sources here after filtered.')
+    parser.add_argument('--log', metavar='FILE', help='Append the latency of every image, in JSON lines.')
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    steps = []
+    for item in args.step:
+        name, *pairs = item.split(':')
+        params = {}
+        for pair in pairs:
+            key, sep, value = pair.partition('=')
+            if not sep:
+                parser.error(f'parameter -> {pair} must be KEY=VALUE')
+            params[key] = _parse_value(value)
+        steps.append((name, params))
+
+    options = {}
+    for item in args.encode:
+        key, sep, value = item.partition('=')
+        if not sep or key not in imfilters.ENCODER_OPTIONS:
+            parser.error(f'encoder setting -> {item} must be KEY=VALUE, KEY in ' + ', '.join(imfilters.ENCODER_OPTIONS))
+        options[key] = _parse_value(value)
+
+    try:
+        watch = IMWatch(args.folder, args.output, steps, options, args.format, args.workers, args.interval, args.settle,
+                        args.processed, args.log)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def report(record):
+        if record['status'] == 'done':
+            print(f"{record['src']} -> {record['dst']} {record['latency'] * 1000:.0f} ms (wait {record['wait'] * 1000:.0f}, "
+                  f"decode {record['decode'] * 1000:.0f}, filter {record['filter'] * 1000:.0f}, encode {record['encode'] * 1000:.0f})", flush=True)
+        else:
+            print(f"{record['src']}: {record['error']}", file=sys.stderr, flush=True)
+
+    if not args.quiet:
+        watch.on_result = report
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: watch.stop())
+    print(f'Watching {args.folder} -> {args.output}', flush=True)
+    try:
+        watch.run()
+    finally:
+        watch.close()
+    stats = watch.stats()
+    print(f"{stats['done']} images, {stats['failed']} failed, latency p50 {(stats['latency_p50'] or 0) * 1000:.0f} ms, "
+          f"p95 {(stats['latency_p95'] or 0) * 1000:.0f} ms")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,11 +14,18 @@ setuptools.setup(
     install_requires=['Pillow','opencv-python'],
     url="https://github.com/informeai/imfilters",
     packages=setuptools.find_packages(),
+    entry_points={
+        'console_scripts': [
+            'imfilters=imfilters.cli:main',
+            'imfilters-server=imfilters.server:main',
+            'imfilters-watch=imfilters.watch:main',
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
 
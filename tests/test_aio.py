@@ -0,0 +1,128 @@
+#
+# IMAsync keeps a bounded number of jobs in flight and gives their slots back on timeout and cancellation
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import asyncio
+import io
+import unittest
+from concurrent.futures import Future
+
+from PIL import Image
+
+from imfilters.aio import IMAsync
+
+class _Executor:
+    '''
+    Executor whose jobs finish only when the test sets their result.
+    '''
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+class TestAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.image = Image.new('RGB', (24, 16), (90, 120, 200))
+
+    def test_filter(self):
+        async def main():
+            async with IMAsync(workers=2) as aio:
+                return await aio.IMContrast(self.image, adjust=10), await aio.apply('Clarendon', self.image, format='JPEG')
+        png, jpeg = asyncio.run(main())
+        self.assertEqual(Image.open(io.BytesIO(png)).size, (24, 16))
+        self.assertEqual(Image.open(io.BytesIO(jpeg)).format, 'JPEG')
+
+    def test_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(IMAsync(_Executor()).apply('IMNothing', self.image))
+
+    def test_back_pressure(self):
+        executor = _Executor()
+
+        async def main():
+            aio = IMAsync(executor, limit=2)
+            tasks = [asyncio.ensure_future(aio.IMInvert(self.image)) for _ in range(3)]
+            await _settle()
+            self.assertEqual(len(executor.futures), 2)
+            executor.futures[0].set_result(b'first')
+            await _settle()
+            self.assertEqual(len(executor.futures), 3)
+            for future in executor.futures[1:]:
+                future.set_result(b'next')
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(asyncio.run(main()), [b'first', b'next', b'next'])
+
+    def test_timeout_releases_slot(self):
+        executor = _Executor()
+
+        async def main():
+            aio = IMAsync(executor, limit=1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await aio.IMInvert(self.image, timeout=0.05)
+            self.assertTrue(executor.futures[0].cancelled())
+            task = asyncio.ensure_future(aio.IMInvert(self.image))
+            await _settle()
+            self.assertEqual(len(executor.futures), 2)
+            executor.futures[1].set_result(b'done')
+            return await task
+
+        self.assertEqual(asyncio.run(main()), b'done')
+
+    def test_cancel_releases_slot(self):
+        executor = _Executor()
+
+        async def main():
+            aio = IMAsync(executor, limit=1)
+            first = asyncio.ensure_future(aio.IMInvert(self.image))
+            waiting = asyncio.ensure_future(aio.IMInvert(self.image))
+            await _settle()
+            self.assertEqual(len(executor.futures), 1)
+            # The job waiting for a slot and the job not started yet are dropped, the slot goes to the next one.
+            waiting.cancel()
+            first.cancel()
+            await _settle()
+            self.assertTrue(executor.futures[0].cancelled())
+            task = asyncio.ensure_future(aio.IMInvert(self.image))
+            await _settle()
+            self.assertEqual(len(executor.futures), 2)
+            executor.futures[1].set_result(b'done')
+            return await task
+
+        self.assertEqual(asyncio.run(main()), b'done')
+
+    def test_running_job_holds_slot(self):
+        executor = _Executor()
+
+        async def main():
+            aio = IMAsync(executor, limit=1)
+            first = asyncio.ensure_future(aio.IMInvert(self.image))
+            await _settle()
+            executor.futures[0].set_running_or_notify_cancel()
+            first.cancel()
+            await _settle()
+            task = asyncio.ensure_future(aio.IMInvert(self.image))
+            await _settle()
+            self.assertEqual(len(executor.futures), 1)
+            executor.futures[0].set_result(b'late')
+            await _settle()
+            self.assertEqual(len(executor.futures), 2)
+            executor.futures[1].set_result(b'done')
+            return await task
+
+        self.assertEqual(asyncio.run(main()), b'done')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#
+# IMAnimation filters every frame of animated and multi-page images and keeps their timing
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import unittest
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from imfilters import imfilters
+from imfilters.aio import _render
+from imfilters.animation import IMAnimation
+from imfilters.video import IMVideo
+
+def _still(name, pixels, params):
+    if name in imfilters.PRESETS:
+        # The presets of the animations run over 8 bits, as IMVideo, a level or two from the stills.
+        return IMVideo(name).apply(pixels.copy(), 'RGB')
+    return imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(pixels.copy(), **params)))
+
+class TestAnimation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (20, 28, 3), dtype=np.uint8) for _ in range(4)]
+        self.durations = [40, 80, 120, 160]
+
+    def encode(self, frames, format, **params):
+        buffer = io.BytesIO()
+        frames[0].save(buffer, format, save_all=True, append_images=frames[1:], duration=self.durations, loop=0, **params)
+        return buffer.getvalue()
+
+    def decoded(self, data):
+        im = Image.open(io.BytesIO(data))
+        return im, [frame.copy() for frame in ImageSequence.Iterator(im)]
+
+    def test_gif_palette(self):
+        frames = [Image.fromarray(frame).quantize(64) for frame in self.frames]
+        im, result = self.decoded(IMAnimation('IMInvert').to_bytes(self.encode(frames, 'GIF'), 'GIF'))
+        self.assertEqual(im.format, 'GIF')
+        self.assertEqual(len(result), 4)
+        self.assertEqual([frame.info['duration'] for frame in result], self.durations)
+        for source, frame in zip(ImageSequence.Iterator(Image.open(io.BytesIO(self.encode(frames, 'GIF')))), result):
+            # Only the palette is filtered, every index keeps its inverted color.
+            np.testing.assert_array_equal(np.asarray(frame.convert('RGB')), 255 - np.asarray(source.convert('RGB')))
+
+    def test_apng(self):
+        frames = [Image.fromarray(frame) for frame in self.frames]
+        for name, params in (('IMContrast', {'adjust': 20}), ('IMGaussBlur', {'radius': 1}), ('Clarendon', {})):
+            with self.subTest(name=name):
+                im, result = self.decoded(IMAnimation(name, **params).to_bytes(self.encode(frames, 'PNG'), 'PNG'))
+                self.assertEqual(len(result), 4)
+                self.assertEqual([frame.info['duration'] for frame in result], self.durations)
+                for source, frame in zip(self.frames, result):
+                    expected = _still(name, source, params)
+                    np.testing.assert_array_equal(np.asarray(frame.convert('RGB')), expected)
+
+    def test_alpha_kept(self):
+        frames = []
+        for frame in self.frames:
+            rgba = Image.fromarray(frame).convert('RGBA')
+            rgba.putalpha(Image.fromarray(frame[..., 0]))
+            frames.append(rgba)
+        _, result = self.decoded(IMAnimation('IMSepia').to_bytes(self.encode(frames, 'PNG'), 'PNG'))
+        for source, frame in zip(frames, result):
+            self.assertEqual(frame.mode, 'RGBA')
+            np.testing.assert_array_equal(np.asarray(frame.getchannel('A')), np.asarray(source.getchannel('A')))
+
+    def test_webp_and_tiff(self):
+        frames = [Image.fromarray(frame) for frame in self.frames]
+        source = self.encode(frames, 'PNG')
+        im, result = self.decoded(IMAnimation('IMInvert').to_bytes(source, 'WEBP', lossless=True))
+        self.assertEqual((im.format, len(result)), ('WEBP', 4))
+        self.assertEqual([frame.info['duration'] for frame in result], self.durations)
+        im, result = self.decoded(IMAnimation('IMInvert').to_bytes(source, 'TIFF'))
+        self.assertEqual((im.format, len(result)), ('TIFF', 4))
+        for frame, expected in zip(result, self.frames):
+            np.testing.assert_array_equal(np.asarray(frame), 255 - expected)
+
+    def test_single_frame_format(self):
+        with self.assertRaises(ValueError):
+            IMAnimation('IMInvert').to_bytes(Image.fromarray(self.frames[0]), 'JPEG')
+
+    def test_async_webp(self):
+        frames = [Image.fromarray(frame) for frame in self.frames]
+        im, result = self.decoded(_render('IMInvert', self.encode(frames, 'GIF'), {}, 'webp', {'lossless': True}))
+        self.assertEqual((im.format, len(result)), ('WEBP', 4))
+
+if __name__ == '__main__':
+    unittest.main()
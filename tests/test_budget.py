@@ -0,0 +1,89 @@
+#
+# IMBudget admits jobs while their estimates fit in the memory shared by the workers
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from imfilters.budget import IMBudget, _bytes, estimate
+
+class TestBudget(unittest.TestCase):
+
+    def acquire_later(self, budget, nbytes):
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: budget.acquire(nbytes) and acquired.set(), daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return acquired
+
+    def test_sizes(self):
+        self.assertEqual(_bytes('512M'), 512 << 20)
+        self.assertEqual(_bytes('1.5g'), 3 << 29)
+        self.assertEqual(_bytes('2048'), 2048)
+        self.assertIsNone(_bytes(None))
+        self.assertEqual(IMBudget(0).limit, 0)
+
+    def test_blocks_until_released(self):
+        budget = IMBudget(100, workers=2)
+        self.assertTrue(budget.acquire(60))
+        acquired = self.acquire_later(budget, 60)
+        self.assertFalse(acquired.wait(0.2))
+        budget.release(60)
+        self.assertTrue(acquired.wait(5))
+        self.assertEqual((budget.in_use, budget.running), (60, 1))
+
+    def test_no_wait(self):
+        budget = IMBudget(100)
+        self.assertTrue(budget.acquire(60, timeout=0))
+        start = time.perf_counter()
+        self.assertFalse(budget.acquire(60, timeout=0))
+        self.assertFalse(budget.acquire(60, timeout=0.05))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual((budget.in_use, budget.running), (60, 1))
+        self.assertTrue(budget.acquire(40, timeout=0))
+
+    def test_released_on_error(self):
+        budget = IMBudget(100)
+        with self.assertRaises(RuntimeError):
+            with budget.reserve(80):
+                self.assertEqual(budget.in_use, 80)
+                raise RuntimeError('job failed')
+        self.assertEqual((budget.in_use, budget.running), (0, 0))
+        self.assertTrue(budget.acquire(100, timeout=0))
+
+    def test_oversized_job_alone(self):
+        budget = IMBudget(100)
+        # Larger than the whole budget: admitted when nothing else runs, and nothing joins it.
+        self.assertTrue(budget.acquire(500, timeout=0))
+        self.assertFalse(budget.acquire(1, timeout=0))
+        budget.release(500)
+
+        self.assertTrue(budget.acquire(10, timeout=0))
+        acquired = self.acquire_later(budget, 500)
+        self.assertFalse(acquired.wait(0.2))
+        budget.release(10)
+        self.assertTrue(acquired.wait(5))
+
+    def test_no_limit(self):
+        budget = IMBudget(0, workers=4)
+        for _ in range(8):
+            self.assertTrue(budget.acquire(1 << 40, timeout=0))
+
+    def test_plan(self):
+        image = np.zeros((1000, 1000, 3), np.uint8)
+        nbytes = estimate(image, 'IMGaussBlur')
+        self.assertEqual(IMBudget(nbytes * 4, workers=2).plan(image, 'IMGaussBlur'), (False, nbytes))
+        tiled, small = IMBudget(nbytes, workers=2).plan(image, 'IMGaussBlur')
+        self.assertTrue(tiled)
+        self.assertLess(small, nbytes)
+        # A filter reading the whole image can not be tiled.
+        self.assertFalse(IMBudget(1, workers=2).plan(image, 'IMNormalize')[0])
+
+if __name__ == '__main__':
+    unittest.main()
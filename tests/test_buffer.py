@@ -0,0 +1,82 @@
+#
+# IMBuffer shares one pixel buffer between NumPy, OpenCV channel order and Pillow
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.io import IMBuffer
+
+class TestBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (30, 40, 3), dtype=np.uint8)
+
+    def test_views(self):
+        buffer = IMBuffer(self.pixels)
+        self.assertEqual(buffer.size, (40, 30))
+        self.assertTrue(np.shares_memory(buffer.rgb, self.pixels))
+        self.assertTrue(np.shares_memory(buffer.bgr, self.pixels))
+        np.testing.assert_array_equal(buffer.bgr, self.pixels[..., ::-1])
+        array = np.asarray(buffer)
+        self.assertTrue(np.shares_memory(array, self.pixels))
+        np.testing.assert_array_equal(array, self.pixels)
+
+        bgr = IMBuffer(np.ascontiguousarray(self.pixels[..., ::-1]), 'BGR')
+        np.testing.assert_array_equal(bgr.rgb, self.pixels)
+        np.testing.assert_array_equal(np.asarray(bgr), self.pixels)
+        np.testing.assert_array_equal(np.asarray(bgr.image), self.pixels)
+
+    def test_image_shares_rgbx(self):
+        buffer = IMBuffer.new((40, 30))
+        self.assertTrue((buffer.array[..., 3] == 255).all())
+        im = buffer.image
+        im.paste((10, 20, 30), (0, 0, 5, 5))
+        np.testing.assert_array_equal(buffer.rgb[:5, :5], np.broadcast_to([10, 20, 30], (5, 5, 3)))
+        buffer.array[6, 6, :3] = (1, 2, 3)
+        self.assertEqual(im.getpixel((6, 6))[:3], (1, 2, 3))
+
+        frozen = buffer.array.copy()
+        frozen.flags.writeable = False
+        self.assertTrue(IMBuffer(frozen).image.readonly)
+
+    def test_open(self):
+        data = io.BytesIO()
+        Image.fromarray(self.pixels).save(data, 'PNG')
+        for channels in (3, 4):
+            with self.subTest(channels=channels):
+                buffer = IMBuffer.open(data.getvalue(), channels)
+                self.assertEqual(buffer.array.shape, (30, 40, channels))
+                np.testing.assert_array_equal(buffer.rgb, self.pixels)
+        buffer = IMBuffer(self.pixels)
+        self.assertIs(IMBuffer.open(buffer), buffer)
+
+    def test_invalid(self):
+        for array in (self.pixels.astype(np.float32), self.pixels[..., 0], np.zeros((4, 4, 2), np.uint8), [[1, 2, 3]]):
+            with self.assertRaises(ValueError):
+                IMBuffer(array)
+        with self.assertRaises(ValueError):
+            IMBuffer(self.pixels, 'HSV')
+
+    def test_filters_write_bgr(self):
+        # OpenCV frames are filtered in their own order, with no conversion to RGB.
+        for name, params in (('IMContrast', {'adjust': 10}), ('IMSepia', {}), ('IMGaussBlur', {'radius': 2}), ('IMNormalize', {})):
+            with self.subTest(name=name):
+                expected = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(self.pixels.copy(), **params)))
+                frame = np.ascontiguousarray(self.pixels[..., ::-1])
+                getattr(imfilters, name)(IMBuffer(frame, 'BGR'), inplace=True, **params)
+                np.testing.assert_array_equal(frame[..., ::-1], expected)
+
+                out = np.empty_like(frame)
+                getattr(imfilters, name)(IMBuffer(np.ascontiguousarray(self.pixels[..., ::-1]), 'BGR'), out=IMBuffer(out, 'BGR'), **params)
+                np.testing.assert_array_equal(out[..., ::-1], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#
+# A batch run with a checkpoint resumes where it stopped and skips what did not change
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from imfilters import cli
+from imfilters.checkpoint import IMCheckpoint, _digest, _key
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'run.ckpt')
+        self.inputs = os.path.join(self.tmp.name, 'in')
+        self.output = os.path.join(self.tmp.name, 'out')
+        os.makedirs(self.inputs)
+        for index in range(3):
+            Image.new('RGB', (16, 12), (index * 60, 90, 120)).save(os.path.join(self.inputs, f'{index}.png'))
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(['IMContrast', self.inputs, '-o', self.output, '-p', 'adjust=10', '--checkpoint', self.path, *argv])
+        return code, stdout.getvalue()
+
+    def test_torn_last_line(self):
+        dst = os.path.join(self.tmp.name, 'a.png')
+        with open(dst, 'wb') as f:
+            f.write(b'filtered')
+        with IMCheckpoint(self.path) as checkpoint:
+            checkpoint.record('a.png', dst, 'key', 'source', {dst: _digest(dst)})
+            checkpoint.record('b.png', 'b.png', 'key', 'source', error='broken')
+        # A run killed in the middle of writing its next record.
+        with open(self.path, 'a') as f:
+            f.write('{"src": "c.png", "dst": "c.p')
+
+        with IMCheckpoint(self.path) as checkpoint:
+            self.assertEqual(sorted(checkpoint.records), sorted([dst, 'b.png']))
+            self.assertTrue(checkpoint.done(dst, 'key', 'source'))
+            self.assertFalse(checkpoint.done('b.png', 'key', 'source'))
+            checkpoint.record('c.png', 'c.png', 'key', 'source', error='broken')
+        with open(self.path) as f:
+            self.assertEqual([json.loads(line)['src'] for line in f], ['a.png', 'b.png', 'c.png'])
+
+    def test_empty_outputs_not_done(self):
+        with IMCheckpoint(self.path) as checkpoint:
+            checkpoint.record('a.png', 'a.png', 'key', 'source', {})
+            self.assertFalse(checkpoint.done('a.png', 'key', 'source'))
+
+    def test_resume_skips_unchanged(self):
+        code, out = self.run_cli()
+        self.assertEqual(code, 0)
+        self.assertIn('3 images', out)
+        code, out = self.run_cli()
+        self.assertIn('0 images', out)
+        self.assertIn('3 up to date', out)
+
+        # A changed source and a changed output are filtered again, and so is everything with other settings.
+        Image.new('RGB', (16, 12), (1, 2, 3)).save(os.path.join(self.inputs, '0.png'))
+        with open(os.path.join(self.output, '1.png'), 'ab') as f:
+            f.write(b'\0')
+        code, out = self.run_cli()
+        self.assertIn('2 images', out)
+        self.assertIn('1 up to date', out)
+        code, out = self.run_cli('-e', 'compress_level=1')
+        self.assertIn('3 images', out)
+
+    def test_resume_after_torn_line(self):
+        self.run_cli()
+        with open(self.path) as f:
+            lines = f.readlines()
+        # The run was killed while writing the record of the last image.
+        with open(self.path, 'w') as f:
+            f.writelines(lines[:-1])
+            f.write(lines[-1][:len(lines[-1]) // 2])
+        code, out = self.run_cli()
+        self.assertIn('1 images', out)
+        self.assertIn('2 up to date', out)
+        checkpoint = IMCheckpoint(self.path)
+        checkpoint.close()
+        key = _key(name='IMContrast', params={'adjust': 10}, options={}, region={}, widths=None, format=None)
+        for index in range(3):
+            src, dst = os.path.join(self.inputs, f'{index}.png'), os.path.join(self.output, f'{index}.png')
+            self.assertTrue(checkpoint.done(dst, key, _digest(src)))
+
+    def test_not_with_queue(self):
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            self.run_cli('--queue', os.path.join(self.tmp.name, 'queue'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#
+# Filters encode to files and bytes with the encoder settings of Pillow
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image, JpegImagePlugin
+
+from imfilters import imfilters
+from imfilters.io import IMBuffer, _encode, _format
+
+class TestEncode(unittest.TestCase):
+
+    def setUp(self):
+        rows = np.linspace(0, 255, 96, dtype=np.uint8)
+        noise = np.random.default_rng(0).integers(0, 40, (64, 96, 3), dtype=np.uint8)
+        self.pixels = np.dstack([np.tile(rows, (64, 1))] * 3) // 2 + noise
+
+    def test_format(self):
+        self.assertEqual(_format('photo.jpg'), 'JPEG')
+        self.assertEqual(_format('photo.WEBP'), 'WEBP')
+        self.assertEqual(_format(io.BytesIO()), 'PNG')
+        self.assertEqual(_format('photo.png', 'jpg'), 'JPEG')
+
+    def test_to_bytes_matches_save(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for name in ('IMContrast', 'IMGaussBlur', 'IMNormalize', 'IMPixelated', 'IMSoftSat'):
+                with self.subTest(name=name):
+                    filter = getattr(imfilters, name)(self.pixels.copy())
+                    path = os.path.join(folder, f'{name}.jpg')
+                    filter.save(path, quality=80)
+                    with open(path, 'rb') as f:
+                        self.assertEqual(filter.to_bytes('JPEG', quality=80), f.read())
+                    self.assertEqual(Image.open(io.BytesIO(filter.to_bytes())).format, 'PNG')
+
+    def test_presets_to_streams(self):
+        stream = io.BytesIO()
+        imfilters.Clarendon(self.pixels.copy(), stream)
+        expected = imfilters._encode(imfilters._chain(imfilters.Clarendon.steps, self.pixels.copy()), 'PNG')
+        self.assertEqual(stream.getvalue(), expected)
+
+    def test_settings(self):
+        image = Image.fromarray(self.pixels)
+        self.assertLess(len(_encode(image, 'JPEG', quality=20)), len(_encode(image, 'JPEG', quality=95)))
+        self.assertLess(len(_encode(image, 'PNG', compress_level=9)), len(_encode(image, 'PNG', compress_level=1)))
+        self.assertIn('progressive', Image.open(io.BytesIO(_encode(image, 'JPEG', progressive=True))).info)
+        for subsampling in (0, 2):
+            jpeg = Image.open(io.BytesIO(_encode(image, 'JPEG', subsampling=subsampling)))
+            self.assertEqual(JpegImagePlugin.get_sampling(jpeg), subsampling)
+        self.assertEqual(Image.open(io.BytesIO(_encode(image, 'WEBP', quality=80, method=6))).format, 'WEBP')
+
+    def test_modes(self):
+        rgba = Image.fromarray(self.pixels).convert('RGBA')
+        self.assertEqual(Image.open(io.BytesIO(_encode(rgba, 'JPEG'))).mode, 'RGB')
+        self.assertEqual(Image.open(io.BytesIO(_encode(rgba, 'PNG'))).mode, 'RGBA')
+        buffer = IMBuffer.new((8, 6))
+        self.assertEqual(Image.open(io.BytesIO(_encode(buffer, 'PNG'))).mode, 'RGB')
+        self.assertEqual(Image.open(io.BytesIO(buffer.to_bytes('JPEG'))).size, (8, 6))
+
+if __name__ == '__main__':
+    unittest.main()
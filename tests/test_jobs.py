@@ -0,0 +1,150 @@
+#
+# IMJobQueue drained by several processes, with leases expiring and taken over
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import functools
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from imfilters.cli import _apply
+from imfilters.jobs import IMJobQueue, _part
+
+def _copy(name:str, src:str, dst:str, params:dict, options:dict):
+    shutil.copyfile(src, dst)
+    return 1
+
+def _worker(folder:str):
+    return IMJobQueue(folder, lease=5).run(work=_copy, poll=0.05)
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.folder = os.path.join(self.tmp.name, 'queue')
+        self.items = []
+        for index in range(23):
+            src = os.path.join(self.tmp.name, f'{index}.txt')
+            with open(src, 'w') as f:
+                f.write(str(index))
+            self.items.append((src, os.path.join(self.tmp.name, 'out', f'{index}.txt')))
+
+    def test_create_once(self):
+        self.assertTrue(IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=4))
+        self.assertFalse(IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=8))
+        self.assertEqual(IMJobQueue(self.folder).chunk, 4)
+
+    def test_chunk_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=0)
+
+    def test_two_processes(self):
+        IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=2)
+        with multiprocessing.Pool(2) as pool:
+            totals = pool.map(_worker, [self.folder] * 2)
+        self.assertEqual(sum(total['done'] for total in totals), len(self.items))
+        queue = IMJobQueue(self.folder)
+        self.assertEqual(queue.status()['done'], queue.chunks)
+        self.assertEqual(sum(result['done'] for result in queue.results().values()), len(self.items))
+        for src, dst in self.items:
+            with open(src) as a, open(dst) as b:
+                self.assertEqual(a.read(), b.read())
+        self.assertEqual([name for name in os.listdir(os.path.dirname(self.items[0][1])) if '.part' in name], [])
+
+    def test_expired_lease_is_taken(self):
+        IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=len(self.items))
+        crashed = IMJobQueue(self.folder, lease=1, worker='crashed')
+        self.assertEqual(crashed.claim(), 0)
+        dst = self.items[0][1]
+        os.makedirs(os.path.dirname(dst))
+        open(_part(dst, 'crashed'), 'w').close()
+
+        other = IMJobQueue(self.folder, lease=1, worker='other')
+        self.assertIsNone(other.claim())
+        past = time.time() - 10
+        os.utime(crashed._lease(0), (past, past))
+        self.assertEqual(other.claim(), 0)
+        self.assertFalse(os.path.exists(_part(dst, 'crashed')))
+        self.assertFalse(crashed.renew(0))
+        self.assertTrue(other.renew(0))
+
+    def test_fresh_lease_is_not_taken(self):
+        # A worker seeing the lease expired, while another one already replaced it with a fresh one.
+        IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=len(self.items))
+        owner = IMJobQueue(self.folder, lease=60, worker='owner')
+        self.assertEqual(owner.claim(), 0)
+        late = IMJobQueue(self.folder, lease=60, worker='late')
+        late._expired = lambda index: True
+        self.assertIsNone(late.claim())
+        self.assertTrue(owner.renew(0))
+        with open(owner._lease(0)) as f:
+            self.assertEqual(f.read(), 'owner')
+        self.assertEqual(os.listdir(os.path.join(self.folder, 'leases')), ['0'])
+
+    def test_done_while_taking(self):
+        # The owner writes the result and releases the lease between the check of the result and the take.
+        IMJobQueue.create(self.folder, 'IMContrast', self.items, chunk=len(self.items))
+        owner = IMJobQueue(self.folder, worker='owner')
+        late = IMJobQueue(self.folder, worker='late')
+        self.assertEqual(owner.claim(), 0)
+        take = late._take
+
+        def finished_first(index):
+            owner.complete(index, {'done': len(self.items), 'failed': []})
+            return take(index)
+
+        late._take = finished_first
+        self.assertIsNone(late.claim())
+        self.assertEqual(os.listdir(os.path.join(self.folder, 'leases')), [])
+
+    def images(self, count:int):
+        items = []
+        for index in range(count):
+            src = os.path.join(self.tmp.name, f'{index}.png')
+            Image.new('RGB', (16, 12), (index * 40, 90, 120)).save(src)
+            items.append((src, os.path.join(self.tmp.name, 'out', f'{index}.png')))
+        return items
+
+    def test_command_line_work(self):
+        IMJobQueue.create(self.folder, 'IMContrast', self.images(3), params={'adjust': 10}, chunk=2)
+        totals = IMJobQueue(self.folder, worker='w1').run(wait=False)
+        self.assertEqual((totals['done'], totals['failed']), (3, 0))
+        # The outputs only, with no temporary file left, nested or not.
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp.name, 'out'))), ['0.png', '1.png', '2.png'])
+
+    def test_command_line_work_taken_over(self):
+        items = self.images(1)
+        IMJobQueue.create(self.folder, 'IMContrast', items, chunk=1)
+        crashed = IMJobQueue(self.folder, lease=1, worker='crashed')
+        self.assertEqual(crashed.claim(), 0)
+        # Killed before the rename: the temporary file stays, under the name of the worker.
+        with mock.patch('os.replace', side_effect=OSError('killed')), mock.patch('os.unlink'):
+            with self.assertRaises(OSError):
+                crashed._item(functools.partial(_apply, tag=crashed.worker), *items[0])
+        self.assertEqual(os.listdir(os.path.dirname(items[0][1])), [os.path.basename(_part(items[0][1], 'crashed'))])
+
+        past = time.time() - 10
+        os.utime(crashed._lease(0), (past, past))
+        self.assertEqual(IMJobQueue(self.folder, lease=1, worker='other').claim(), 0)
+        self.assertEqual(os.listdir(os.path.dirname(items[0][1])), [])
+
+    def test_manifest(self):
+        IMJobQueue.create(self.folder, 'IMContrast', self.items, params={'adjust': 10}, chunk=5)
+        with open(os.path.join(self.folder, 'manifest.jsonl')) as f:
+            header = json.loads(f.readline())
+        self.assertEqual(header['params'], {'adjust': 10})
+        self.assertEqual(IMJobQueue(self.folder).chunks, 5)
+
+if __name__ == '__main__':
+    unittest.main()
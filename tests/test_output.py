@@ -0,0 +1,95 @@
+#
+# Filters writing into a caller-supplied buffer or over their source
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import inspect
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from imfilters import imfilters
+from imfilters.pipeline import IMPipeline
+
+def _result(filter):
+    return np.array(imfilters._pixels(imfilters._result_image(filter)))
+
+def _pixelated(pixels, scale):
+    # The squares drawn one by one over the whole image.
+    im = Image.fromarray(pixels).convert('RGBA')
+    overlay = Image.new('RGBA', im.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    width, height = im.size
+    for x in range(0, width, scale):
+        for y in range(height):
+            draw.rectangle(((x + 5, y + 5), (x + 10, y + 10)), fill=im.getpixel((x, y))[:3] + (255,))
+    return np.asarray(Image.alpha_composite(im, overlay).convert('RGB'))
+
+class TestOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (36, 44, 3), dtype=np.uint8)
+
+    def filters(self):
+        for name in imfilters.FILTERS:
+            if 'inplace' in inspect.signature(getattr(imfilters, name)).parameters:
+                yield name
+
+    def run_filter(self, name, image, **params):
+        random.seed(3)
+        np.random.seed(3)
+        return getattr(imfilters, name)(image, **params)
+
+    def test_out_and_inplace(self):
+        for name in self.filters():
+            if not imfilters.lookup(name).deterministic:
+                continue
+            with self.subTest(name=name):
+                expected = _result(self.run_filter(name, self.pixels.copy()))
+                out = np.zeros_like(self.pixels)
+                self.run_filter(name, self.pixels.copy(), out=out)
+                np.testing.assert_array_equal(out, expected)
+                pixels = self.pixels.copy()
+                self.run_filter(name, pixels, inplace=True)
+                np.testing.assert_array_equal(pixels, expected)
+
+    def test_inplace_needs_memory_image(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'a.png')
+            Image.fromarray(self.pixels).save(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for name in self.filters():
+                with self.subTest(name=name):
+                    for image in (path, data):
+                        with self.assertRaises(ValueError):
+                            getattr(imfilters, name)(image, inplace=True)
+
+    def test_threads_accepted(self):
+        for name in self.filters():
+            with self.subTest(name=name):
+                self.run_filter(name, self.pixels.copy(), threads=2)
+
+    def test_pixelated_scale(self):
+        for scale, step in ((1, 3), (3, 3), (5, 5), (8, 8), (10, 10), (20, 10)):
+            with self.subTest(scale=scale):
+                result = _result(imfilters.IMPixelated(self.pixels, scale=scale))
+                np.testing.assert_array_equal(result, _pixelated(self.pixels, step))
+
+    def test_pixelated_box(self):
+        # The boxes start off the grid of every scale.
+        for scale in (3, 4, 7):
+            with self.subTest(scale=scale):
+                steps = [('IMPixelated', {'scale': scale})]
+                whole = _result(imfilters.IMPixelated(self.pixels, scale=scale))
+                result = np.asarray(IMPipeline(steps, box=(13, 11, 40, 33)).apply(self.pixels))
+                np.testing.assert_array_equal(result, whole[11:33, 13:40])
+
+if __name__ == '__main__':
+    unittest.main()
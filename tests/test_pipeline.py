@@ -0,0 +1,77 @@
+#
+# IMPipeline gives the same result of running its stages one by one
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from imfilters import imfilters
+from imfilters.pipeline import IMPipeline
+from imfilters.registry import REGISTRY
+from imfilters.shared import IMShared
+
+# Parameters making every filter with an identity predicate an identity, or close to one.
+_IDENTITIES = {
+    'IMBrightness': {'adjust': 0}, 'IMContrast': {'adjust': 0}, 'IMSaturation': {'adjust': 0}, 'IMVibrance': {'adjust': 0},
+    'IMUnsharpMask': {'percent': 0}, 'IMSepia': {'adjust': 0}, 'IMNoise': {'adjust': 0}, 'IMGamma': {'adjust': 1},
+    'IMClip': {'adjust': 0}, 'IMHueRotate': {'degreeus': 0}, 'IMHueSaturation': {'adjust': 1}, 'IMOverlay': {'scale': 0},
+    'IMAditiveColors': {'red': 0, 'green': 0, 'blue': 0}, 'IMRgbScale': {'red': 1, 'green': 1, 'blue': 1},
+}
+
+def _sequential(image, steps):
+    pixels = image
+    for name, params in steps:
+        if name in imfilters.PRESETS:
+            pixels = imfilters._pixels(imfilters._chain(getattr(imfilters, name).steps, pixels.copy()))
+        else:
+            pixels = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(pixels.copy(), **params)))
+    return pixels
+
+def _apply(steps, image):
+    return np.asarray(IMPipeline(steps).apply(image))
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.image = np.random.default_rng(0).integers(0, 256, (48, 40, 3), dtype=np.uint8)
+
+    def assertSame(self, steps):
+        result = np.asarray(IMPipeline(steps).apply(self.image))
+        np.testing.assert_array_equal(result, _sequential(self.image, steps), err_msg=str(steps))
+
+    def test_dropped_stages_are_identities(self):
+        for name, params in _IDENTITIES.items():
+            with self.subTest(name=name):
+                self.assertSame([(name, params)])
+                dropped = any(stage[0] == 'drop' for stage in IMPipeline([(name, params)]).plan())
+                if dropped:
+                    np.testing.assert_array_equal(_sequential(self.image, [(name, params)]), self.image)
+
+    def test_fused_stages(self):
+        for name, info in REGISTRY.items():
+            if info.pointwise and info.deterministic:
+                with self.subTest(name=name):
+                    self.assertSame([('IMContrast', {'adjust': 0}), (name, {}), ('IMBrightness', {'adjust': 10})])
+
+    def test_spatial_and_presets(self):
+        self.assertSame([('IMBrightness', {'adjust': 0}), ('IMGaussBlur', {'radius': 2}), ('IMSaturation', {'adjust': 20})])
+        self.assertSame([('IMContrast', {'adjust': 10}), ('Clarendon', {}), ('IMSharpen', {})])
+
+    def test_box(self):
+        steps = [('IMContrast', {'adjust': 10}), ('IMGaussBlur', {'radius': 2})]
+        result = np.asarray(IMPipeline(steps, box=(8, 6, 30, 40)).apply(self.image))
+        np.testing.assert_array_equal(result, _sequential(self.image, steps)[6:40, 8:30])
+
+    def test_shared_image_in_process(self):
+        steps = [('IMContrast', {'adjust': 10}), ('IMSepia', {})]
+        with IMShared.from_array(self.image) as shared, ProcessPoolExecutor(1) as executor:
+            result = executor.submit(_apply, steps, shared).result()
+        np.testing.assert_array_equal(result, _sequential(self.image, steps))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#
+# Lookup tables and fixed-point matrices give the float formulas of the filters, in small temporaries
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import math
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from imfilters import imfilters
+from imfilters.io import _CHUNK
+from imfilters.point import _fixed, _lut, _point
+
+def _truncated(values):
+    # int() of every value clamped to 0..255, as putpixel did.
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+class TestPoint(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (120, 90, 3), dtype=np.uint8)
+        self.levels = self.pixels.astype(np.float64)
+
+    def test_lookup_tables(self):
+        contrast = pow((10 + 100) / 100, 2)
+        cases = [
+            ('IMBrightness', {'adjust': 10}, self.levels + math.floor(255 * 0.1)),
+            ('IMContrast', {'adjust': 10}, ((self.levels / 255 - 0.5) * contrast + 0.5) * 255),
+            ('IMGamma', {'adjust': 2}, np.power(self.levels / 255, 2) * 255),
+            ('IMInvert', {}, 255 - self.levels),
+            ('IMSolarize', {'limit': 128}, np.where(self.levels > 128, 255 - self.levels, self.levels)),
+            ('IMAditiveColors', {'red': 50, 'green': -20, 'blue': 0}, self.levels + [50, -20, 0]),
+            ('IMRgbScale', {'red': 1.5, 'green': 1, 'blue': 0.5}, self.levels * [1.5, 1, 0.5]),
+        ]
+        for name, params, expected in cases:
+            with self.subTest(name=name):
+                result = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(self.pixels, **params)))
+                np.testing.assert_array_equal(result, _truncated(expected))
+
+    def test_lut_threads_and_out(self):
+        out = np.empty_like(self.pixels)
+        _lut(self.pixels, lambda px: px * 0.5 + 3, threads=4, out=out)
+        np.testing.assert_array_equal(out, _truncated(self.levels * 0.5 + 3))
+
+    def test_fixed_point_matrices(self):
+        for name, params in (('IMSepia', {}), ('IMSepia', {'adjust': 40}), ('IMHueRotate', {'degreeus': 50}),
+                             ('IMHueRotate', {'degreeus': 200})):
+            with self.subTest(name=name, params=params):
+                filter = getattr(imfilters, name)(self.pixels, **params)
+                result = imfilters._pixels(imfilters._result_image(filter)).astype(np.int16)
+                expected = _truncated(self.levels @ np.asarray(filter.matrix).T).astype(np.int16)
+                # The shift floors where the float result sits just below an integer, one level at most.
+                self.assertLessEqual(np.abs(result - expected).max(), 1)
+                self.assertLess((result != expected).mean(), 0.01)
+
+    def test_fixed_point_identity_and_float32(self):
+        identity = _fixed(np.eye(3))
+        np.testing.assert_array_equal(identity(self.pixels), self.pixels)
+        matrix = np.array([[0.5, 0.2, 0.1], [0.0, 1.0, 0.0], [0.3, 0.3, 0.3]])
+        floats = self.pixels.astype(np.float32)
+        np.testing.assert_allclose(_fixed(matrix)(floats), floats @ matrix.T.astype(np.float32), rtol=1e-6)
+
+    def test_blocks(self):
+        sizes = []
+
+        def kernel(px):
+            sizes.append(px.shape[0] * px.shape[1])
+            return px
+
+        pixels = np.zeros((2000, 700, 3), np.uint8)
+        _point(pixels, kernel, threads=1, out=np.empty_like(pixels))
+        self.assertEqual(sum(sizes), 2000 * 700)
+        self.assertLessEqual(max(sizes), _CHUNK)
+
+    def peak(self, name, params, size):
+        pixels = np.random.default_rng(1).integers(0, 256, (size, size, 3), dtype=np.uint8)
+        out = np.empty_like(pixels)
+        getattr(imfilters, name)(pixels[:8, :8], threads=1, **params)
+        tracemalloc.start()
+        try:
+            getattr(imfilters, name)(pixels, out=out, threads=1, **params)
+            return tracemalloc.get_traced_memory()[1], pixels.nbytes
+        finally:
+            tracemalloc.stop()
+
+    def test_temporaries(self):
+        for name, params in (('IMContrast', {'adjust': 10}), ('IMSepia', {}), ('IMHueRotate', {}), ('IMSaturation', {'adjust': 20})):
+            with self.subTest(name=name):
+                small, _ = self.peak(name, params, 1000)
+                large, nbytes = self.peak(name, params, 2000)
+                self.assertLess(large, 2 * nbytes)
+                if name != 'IMSaturation':
+                    # The blocks only, whatever the size of the image. IMSaturation also keeps a plane of the maximum.
+                    self.assertLess(large, small * 1.2)
+
+if __name__ == '__main__':
+    unittest.main()
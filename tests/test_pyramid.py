@@ -0,0 +1,83 @@
+#
+# IMPyramid filters once and gives every width close to resizing the whole filtered image
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.pyramid import IMPyramid
+
+class TestPyramid(unittest.TestCase):
+
+    def setUp(self):
+        # Smooth content, as a photo, so the resizes can be compared.
+        y, x = np.mgrid[0:301, 0:403]
+        self.pixels = np.stack([x * 255 // 402, y * 255 // 300, (x + y) * 255 // 703], axis=2).astype(np.uint8)
+        self.pixels[100:200, 150:250] = (200, 40, 90)
+
+    def test_widths(self):
+        for name, params in (('IMContrast', {'adjust': 20}), ('Clarendon', {}), ('IMGaussBlur', {'radius': 2})):
+            with self.subTest(name=name):
+                pyramid = IMPyramid(name, self.pixels, [50, 403, 200, 120, 50, 33], **params)
+                self.assertEqual(pyramid.widths, [403, 200, 120, 50, 33])
+                cls = getattr(imfilters, name)
+                if name in imfilters.PRESETS:
+                    filtered = Image.fromarray(np.asarray(imfilters._chain(cls.steps, self.pixels.copy())))
+                else:
+                    filtered = imfilters._result_image(cls(self.pixels.copy(), **params))
+                np.testing.assert_array_equal(np.asarray(pyramid.levels[0]), np.asarray(filtered))
+                np.testing.assert_array_equal(np.asarray(pyramid.image(403)), np.asarray(filtered))
+                for width in pyramid.widths[1:]:
+                    image = pyramid.image(width)
+                    height = round(301 * width / 403)
+                    self.assertEqual(image.size, (width, height))
+                    direct = np.asarray(filtered.resize((width, height), Image.LANCZOS)).astype(np.int16)
+                    self.assertLess(np.abs(np.asarray(image) - direct).mean(), 1.2)
+
+    def test_levels(self):
+        pyramid = IMPyramid('IMInvert', self.pixels, [400, 100, 60])
+        self.assertEqual([level.width for level in pyramid.levels], [403, 202, 101])
+        # Every width is resized from the smallest level still as wide as it.
+        self.assertEqual(pyramid.image(100).size, (100, 75))
+        self.assertLessEqual(sum(level.width * level.height for level in pyramid.levels[1:]), 403 * 301 // 3 + 403)
+        self.assertEqual(len(IMPyramid('IMInvert', self.pixels, [403]).levels), 1)
+        # Wider than the image, resized up from it.
+        self.assertEqual(IMPyramid('IMInvert', self.pixels, [806]).image(806).size, (806, 602))
+
+    def test_save(self):
+        pyramid = IMPyramid('IMSepia', self.pixels, [300, 100], threads=2)
+        with tempfile.TemporaryDirectory() as folder:
+            paths = pyramid.save(os.path.join(folder, '{width}', 'photo.png'))
+            self.assertEqual(paths, [os.path.join(folder, '300', 'photo.png'), os.path.join(folder, '100', 'photo.png')])
+            for path, width in zip(paths, pyramid.widths):
+                np.testing.assert_array_equal(np.asarray(Image.open(path)), np.asarray(pyramid.image(width)))
+            with self.assertRaises(ValueError):
+                pyramid.save(os.path.join(folder, 'photo.png'))
+
+    def test_to_bytes(self):
+        encoded = IMPyramid('IMSepia', self.pixels, [300, 100, 40]).to_bytes('PNG')
+        self.assertEqual(list(encoded), [300, 100, 40])
+        for width, data in encoded.items():
+            self.assertEqual(Image.open(io.BytesIO(data)).width, width)
+        for threads in (1, 3):
+            single = IMPyramid('IMSepia', self.pixels, [300, 100, 40], threads=threads).to_bytes('PNG')
+            self.assertEqual(single, encoded)
+
+    def test_errors(self):
+        for widths in ([], [100, 0]):
+            with self.assertRaises(ValueError):
+                IMPyramid('IMSepia', self.pixels, widths)
+        with self.assertRaises(ValueError):
+            IMPyramid('IMNothing', self.pixels, [100])
+
+if __name__ == '__main__':
+    unittest.main()
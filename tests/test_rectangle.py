@@ -0,0 +1,66 @@
+#
+# IMRectangle composited band by band gives the pixels of one composite of the whole frame
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import random
+import unittest
+from random import randint
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from imfilters import imfilters
+
+def _baseline(image, color=(0,0,0,1), scale=3, rand=False, dist=20):
+    # The rectangles drawn over one overlay of the whole frame, composited at once.
+    im = image.convert('RGBA')
+    overlay = Image.new('RGBA', im.size, (0,0,0,0))
+    draw = ImageDraw.Draw(overlay)
+    width, height = im.size
+    a = color[3]
+    a = 1 if a > 1 else 0 if a < 0 else int(a * 1000)
+    rgba = (color[0], color[1], color[2], a)
+    for x in range(0, width, randint(2, dist // 2)):
+        for y in range(0, height, randint(dist // 2, dist * 2)):
+            r = randint(1, 3)
+            if rand:
+                draw.rectangle(((x, y), (x + scale * r, y + scale)), (randint(0,255), randint(0,255), randint(0,255), randint(100,1000)))
+            else:
+                draw.rectangle(((x, y), (x + scale * r, y + scale)), rgba)
+    return Image.alpha_composite(im, overlay)
+
+class TestRectangle(unittest.TestCase):
+
+    def setUp(self):
+        pixels = np.random.default_rng(0).integers(0, 256, (300, 220, 4), dtype=np.uint8)
+        self.image = Image.fromarray(pixels, 'RGBA')
+
+    def compare(self, image, alpha=False, **params):
+        random.seed(7)
+        result = imfilters.IMRectangle(image, alpha=alpha, **params).new_img
+        random.seed(7)
+        expected = _baseline(image, **params)
+        return result, expected
+
+    def test_same_as_baseline(self):
+        cases = [{}, {'rand': True}, {'scale': 70, 'color': (200, 10, 10, 0.5)}, {'dist': 400, 'scale': 9}]
+        for mode in ('RGB', 'RGBA', 'L', 'P'):
+            for params in cases:
+                with self.subTest(mode=mode, params=params):
+                    result, expected = self.compare(self.image.convert(mode), **params)
+                    self.assertEqual(result.mode, 'RGB')
+                    np.testing.assert_array_equal(np.asarray(result), np.asarray(expected.convert('RGB')))
+
+    def test_alpha(self):
+        for params in ({}, {'rand': True}):
+            with self.subTest(params=params):
+                result, expected = self.compare(self.image, alpha=True, **params)
+                expected.putalpha(self.image.getchannel('A'))
+                self.assertEqual(result.mode, 'RGBA')
+                np.testing.assert_array_equal(np.asarray(result), np.asarray(expected))
+
+if __name__ == '__main__':
+    unittest.main()
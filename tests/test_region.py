@@ -0,0 +1,89 @@
+#
+# IMRegion filters only a box or a mask, with the pixels of the filter applied to the whole image
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+
+def _whole(name, pixels, **params):
+    cls = getattr(imfilters, name)
+    if name in imfilters.PRESETS:
+        return np.asarray(imfilters._chain(cls.steps, pixels.copy()))
+    return imfilters._pixels(imfilters._result_image(cls(pixels.copy(), **params)))
+
+def _region(name, pixels, **params):
+    return imfilters._pixels(imfilters._result_image(imfilters.IMRegion(name, pixels, **params)))
+
+class TestRegion(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+        self.box = (13, 9, 51, 47)
+
+    def assertRegion(self, result, expected, box):
+        left, top, right, bottom = box
+        np.testing.assert_array_equal(result[top:bottom, left:right], expected[top:bottom, left:right])
+        outside = np.ones(self.pixels.shape[:2], bool)
+        outside[top:bottom, left:right] = False
+        np.testing.assert_array_equal(result[outside], self.pixels[outside])
+
+    def test_box(self):
+        cases = [('IMContrast', {'adjust': 20}), ('IMGaussBlur', {'radius': 3}), ('IMBoxBlur', {'bl': 2}), ('IMSharpen', {}),
+                 ('IMUnsharpMask', {}), ('IMPixelated', {'scale': 4}), ('Clarendon', {}), ('Lofi', {})]
+        for name, params in cases:
+            for box in (self.box, (0, 0, 30, 25), (50, 35, 80, 60)):
+                with self.subTest(name=name, box=box):
+                    result = _region(name, self.pixels, box=box, **params)
+                    self.assertRegion(result, _whole(name, self.pixels, **params), box)
+
+    def test_box_clipped(self):
+        result = _region('IMInvert', self.pixels, box=(-10, 40, 30, 200))
+        self.assertRegion(result, 255 - self.pixels, (0, 40, 30, 60))
+
+    def test_mask(self):
+        mask = np.zeros(self.pixels.shape[:2], np.uint8)
+        mask[20:40, 10:30] = 255
+        mask[45:50, 60:70] = 128
+        result = _region('IMInvert', self.pixels, mask=Image.fromarray(mask)).astype(np.int16)
+        inverted = 255 - self.pixels.astype(np.int16)
+        np.testing.assert_array_equal(result[mask == 255], inverted[mask == 255])
+        np.testing.assert_array_equal(result[mask == 0], self.pixels[mask == 0])
+        half = (self.pixels[mask == 128].astype(np.int16) + inverted[mask == 128]) / 2
+        self.assertLessEqual(np.abs(result[mask == 128] - half).max(), 1)
+
+        # A mask with a box keeps only what both cover.
+        result = _region('IMInvert', self.pixels, box=(0, 0, 20, 60), mask=Image.fromarray(mask))
+        self.assertRegion(result, 255 - self.pixels, (10, 20, 20, 40))
+
+    def test_empty_mask(self):
+        result = _region('IMInvert', self.pixels, mask=Image.new('L', (80, 60)))
+        np.testing.assert_array_equal(result, self.pixels)
+
+    def test_inplace_and_out(self):
+        pixels = self.pixels.copy()
+        imfilters.IMRegion('IMInvert', pixels, box=self.box, inplace=True)
+        self.assertRegion(pixels, 255 - self.pixels, self.box)
+        out = np.zeros_like(self.pixels)
+        imfilters.IMRegion('IMInvert', self.pixels, box=self.box, out=out)
+        self.assertRegion(out, 255 - self.pixels, self.box)
+        encoded = io.BytesIO()
+        Image.fromarray(self.pixels).save(encoded, 'PNG')
+        with self.assertRaises(ValueError):
+            imfilters.IMRegion('IMInvert', encoded.getvalue(), box=self.box, inplace=True)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            imfilters.IMRegion('IMInvert', self.pixels, mask=Image.new('L', (10, 10)))
+        with self.assertRaises(TypeError):
+            imfilters.IMRegion('Clarendon', self.pixels, box=self.box, adjust=10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#
+# The registry describes what every filter does: kind, parameters, halo, grid and identities
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import inspect
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from imfilters import imfilters
+from imfilters.registry import REGISTRY, lookup
+
+_IDENTITIES = {
+    'IMBrightness': {'adjust': 0}, 'IMSaturation': {'adjust': 0}, 'IMVibrance': {'adjust': 0}, 'IMUnsharpMask': {'percent': 0},
+    'IMSepia': {'adjust': 0}, 'IMNoise': {'adjust': 0}, 'IMGamma': {'adjust': 1}, 'IMClip': {'adjust': 0}, 'IMOverlay': {'scale': 0},
+    'IMAditiveColors': {'red': 0, 'green': 0, 'blue': 0}, 'IMRgbScale': {'red': 1, 'green': 1, 'blue': 1},
+}
+_SPATIAL = [('IMBoxBlur', {}), ('IMBoxBlur', {'bl': 3}), ('IMGaussBlur', {'radius': 1}), ('IMGaussBlur', {'radius': 4}),
+            ('IMUnsharpMask', {}), ('IMUnsharpMask', {'radius': 2.5, 'percent': 150}), ('IMSharpen', {}),
+            ('IMPixelated', {'scale': 3}), ('IMPixelated', {'scale': 7})]
+
+def _result(name, pixels, **params):
+    return np.array(imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(pixels.copy(), **params))))
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (64, 72, 3), dtype=np.uint8)
+
+    def filters(self, *kinds):
+        return [name for name in imfilters.FILTERS if REGISTRY[name].kind in kinds]
+
+    def test_every_filter(self):
+        self.assertEqual(set(REGISTRY), set(imfilters.FILTERS) | set(imfilters.PRESETS))
+        for name, info in REGISTRY.items():
+            with self.subTest(name=name):
+                self.assertIs(info.cls, getattr(imfilters, name))
+                self.assertIs(lookup(name), info)
+                self.assertEqual(info.kind == 'chain', hasattr(info.cls, 'steps') or name == 'IMSoftSat')
+        with self.assertRaises(ValueError):
+            lookup('IMNothing')
+
+    def test_params_match_signatures(self):
+        for name in imfilters.FILTERS:
+            with self.subTest(name=name):
+                info = REGISTRY[name]
+                signature = inspect.signature(info.cls).parameters
+                accepted = {key: p.default for key, p in signature.items() if key not in ('image', 'threads', 'out', 'inplace')}
+                self.assertEqual(accepted, info.defaults())
+                info.validate(info.defaults())
+
+    def test_pointwise(self):
+        # Moving the pixels around moves the result the same way.
+        order = np.random.default_rng(1).permutation(self.pixels.shape[0] * self.pixels.shape[1])
+        shuffled = self.pixels.reshape(-1, 3)[order].reshape(self.pixels.shape)
+        for name in self.filters('channel', 'matrix', 'pixel'):
+            if REGISTRY[name].deterministic:
+                with self.subTest(name=name):
+                    expected = _result(name, self.pixels).reshape(-1, 3)[order].reshape(self.pixels.shape)
+                    np.testing.assert_array_equal(_result(name, shuffled), expected)
+
+    def test_channel(self):
+        # Every channel of the result is a lookup table of the same channel of the source.
+        levels = np.repeat(np.arange(256, dtype=np.uint8)[None, :, None], 3, axis=2)
+        for name in self.filters('channel'):
+            with self.subTest(name=name):
+                table = _result(name, levels)[0]
+                expected = np.stack([table[self.pixels[..., c], c] for c in range(3)], axis=2)
+                np.testing.assert_array_equal(_result(name, self.pixels), expected)
+
+    def test_matrix(self):
+        for name in self.filters('matrix'):
+            with self.subTest(name=name):
+                matrix = np.asarray(getattr(imfilters, name)(self.pixels.copy()).matrix, np.float64)
+                expected = np.floor(np.clip(self.pixels.astype(np.float64) @ matrix.T, 0, 255))
+                self.assertLessEqual(np.abs(_result(name, self.pixels) - expected).max(), 1)
+
+    def test_halo_and_grid(self):
+        # A tile with the halo around it, starting on the grid, gives the same pixels inside.
+        for name, params in _SPATIAL:
+            with self.subTest(name=name, params=params):
+                info = lookup(name)
+                halo, grid = info.halo(**params), info.grid(**params)
+                whole = _result(name, self.pixels, **params)
+                box = (2 * grid + halo, 2 * grid + halo, 2 * grid + halo + 20, 2 * grid + halo + 17)
+                top, left = (box[1] - halo) // grid * grid, (box[0] - halo) // grid * grid
+                tile = _result(name, np.ascontiguousarray(self.pixels[top:box[3] + halo, left:box[2] + halo]), **params)
+                np.testing.assert_array_equal(tile[box[1] - top:box[3] - top, box[0] - left:box[2] - left],
+                                              whole[box[1]:box[3], box[0]:box[2]])
+        self.assertIsNone(lookup('IMNormalize').halo())
+        self.assertEqual(lookup('IMGaussBlur').halo(radius=4), 14)
+        self.assertEqual(lookup('IMContrast').halo(adjust=10), 0)
+
+    def test_identities(self):
+        for name, params in _IDENTITIES.items():
+            with self.subTest(name=name):
+                info = lookup(name)
+                self.assertTrue(info.is_identity(**params))
+                self.assertFalse(info.is_identity())
+                np.testing.assert_array_equal(_result(name, self.pixels, **params), self.pixels)
+        for name in set(imfilters.FILTERS) - set(_IDENTITIES):
+            with self.subTest(name=name):
+                self.assertFalse(lookup(name).is_identity())
+
+    def test_deterministic(self):
+        for name in imfilters.FILTERS:
+            if lookup(name).kind == 'chain':
+                continue
+            with self.subTest(name=name):
+                same = np.array_equal(_result(name, self.pixels), _result(name, self.pixels))
+                if lookup(name).deterministic:
+                    self.assertTrue(same)
+        self.assertFalse(np.array_equal(_result('IMNoise', self.pixels), _result('IMNoise', self.pixels)))
+
+    def test_float32(self):
+        # The float32 filters run over the intermediates of the presets, as the 8-bit filter up to the truncation.
+        source = self.pixels.astype(np.float32)
+        for name in imfilters.FILTERS:
+            if lookup(name).float32:
+                with self.subTest(name=name):
+                    levels = source.copy()
+                    getattr(imfilters, name)(levels, inplace=True)
+                    self.assertEqual(levels.dtype, np.float32)
+                    expected = _result(name, self.pixels)
+                    if name == 'IMThreshold':
+                        # The gray levels are not truncated before the threshold.
+                        gray = source.copy()
+                        imfilters.IMGray(gray, inplace=True)
+                        expected = np.where(gray > 127, 255, 0)
+                    difference = np.abs(imfilters._quantize(levels).astype(np.int16) - expected)
+                    self.assertLessEqual(difference.max(), 1)
+
+    def test_validate(self):
+        info = lookup('IMUnsharpMask')
+        info.validate({'radius': 3, 'percent': 100})
+        info.validate({'radius': 2.5})
+        with self.assertRaises(TypeError):
+            info.validate({'radius': '3'})
+        with self.assertRaises(TypeError):
+            info.validate({'percent': 1.5})
+        with self.assertRaises(TypeError):
+            info.validate({'percent': True})
+        with self.assertRaises(TypeError):
+            info.validate({'radiu': 3})
+        lookup('IMBoxBlur').validate({'bl': None})
+        with self.assertRaises(TypeError):
+            lookup('Clarendon').validate({'adjust': 10})
+
+    def test_lookup_does_not_import(self):
+        code = ("import sys; from imfilters.registry import lookup; info = lookup('IMGaussBlur'); "
+                "info.halo(radius=3); info.pointwise; info.validate({'radius': 3}); lookup('Clarendon').kind; "
+                "print(' '.join(name for name in sys.modules if name.startswith('imfilters')))")
+        modules = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+        self.assertIn('imfilters.registry', modules)
+        for module in ('imfilters.color', 'imfilters.spatial', 'imfilters.presets'):
+            self.assertNotIn(module, modules)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#
+# IMServer answers on localhost and keeps its accounting of jobs
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import http.client
+import io
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters.server import IMServer, _warm
+
+def _jpeg(size:tuple):
+    buffer = io.BytesIO()
+    pixels = np.random.default_rng(0).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+def _loaded():
+    return sorted(name for name in sys.modules if name.startswith('imfilters.'))
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = IMServer(port=0, workers=1, queue=1, max_size=1 << 20, timeout=10)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.image = _jpeg((64, 48))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.thread.join()
+
+    def request(self, method:str, path:str, body:bytes=None, headers:dict=None):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=30)
+        try:
+            connection.putrequest(method, path)
+            for key, value in (headers or {}).items():
+                connection.putheader(key, value)
+            connection.endheaders()
+            if body:
+                connection.send(body)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def health(self):
+        return json.loads(self.request('GET', '/health')[1])
+
+    def test_filter(self):
+        status, data = self.request('POST', '/filter/IMContrast?adjust=10&format=png', self.image, {'Content-Length': str(len(self.image))})
+        self.assertEqual(status, 200)
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (64, 48))
+
+    def test_unknown_filter(self):
+        self.assertEqual(self.request('POST', '/filter/IMNothing', b'', {'Content-Length': '0'})[0], 404)
+
+    def test_length_required(self):
+        self.assertEqual(self.request('POST', '/filter/IMContrast')[0], 411)
+
+    def test_too_large(self):
+        self.assertEqual(self.request('POST', '/filter/IMContrast', b'', {'Content-Length': str(2 << 20)})[0], 413)
+
+    def test_bad_length(self):
+        self.assertEqual(self.request('POST', '/filter/IMContrast', b'', {'Content-Length': 'abc'})[0], 400)
+        self.assertEqual(self.request('POST', '/filter/IMContrast', b'x' * 5000, {'Content-Length': '-1'})[0], 400)
+
+    def test_bad_image(self):
+        self.assertEqual(self.request('POST', '/filter/IMContrast', b'not an image', {'Content-Length': '12'})[0], 400)
+
+    def test_decompression_bomb(self):
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = 64 * 48 // 4
+        try:
+            status, _ = self.request('POST', '/filter/IMContrast', self.image, {'Content-Length': str(len(self.image))})
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+        self.assertEqual(status, 413)
+
+    def test_queue_full(self):
+        owner = self.server
+        with owner._lock:
+            owner._in_flight += owner.workers + owner.queue
+        try:
+            status, _ = self.request('POST', '/filter/IMContrast', self.image, {'Content-Length': str(len(self.image))})
+        finally:
+            with owner._lock:
+                owner._in_flight -= owner.workers + owner.queue
+        self.assertEqual(status, 503)
+
+    def test_timeout_holds_the_slot(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (3000, 3000), (90, 120, 200)).save(buffer, 'JPEG')
+        image = buffer.getvalue()
+        timeout = self.server.timeout
+        self.server.timeout = 0.01
+        try:
+            status, _ = self.request('POST', '/filter/IMGaussBlur?radius=20', image, {'Content-Length': str(len(image))})
+        finally:
+            self.server.timeout = timeout
+        self.assertEqual(status, 504)
+        self.assertEqual(self.health()['busy'], 1)
+        self.assertGreater(self.health()['memory'], 0)
+        deadline = time.time() + 60
+        while self.health()['busy'] and time.time() < deadline:
+            time.sleep(0.05)
+        health = self.health()
+        self.assertEqual((health['busy'], health['queued'], health['memory']), (0, 0, 0))
+
+class TestWarm(unittest.TestCase):
+
+    def test_filter_modules_are_imported(self):
+        # A spawned worker starts with nothing imported, what it holds after the initializer is what _warm loaded.
+        with multiprocessing.get_context('spawn').Pool(1, initializer=_warm) as pool:
+            loaded = pool.apply(_loaded)
+        for module in ('imfilters.point', 'imfilters.color', 'imfilters.spatial', 'imfilters.presets'):
+            self.assertIn(module, loaded)
+
+if __name__ == '__main__':
+    unittest.main()
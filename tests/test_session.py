@@ -0,0 +1,147 @@
+#
+# IMSession re-renders only the stages after a change, with the result of running the chain again
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import io
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.session import IMSession
+
+def _sequential(pixels, steps):
+    for name, params in steps:
+        cls = getattr(imfilters, name)
+        if name in imfilters.PRESETS:
+            pixels = imfilters._pixels(imfilters._chain(cls.steps, pixels.copy()))
+        else:
+            pixels = imfilters._pixels(imfilters._result_image(cls(pixels.copy(), **params)))
+    return np.asarray(pixels)
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (60, 90, 3), dtype=np.uint8)
+        self.steps = [('IMContrast', {'adjust': 10}), ('IMGaussBlur', {'radius': 2}), ('Clarendon', {}), ('IMSaturation', {'adjust': 20})]
+
+    def session(self, **params):
+        session = IMSession(self.pixels, self.steps, **params)
+        self.stages = []
+        stage = session._stage
+
+        def counted(name, params, pixels, out):
+            self.stages.append(name)
+            return stage(name, params, pixels, out)
+
+        session._stage = counted
+        return session
+
+    def assertRender(self, session):
+        np.testing.assert_array_equal(np.asarray(session.render()), _sequential(self.pixels, session.steps))
+
+    def test_render(self):
+        session = self.session()
+        self.assertRender(session)
+        self.assertEqual(self.stages, [name for name, _ in self.steps])
+        self.stages.clear()
+        self.assertRender(session)
+        self.assertEqual(self.stages, [])
+
+    def test_only_later_stages(self):
+        session = self.session()
+        session.render()
+        self.stages.clear()
+        session.set(2)
+        session.set(-1, adjust=20)
+        self.assertRender(session)
+        self.assertEqual(self.stages, [])
+
+        session.set(-1, adjust=35)
+        self.assertRender(session)
+        self.assertEqual(self.stages, ['IMSaturation'])
+
+        self.stages.clear()
+        session.set(1, radius=3)
+        self.assertRender(session)
+        self.assertEqual(self.stages, ['IMGaussBlur', 'Clarendon', 'IMSaturation'])
+
+    def test_insert_and_remove(self):
+        session = self.session()
+        session.render()
+        self.stages.clear()
+        session.insert(2, 'IMHueRotate', degreeus=90)
+        self.assertRender(session)
+        self.assertEqual(self.stages, ['IMHueRotate', 'Clarendon', 'IMSaturation'])
+
+        self.stages.clear()
+        session.remove(0)
+        self.assertRender(session)
+        self.assertEqual(len(self.stages), len(session.steps))
+
+        self.stages.clear()
+        session.add('IMSepia')
+        self.assertRender(session)
+        self.assertEqual(self.stages, ['IMSepia'])
+
+        for _ in range(len(session.steps)):
+            session.remove(-1)
+        np.testing.assert_array_equal(np.asarray(session.render()), self.pixels)
+
+    def test_renders_are_kept(self):
+        # The arrays of the stages are written over, the images returned before are not.
+        session = self.session()
+        first = np.asarray(session.render())
+        expected = first.copy()
+        session.set(0, adjust=-30)
+        session.render()
+        np.testing.assert_array_equal(first, expected)
+        np.testing.assert_array_equal(session.source, self.pixels)
+
+    def test_preview(self):
+        session = self.session(proxy=45)
+        preview = session.preview()
+        self.assertEqual(preview.size, (45, 30))
+        np.testing.assert_array_equal(np.asarray(preview), _sequential(session._source('proxy'), self.steps))
+        self.stages.clear()
+        session.set(-1, adjust=50)
+        session.preview()
+        self.assertEqual(self.stages, ['IMSaturation'])
+        # The full resolution has its own stages.
+        self.stages.clear()
+        self.assertRender(session)
+        self.assertEqual(len(self.stages), len(self.steps))
+        self.assertEqual(IMSession(self.pixels, proxy=200).preview().size, (90, 60))
+
+    def test_threads(self):
+        session = IMSession(self.pixels, self.steps, threads=3)
+        self.assertRender(session)
+
+    def test_save(self):
+        session = IMSession(self.pixels, self.steps)
+        stream = io.BytesIO()
+        session.save(stream, 'PNG')
+        np.testing.assert_array_equal(np.asarray(Image.open(stream)), np.asarray(session.render()))
+        self.assertEqual(stream.getvalue(), session.to_bytes('PNG'))
+
+    def test_errors(self):
+        session = IMSession(self.pixels)
+        with self.assertRaises(ValueError):
+            session.add('IMNothing')
+        with self.assertRaises(TypeError):
+            session.add('Clarendon', adjust=10)
+        session.add('Clarendon')
+        with self.assertRaises(TypeError):
+            session.set(0, adjust=10)
+        session.remove(0)
+        with self.assertRaises(IndexError):
+            session.remove(0)
+        with self.assertRaises(IndexError):
+            session.set(0, adjust=10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#
+# IMShared segments handed between processes and removed with the last reference
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from imfilters.shared import IMShared
+
+def _invert(shared):
+    shared.array[...] = 255 - shared.array
+    shared.release()
+
+def _segment(name:str):
+    return os.path.exists(os.path.join('/dev/shm', name.lstrip('/')))
+
+class TestShared(unittest.TestCase):
+
+    def test_written_by_another_process(self):
+        image = np.random.default_rng(0).integers(0, 256, (16, 24, 3), dtype=np.uint8)
+        shared = IMShared.from_array(image)
+        with ProcessPoolExecutor(1) as executor:
+            executor.submit(_invert, shared.retain()).result()
+        shared.release()
+        np.testing.assert_array_equal(shared.array, 255 - image)
+        shared.release()
+
+    def test_pickle_sends_only_the_handle(self):
+        shared = IMShared.new((1000, 1000))
+        self.assertLess(len(pickle.dumps(shared)), 200)
+        shared.release()
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'Segments are not files here.')
+    def test_last_release_removes_the_segment(self):
+        shared = IMShared.new((8, 8)).retain()
+        shared.release()
+        self.assertTrue(_segment(shared.name))
+        shared.release()
+        self.assertFalse(_segment(shared.name))
+        with self.assertRaises(ValueError):
+            shared.retain()
+
+    def test_buffer_shares_the_segment(self):
+        shared = IMShared.new((8, 4))
+        shared.buffer.rgb[...] = 7
+        self.assertEqual(int(shared.array[..., :3].max()), 7)
+        shared.release()
+
+    def test_import_needs_no_shared_memory(self):
+        # Python 3.7 has no multiprocessing.shared_memory, the modules importing IMShared must still import.
+        code = 'import sys; import imfilters.aio, imfilters.pipeline, imfilters.shared; print("multiprocessing.shared_memory" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        self.assertEqual(output.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
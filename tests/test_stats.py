@@ -0,0 +1,95 @@
+#
+# IMStats computes every plane once, and the filters reading them give the result of the pixels
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from imfilters import imfilters
+
+_FILTERS = [('IMGray', {}), ('IMThreshold', {'limiar': 100}), ('IMSaturation', {'adjust': 30}), ('IMVibrance', {'adjust': 60}),
+            ('IMLumios', {'color': 'green', 'percent': 0.3}), ('IMPredominance', {'color': 'blue'}),
+            ('IMHueSaturation', {'adjust': 2}), ('IMNormalize', {})]
+
+def _result(filter):
+    return np.array(imfilters._pixels(imfilters._result_image(filter)))
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (90, 70, 3), dtype=np.uint8)
+        self.stats = imfilters.IMStats(self.pixels)
+
+    def test_planes(self):
+        px = self.pixels.astype(np.int64)
+        stats = self.stats
+        luma = [imfilters.IMLuminance(tuple(int(v) for v in pixel)).lumin for pixel in self.pixels.reshape(-1, 3)[:500]]
+        np.testing.assert_array_equal(stats.luma.reshape(-1)[:500], np.array(luma, np.uint8))
+        np.testing.assert_array_equal(stats.sum, px.sum(axis=2))
+        np.testing.assert_array_equal(stats.mean, px.sum(axis=2) // 3)
+        np.testing.assert_array_equal(stats.maximum, px.max(axis=2))
+        np.testing.assert_array_equal(stats.minimum, px.min(axis=2))
+        for pixel, hsv in list(zip(self.pixels.reshape(-1, 3), stats.hsv.reshape(-1, 3)))[:500]:
+            np.testing.assert_allclose(hsv, imfilters.IMRgbToHsv(tuple(int(v) for v in pixel)).hsv)
+        for c in range(3):
+            np.testing.assert_array_equal(stats.histogram[c], np.bincount(self.pixels[..., c].ravel(), minlength=256))
+        np.testing.assert_array_equal(stats.luma_histogram, np.bincount(stats.luma.ravel(), minlength=256))
+        self.assertEqual(stats.size, (70, 90))
+
+    def test_blocks(self):
+        # Planes computed in blocks of a few rows are the planes of the whole image.
+        with mock.patch('imfilters.io._CHUNK', 7 * 70 + 3):
+            small = imfilters.IMStats(self.pixels)
+            for name in ('luma', 'sum', 'mean', 'maximum', 'minimum', 'hsv', 'yuv'):
+                with self.subTest(plane=name):
+                    np.testing.assert_array_equal(getattr(small, name), getattr(self.stats, name))
+
+    def test_computed_once(self):
+        for name in ('luma', 'mean', 'maximum', 'hsv', 'histogram'):
+            with self.subTest(plane=name):
+                plane = getattr(self.stats, name)
+                self.assertIs(getattr(self.stats, name), plane)
+        self.assertFalse(self.stats.luma.flags.writeable)
+        self.assertFalse(self.stats.hsv.flags.writeable)
+        self.assertFalse(self.stats.histogram.flags.writeable)
+        self.assertFalse(self.stats.luma_histogram.flags.writeable)
+
+    def test_filters(self):
+        for name, params in _FILTERS:
+            for threads in (None, 3):
+                with self.subTest(name=name, threads=threads):
+                    cls = getattr(imfilters, name)
+                    expected = _result(cls(self.pixels.copy(), threads=threads, **params))
+                    np.testing.assert_array_equal(_result(cls(self.stats, threads=threads, **params)), expected)
+                    out = np.zeros_like(self.pixels)
+                    cls(self.stats, threads=threads, out=out, **params)
+                    np.testing.assert_array_equal(out, expected)
+        np.testing.assert_array_equal(self.stats.pixels, self.pixels)
+
+    def test_filters_read_planes(self):
+        stats = imfilters.IMStats(self.pixels)
+        for name, params in _FILTERS:
+            getattr(imfilters, name)(stats, **params)
+        self.assertLessEqual({'luma', 'mean', 'maximum', 'sum', 'hsv', 'yuv'}, set(stats._planes))
+
+    def test_other_filters(self):
+        for name in ('IMContrast', 'IMSepia', 'IMInvert', 'IMGaussBlur'):
+            with self.subTest(name=name):
+                cls = getattr(imfilters, name)
+                np.testing.assert_array_equal(_result(cls(self.stats)), _result(cls(self.pixels.copy())))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            imfilters.IMStats(np.zeros((4, 4, 3), np.float32))
+        for name, params in _FILTERS:
+            with self.subTest(name=name):
+                with self.assertRaises(ValueError):
+                    getattr(imfilters, name)(self.stats, inplace=True, **params)
+
+if __name__ == '__main__':
+    unittest.main()
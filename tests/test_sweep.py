@@ -0,0 +1,75 @@
+#
+# IMSweep gives every value the result of calling the filter with it
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from imfilters import imfilters
+from imfilters.sweep import IMSweep
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.pixels = np.random.default_rng(0).integers(0, 256, (70, 50, 3), dtype=np.uint8)
+
+    def assertSweep(self, name, param, values, threads=None, **params):
+        sweep = IMSweep(name, self.pixels, param, values, threads=threads, **params)
+        self.assertEqual(len(sweep.variants), len(values))
+        for index, value in enumerate(values):
+            with self.subTest(name=name, value=value, threads=threads):
+                expected = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(self.pixels.copy(), **dict(params, **{param: value}))))
+                np.testing.assert_array_equal(np.asarray(sweep.image(index)), expected)
+        return sweep
+
+    def test_pointwise(self):
+        for threads in (None, 3):
+            self.assertSweep('IMGamma', 'adjust', [0.5, 1, 1.5, 2, 3], threads)
+            self.assertSweep('IMSepia', 'adjust', [0, 25, 50, 75, 100], threads)
+            self.assertSweep('IMContrast', 'adjust', [-40, 0, 40], threads)
+            self.assertSweep('IMHueRotate', 'degreeus', [0, 90, 180], threads)
+
+    def test_spatial(self):
+        self.assertSweep('IMGaussBlur', 'radius', [1, 2, 4])
+        self.assertSweep('IMUnsharpMask', 'percent', [50, 150], threads=2, radius=3)
+
+    def test_source_untouched(self):
+        pixels = self.pixels.copy()
+        IMSweep('IMSepia', pixels, 'adjust', [50])
+        np.testing.assert_array_equal(pixels, self.pixels)
+
+    def test_save(self):
+        sweep = IMSweep('IMGamma', self.pixels, 'adjust', [0.5, 2])
+        with tempfile.TemporaryDirectory() as folder:
+            sweep.save(os.path.join(folder, 'gamma_{value}.png'))
+            sweep.save(os.path.join(folder, '{index:02d}.png'))
+            self.assertEqual(sorted(os.listdir(folder)), ['00.png', '01.png', 'gamma_0.5.png', 'gamma_2.png'])
+            for index, name in enumerate(['gamma_0.5.png', 'gamma_2.png']):
+                np.testing.assert_array_equal(np.asarray(Image.open(os.path.join(folder, name))), sweep.variants[index])
+            with self.assertRaises(ValueError):
+                sweep.save(os.path.join(folder, 'gamma.png'))
+
+    def test_sheet(self):
+        sweep = IMSweep('IMBrightness', self.pixels, 'adjust', [-60, -20, 20, 60, 100])
+        sheet = sweep.sheet(width=25)
+        # Three columns of 25 x 35, with 14 rows of label under every variant.
+        self.assertEqual(sheet.size, (75, 2 * (35 + 14)))
+        self.assertEqual(sweep.sheet(width=25, columns=5, labels=False).size, (125, 35))
+
+        cells = np.asarray(sweep.sheet(width=25, columns=5, labels=False)).astype(np.int16)
+        means = [cells[:, index * 25:(index + 1) * 25].mean() for index in range(5)]
+        self.assertEqual(means, sorted(means))
+        for index, variant in enumerate(sweep.variants):
+            self.assertLess(abs(means[index] - variant.mean()), 1)
+        # The empty place of the last row stays white.
+        np.testing.assert_array_equal(np.asarray(sheet)[49:84, 50:], 255)
+
+if __name__ == '__main__':
+    unittest.main()
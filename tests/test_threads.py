@@ -0,0 +1,37 @@
+#
+# The shared pool of threads keeps working while other callers ask for larger ones
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import threading
+import unittest
+
+from imfilters import imfilters
+
+class TestThreads(unittest.TestCase):
+
+    def test_pool_grows_under_use(self):
+        errors = []
+
+        def user():
+            try:
+                for _ in range(200):
+                    imfilters._run(lambda top, bottom: None, imfilters._bands(512, 4))
+            except Exception as e:
+                errors.append(e)
+
+        def grower():
+            for threads in range(5, 100):
+                imfilters._executor(threads)
+
+        threads = [threading.Thread(target=user) for _ in range(4)] + [threading.Thread(target=grower)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+if __name__ == '__main__':
+    unittest.main()
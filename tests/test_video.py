@@ -0,0 +1,76 @@
+#
+# IMVideo over clips and frame sequences generated on the fly
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from imfilters import imfilters
+from imfilters.video import IMVideo
+
+class TestVideo(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(6)]
+
+    def test_presets_close_to_stills(self):
+        frame = self.frames[0]
+        for name in imfilters.PRESETS:
+            with self.subTest(name=name):
+                still = np.asarray(imfilters._chain(getattr(imfilters, name).steps, frame.copy()))
+                video = IMVideo(name).apply(frame.copy(), 'RGB')
+                self.assertLessEqual(np.abs(video.astype(np.int16) - still).max(), 2)
+
+    def test_filters_same_as_stills(self):
+        frame = self.frames[0]
+        for name, params in (('IMContrast', {'adjust': 10}), ('IMSepia', {}), ('IMGray', {}), ('IMGaussBlur', {'radius': 2})):
+            with self.subTest(name=name):
+                still = imfilters._pixels(imfilters._result_image(getattr(imfilters, name)(frame.copy(), **params)))
+                np.testing.assert_array_equal(IMVideo(name, **params).apply(frame.copy(), 'RGB'), still)
+
+    def test_frame_sequence(self):
+        with tempfile.TemporaryDirectory() as folder:
+            frames = IMVideo('IMInvert').run([frame.copy() for frame in self.frames], os.path.join(folder, '%03d.png'))['frames']
+            self.assertEqual(frames, len(self.frames))
+            for index, frame in enumerate(self.frames):
+                np.testing.assert_array_equal(cv2.imread(os.path.join(folder, f'{index + 1:03d}.png')), 255 - frame)
+
+    def test_caller_frames_unchanged(self):
+        for name, params in (('IMInvert', {}), ('IMSepia', {}), ('IMGaussBlur', {'radius': 2}), ('Clarendon', {}), ('XPro2', {})):
+            with self.subTest(name=name):
+                # The last one a view of every other row, not contiguous.
+                frames = [frame.copy() for frame in self.frames] + [self.frames[0].copy()[::2]]
+                originals = [frame.copy() for frame in frames]
+                video = IMVideo(name, **params)
+                results = list(video.frames(frames))
+                self.assertEqual(len(results), len(frames))
+                for frame, original in zip(frames, originals):
+                    np.testing.assert_array_equal(frame, original)
+                for frame, result in zip(frames, results):
+                    np.testing.assert_array_equal(result, video.apply(frame.copy()))
+
+    def test_clip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            src = os.path.join(folder, 'clip.avi')
+            writer = cv2.VideoWriter(src, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+            if not writer.isOpened():
+                self.skipTest('OpenCV has no MJPG writer.')
+            for frame in self.frames:
+                writer.write(frame)
+            writer.release()
+            frames = IMVideo('Clarendon').run(src, os.path.join(folder, 'out.avi'))['frames']
+            self.assertEqual(frames, len(self.frames))
+            capture = cv2.VideoCapture(os.path.join(folder, 'out.avi'))
+            self.assertEqual(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)), len(self.frames))
+            capture.release()
+
+if __name__ == '__main__':
+    unittest.main()
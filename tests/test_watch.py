@@ -0,0 +1,76 @@
+#
+# IMWatch checks its chain at start and records every image it takes
+#
+# Copyright (c) 2020 by Wellington Gadelha. All Rights reserved.
+#
+
+
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from imfilters.watch import IMWatch
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.incoming = os.path.join(self.folder.name, 'incoming')
+        self.output = os.path.join(self.folder.name, 'output')
+        os.makedirs(self.incoming)
+        Image.new('RGB', (32, 24), (90, 120, 200)).save(os.path.join(self.incoming, 'a.jpg'))
+
+    def watch(self, steps, **params):
+        watch = IMWatch(self.incoming, self.output, steps, workers=1, interval=0.01, settle=0, **params)
+        self.addCleanup(watch.close)
+        records = []
+        watch.on_result = records.append
+        return watch, records
+
+    def test_bad_parameter(self):
+        with self.assertRaises(ValueError):
+            IMWatch(self.incoming, self.output, [('IMContrast', {'adjst': 10})], workers=1)
+        with self.assertRaises(ValueError):
+            IMWatch(self.incoming, self.output, 'IMNothing', workers=1)
+
+    def test_filter(self):
+        watch, records = self.watch([('IMContrast', {'adjust': 10}), ('Clarendon', {})])
+        watch.poll()
+        watch.drain()
+        self.assertEqual([record['status'] for record in records], ['done'])
+        self.assertEqual(Image.open(os.path.join(self.output, 'a.jpg')).size, (32, 24))
+        self.assertEqual(watch.stats()['done'], 1)
+
+    def test_killed_worker(self):
+        watch, records = self.watch('IMContrast')
+        watch.poll()
+        for process in list(watch.executor._processes.values()):
+            process.kill()
+        watch.drain()
+        self.assertEqual([record['status'] for record in records], ['failed'])
+        self.assertIn('Worker died', records[0]['error'])
+
+        # The next image runs on a new pool.
+        Image.new('RGB', (32, 24), (10, 20, 30)).save(os.path.join(self.incoming, 'b.jpg'))
+        watch.poll()
+        watch.drain()
+        self.assertEqual([record['status'] for record in records], ['failed', 'done'])
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'b.jpg')))
+        stats = watch.stats()
+        self.assertEqual((stats['done'], stats['failed'], stats['restarts']), (1, 1, 1))
+
+    def test_move_failure_is_recorded(self):
+        processed = os.path.join(self.folder.name, 'processed')
+        open(processed, 'w').close()
+        watch, records = self.watch('IMContrast', processed=processed)
+        watch.poll()
+        watch.drain()
+        self.assertEqual([record['status'] for record in records], ['failed'])
+        self.assertIn('Not moved', records[0]['error'])
+        self.assertEqual(watch.stats()['failed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()